@@ -1,4 +1,6 @@
 import asyncio
+from typing import Optional
+
 import aiohttp
 
 
@@ -9,7 +11,10 @@ async def bad_example():
 
 
 class APIClient:
-    def __init__(self):
+    def __init__(self, resolver: Optional[aiohttp.abc.AbstractResolver] = None):
+        # A resolver shared between clients (e.g. AsyncFetcher's
+        # CachingResolver) keeps its DNS cache when a session closes
+        self.resolver = resolver
         self.session = None
 
     async def __aenter__(self):
@@ -19,6 +24,7 @@ class APIClient:
             limit_per_host=30,
             keepalive_timeout=60,
             enable_cleanup_closed=True,
+            resolver=self.resolver,
         )
 
         self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
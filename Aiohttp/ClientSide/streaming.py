@@ -3,15 +3,20 @@ import os
 import aiohttp
 import aiofiles
 import time
+from typing import Optional
 
 
 class APIClient:
-    def __init__(self):
+    def __init__(self, resolver: Optional[aiohttp.abc.AbstractResolver] = None):
+        # Share a resolver (e.g. AsyncFetcher's CachingResolver) across clients
+        self.resolver = resolver
         self.session = None
 
     async def __aenter__(self):
         timeout = aiohttp.ClientTimeout(total=None)  # remove total timeout for testing
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
+        connector = aiohttp.TCPConnector(
+            limit=10, limit_per_host=5, resolver=self.resolver
+        )
         self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
         return self
 
@@ -0,0 +1 @@
+"""Benchmarks for AsyncFetcher, run against local stand-in servers."""
@@ -0,0 +1,77 @@
+"""
+Projected throughput, tail latency and retry amplification by fetcher settings.
+
+Runs the fetcher in virtual time (``fetcher.simulation``) against a
+synthetic upstream for ``--hours`` of Poisson traffic, once per
+combination of ``--concurrency`` and ``--retries``, and prints one row
+each. No sockets are opened and backoff does not really sleep, so a day
+of traffic takes seconds to minutes depending on ``--rate``.
+
+Run with:
+cd AsyncFetcher
+python -m benchmarks.capacity_sim --hours 24 --rate 1 --error-rate 0.02
+"""
+
+import argparse
+import itertools
+
+from fetcher.simulation import Simulation, UpstreamModel
+
+
+def parse_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def main(args) -> None:
+    upstream = UpstreamModel(
+        latency=args.latency,
+        latency_sigma=args.sigma,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        rate_limit=args.rate_limit,
+        capacity=args.capacity,
+    )
+    print(
+        f"{args.hours:g}h at {args.rate:g} req/s over {args.hosts} host(s), "
+        f"timeout {args.timeout:g}s: {upstream}"
+    )
+    print(
+        f"{'conc':>5} {'retries':>7} {'ok %':>7} {'req/s':>7} {'p50':>8} "
+        f"{'p99':>8} {'max':>8} {'amplif':>7} {'sim x':>7}"
+    )
+    for concurrency, retries in itertools.product(args.concurrency, args.retries):
+        with Simulation(
+            upstream,
+            rate=args.rate,
+            duration=args.hours * 3600,
+            hosts=args.hosts,
+            seed=args.seed,
+            request_options={"timeout": args.timeout, "max_retries": retries},
+        ) as simulation:
+            report = simulation.run(max_concurrent=concurrency)
+        latency = report.latency
+        print(
+            f"{concurrency:>5} {retries:>7} "
+            f"{report.succeeded / report.requests * 100:>6.2f}% "
+            f"{report.throughput:>7.2f} {latency.percentile(0.5):>7.3f}s "
+            f"{latency.percentile(0.99):>7.3f}s {latency.max:>7.2f}s "
+            f"{report.retry_amplification:>7.3f} {report.speedup:>6.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--rate", type=float, default=1.0, help="requests/second")
+    parser.add_argument("--hosts", type=int, default=1)
+    parser.add_argument("--concurrency", type=parse_list, default=[4, 16])
+    parser.add_argument("--retries", type=parse_list, default=[0, 3])
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--latency", type=float, default=0.2, help="median seconds")
+    parser.add_argument("--sigma", type=float, default=0.6)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--timeout-rate", type=float, default=0.001)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--capacity", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
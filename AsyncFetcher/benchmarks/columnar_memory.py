@@ -0,0 +1,139 @@
+"""
+Memory and GC cost of holding a large batch as objects or as columns.
+
+No network is involved: each case builds ``--rows`` requests and the same
+number of simulated responses (eight headers and a small undecoded JSON
+body each), as a crawl with ``fetch_all`` would hold them, and keeps them
+alive until the end:
+
+- ``objects``: a list of ``HTTPRequest`` with their own headers dicts and a
+  list of ``HTTPResponse`` with copied headers dicts.
+- ``columnar``: one ``RequestBatch`` and a ``ResultTable`` filled from
+  short-lived ``FetchResult``s, as ``fetch_batch`` does.
+
+Peak memory is measured with ``tracemalloc``, GC pauses with
+``gc.callbacks``. The last column is one full collection with every row
+still alive, which a long crawl pays over and over.
+
+Run with:
+cd AsyncFetcher
+python -m benchmarks.columnar_memory --rows 1000000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from fetcher.columnar import RequestBatch, ResultTable
+from fetcher.dataclass import FetchResult, HTTPRequest, HTTPResponse
+from fetcher.decoding import BodyDecoder, LazyBody
+
+HEADERS = {"Accept": "application/json", "User-Agent": "fetcher-bench/1.0"}
+BODY = b'{"id": 12345, "name": "item", "tags": ["a", "b", "c"], "ok": true}'
+
+
+def response_headers(index: int) -> dict[str, str]:
+    # Fresh strings per response, as aiohttp parses them from the wire
+    return {
+        "Content-Type": "application/json",
+        "Content-Length": str(len(BODY)),
+        "Date": "Mon, 06 Jan 2025 10:00:00 GMT",
+        "Server": "stand-in",
+        "ETag": f'"{index:x}"',
+        "Cache-Control": "max-age=60",
+        "Connection": "keep-alive",
+        "X-Request-Id": f"req-{index}",
+    }
+
+
+def as_objects(urls: list[str], decoder: BodyDecoder):
+    requests = [HTTPRequest(url, headers=dict(HEADERS)) for url in urls]
+    responses = []
+    for index, request in enumerate(requests):
+        body = LazyBody(bytes(BODY), "application/json", None, decoder)
+        responses.append(
+            HTTPResponse(request.url, 200, response_headers(index), body, 0.05, 1)
+        )
+    return requests, responses
+
+
+def as_columns(urls: list[str], decoder: BodyDecoder, keep_headers):
+    batch = RequestBatch(urls, headers=HEADERS)
+    table = ResultTable(batch, keep_headers)
+    for index, request in enumerate(batch):
+        body = LazyBody(bytes(BODY), "application/json", None, decoder)
+        headers = response_headers(index)
+        response = HTTPResponse(request.url, 200, headers, body, 0.05, 1)
+        table.add(FetchResult(index, request, response))
+    return batch, table
+
+
+def measure(build) -> dict:
+    pauses = []
+    started = {}
+
+    def on_gc(phase, info):
+        if phase == "start":
+            started["t"] = time.perf_counter()
+        else:
+            pauses.append(time.perf_counter() - started["t"])
+
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    tracemalloc.start()
+    try:
+        kept = build()
+        _, peak = tracemalloc.get_traced_memory()
+        # A full collection with everything still alive, as a long crawl sees
+        full_start = time.perf_counter()
+        gc.collect()
+        full = time.perf_counter() - full_start
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(on_gc)
+    del kept
+    return {
+        "peak_mb": peak / 2**20,
+        "gc_pauses": len(pauses),
+        "gc_total_ms": sum(pauses) * 1000,
+        "gc_max_ms": max(pauses, default=0.0) * 1000,
+        "full_gc_ms": full * 1000,
+    }
+
+
+def main(args) -> None:
+    urls = [
+        f"https://host{i % 500}.example.com/items/{i}?page=1"
+        for i in range(args.rows)
+    ]
+    decoder = BodyDecoder()
+    keep = args.keep_headers.split(",") if args.keep_headers is not None else None
+    cases = {
+        "objects": lambda: as_objects(urls, decoder),
+        "columnar": lambda: as_columns(urls, decoder, keep),
+    }
+
+    print(f"{args.rows} rows, keep_headers={args.keep_headers!r}")
+    print(
+        f"{'case':>9} {'peak MB':>8} {'GCs':>5} "
+        f"{'GC total':>9} {'GC max':>8} {'full GC':>8}"
+    )
+    for name, build in cases.items():
+        r = measure(build)
+        print(
+            f"{name:>9} {r['peak_mb']:>8.1f} {r['gc_pauses']:>5} "
+            f"{r['gc_total_ms']:>7.0f}ms {r['gc_max_ms']:>6.0f}ms "
+            f"{r['full_gc_ms']:>6.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument(
+        "--keep-headers",
+        default=None,
+        help="comma-separated headers kept by the table (default: all)",
+    )
+    main(parser.parse_args())
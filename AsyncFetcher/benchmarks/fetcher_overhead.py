@@ -0,0 +1,109 @@
+"""
+CPU cost per request of the fetcher itself, with no sockets.
+
+Every request is answered from memory by a ``ReplayTransport`` (a small
+JSON body, no added latency), so what is left is the fetcher's own work:
+scheduling, retries bookkeeping, metrics, logging and body decoding. Each
+case sends ``--requests`` requests to 500 hosts and reports wall and
+process CPU time per request.
+
+- ``fetch_all``: one list of ``HTTPRequest``, all started at once.
+- ``fetch_iter``: the same requests streamed through a window.
+- ``fetch_batch``: a ``RequestBatch`` into a ``ResultTable``.
+
+``--profile`` prints the top functions of each case by cumulative time.
+
+Run with:
+cd AsyncFetcher
+python -m benchmarks.fetcher_overhead --requests 100000
+"""
+
+import argparse
+import asyncio
+import cProfile
+import logging
+import pstats
+import time
+
+from fetcher.columnar import RequestBatch
+from fetcher.dataclass import HTTPRequest
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.logging import logger
+from fetcher.transport import RecordedResponse, ReplayTransport
+
+BODY = b'{"id": 12345, "name": "item", "tags": ["a", "b", "c"], "ok": true}'
+
+
+def make_transport() -> ReplayTransport:
+    default = RecordedResponse(
+        "",
+        headers={
+            "Content-Type": "application/json",
+            "Content-Length": str(len(BODY)),
+        },
+        body=BODY,
+    )
+    return ReplayTransport(default=default)
+
+
+async def run_fetch_all(fetcher: AsyncHTTPFetcher, urls: list[str]) -> None:
+    await fetcher.fetch_all([HTTPRequest(url) for url in urls])
+
+
+async def run_fetch_iter(fetcher: AsyncHTTPFetcher, urls: list[str]) -> None:
+    async for _ in fetcher.fetch_iter(HTTPRequest(url) for url in urls):
+        pass
+
+
+async def run_fetch_batch(fetcher: AsyncHTTPFetcher, urls: list[str]) -> None:
+    await fetcher.fetch_batch(RequestBatch(urls), keep_headers=())
+
+
+CASES = {
+    "fetch_all": run_fetch_all,
+    "fetch_iter": run_fetch_iter,
+    "fetch_batch": run_fetch_batch,
+}
+
+
+async def run_case(run, urls: list[str], args, profiler=None) -> tuple[float, float]:
+    transport = make_transport()
+    async with AsyncHTTPFetcher(
+        max_concurrent=args.concurrency, transport=transport
+    ) as fetcher:
+        if profiler is not None:
+            profiler.enable()
+        wall, cpu = time.perf_counter(), time.process_time()
+        await run(fetcher, urls)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        if profiler is not None:
+            profiler.disable()
+    assert transport.requests == len(urls)
+    return wall, cpu
+
+
+def main(args) -> None:
+    logger.setLevel(logging.CRITICAL)
+    urls = [
+        f"https://host{i % 500}.example.com/items/{i}" for i in range(args.requests)
+    ]
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'case':>12} {'wall/req':>10} {'cpu/req':>10} {'req/s':>9}")
+    for name, run in CASES.items():
+        profiler = cProfile.Profile() if args.profile else None
+        wall, cpu = asyncio.run(run_case(run, urls, args, profiler))
+        print(
+            f"{name:>12} {wall / args.requests * 1e6:>8.1f}us "
+            f"{cpu / args.requests * 1e6:>8.1f}us {args.requests / wall:>9.0f}"
+        )
+        if profiler is not None:
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--profile", action="store_true")
+    main(parser.parse_args())
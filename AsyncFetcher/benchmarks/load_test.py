@@ -0,0 +1,188 @@
+"""
+Offline load test of AsyncHTTPFetcher against a local stand-in server.
+
+The server runs in its own process with a configurable latency
+distribution, error rate, body size and 429 behaviour (see
+``benchmarks.server.ServerProfile``). Every combination of
+``--concurrency`` and ``--connector-limit`` is run in a fresh process, so
+peak RSS is measured per case. The report is printed (or written to
+``--output``) as JSON, for comparing fetcher changes across releases.
+
+Run with:
+cd AsyncFetcher
+python -m benchmarks.load_test --concurrency 10 50 100 --connector-limit 100 0
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+
+import aiohttp
+
+from fetcher.dataclass import BodyMode, HTTPRequest
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.logging import logger
+from fetcher.metrics import LatencyHistogram
+from fetcher.ratelimit import HostRateLimiter
+from benchmarks.server import (
+    LATENCY_DISTRIBUTIONS,
+    ServerProfile,
+    start_server_process,
+)
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+async def run_case(base_url: str, case: dict) -> dict:
+    logger.setLevel(logging.CRITICAL)
+    requests = (
+        HTTPRequest(
+            f"{base_url}/{i}",
+            max_retries=case["max_retries"],
+            body_mode=BodyMode(case["body_mode"]),
+        )
+        for i in range(case["requests"])
+    )
+    rate_limiter = HostRateLimiter(case["rate_limit"]) if case["rate_limit"] else None
+    latency = LatencyHistogram()
+
+    async with AsyncHTTPFetcher(
+        max_concurrent=case["concurrency"],
+        connector_limit=case["connector_limit"],
+        coalesce=False,
+        rate_limiter=rate_limiter,
+    ) as fetcher:
+        start = time.perf_counter()
+        async for result in fetcher.fetch_iter(requests, window=case["window"]):
+            if result.ok:
+                latency.record(result.response.response_time)
+        elapsed = time.perf_counter() - start
+
+    stats = fetcher.get_stats()
+    return {
+        **case,
+        "seconds": round(elapsed, 4),
+        "rps": round(case["requests"] / elapsed, 1),
+        "succeeded_rps": round(stats["request_succeeded"] / elapsed, 1),
+        "latency": latency.summary(QUANTILES),
+        "slot_wait": fetcher.metrics.slot_wait.summary(QUANTILES),
+        "connections": fetcher.get_metrics()["connections"],
+        "stats": stats,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def run_case_in_process(base_url: str, case: dict) -> dict:
+    return asyncio.run(run_case(base_url, case))
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "aiohttp": aiohttp.__version__,
+        "platform": platform.platform(),
+        "cpu_count": multiprocessing.cpu_count(),
+    }
+
+
+def main(args) -> dict:
+    profile = ServerProfile(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_spread=args.latency_spread,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_rps=args.max_rps,
+        retry_after=args.retry_after,
+        body_size=args.body_size,
+        seed=args.seed,
+    )
+    server, base_url = start_server_process(profile)
+    results = []
+    try:
+        for concurrency, connector_limit in itertools.product(
+            args.concurrency, args.connector_limit
+        ):
+            case = {
+                "concurrency": concurrency,
+                "connector_limit": connector_limit,
+                "requests": args.requests,
+                "window": args.window or concurrency * 2,
+                "max_retries": args.max_retries,
+                "body_mode": args.body_mode,
+                "rate_limit": args.rate_limit,
+            }
+            # A fresh process per case keeps peak RSS comparable
+            with ProcessPoolExecutor(
+                1, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                result = pool.submit(run_case_in_process, base_url, case).result()
+            results.append(result)
+            print(
+                f"concurrency={concurrency} connector_limit={connector_limit}: "
+                f"{result['rps']} req/s, p99 {result['latency']['p99'] * 1000:.1f} ms",
+                file=sys.stderr,
+            )
+    finally:
+        server.terminate()
+
+    return {
+        "environment": environment(),
+        "server": asdict(profile),
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument(
+        "--connector-limit",
+        type=int,
+        nargs="+",
+        default=[100],
+        help="aiohttp connection pool sizes to sweep (0 = unlimited)",
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--window", type=int, default=None)
+    parser.add_argument("--max-retries", type=int, default=0)
+    parser.add_argument(
+        "--body-mode",
+        choices=[mode.value for mode in BodyMode if mode is not BodyMode.STREAM],
+        default=BodyMode.DECODE.value,
+    )
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-mean", type=float, default=0.01)
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--body-size", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(main(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,110 @@
+"""
+Per-call cost of logging a request on the hot path.
+
+Each case logs ``--calls`` "Success" lines like ``_attempt`` does, from the
+calling thread, and reports the time per call on that thread plus the
+total time until every record is on disk. Console output goes to
+/dev/null, so terminal speed does not count.
+
+- ``sync-fstring``: the old setup, which formats an f-string on every call
+  and writes synchronously to a console handler and a file rotating at
+  2 KiB.
+- ``queue``: ``get_logger``, which defers formatting to a listener thread
+  and rotates at 10 MiB.
+- ``queue-sampled``: the same, keeping 1% of "Success" lines.
+- ``*-disabled``: INFO turned off. An f-string is still built on every
+  call, while a ``%``-style call returns after the level check.
+
+Run with:
+cd AsyncFetcher
+python -m benchmarks.logging_overhead --calls 100000
+"""
+
+import argparse
+import contextlib
+import logging
+import logging.handlers
+import os
+import tempfile
+import time
+
+from fetcher.logging import LOG_FORMAT, SamplingFilter, get_logger, stop_logging
+
+URL = "https://api.example.com/items/12345"
+
+
+def old_logger(name: str, path: str) -> logging.Logger:
+    """The synchronous setup that ``get_logger`` used to build."""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    ch.setFormatter(logging.Formatter(LOG_FORMAT))
+    fh = logging.handlers.RotatingFileHandler(path, maxBytes=2048, backupCount=3)
+    fh.setLevel(logging.DEBUG)
+    fh.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(ch)
+    logger.addHandler(fh)
+    return logger
+
+
+def log_fstring(logger: logging.Logger, calls: int) -> None:
+    for i in range(calls):
+        logger.info(f"Success {URL}/{i} - {200} ({0.0123:.2f}s)")
+
+
+def log_lazy(logger: logging.Logger, calls: int) -> None:
+    for i in range(calls):
+        logger.info("Success %s/%d - %d (%.2fs)", URL, i, 200, 0.0123)
+
+
+def run_case(name: str, args, directory: str) -> tuple[float, float]:
+    path = os.path.join(directory, f"{name}.log")
+    queued = name.startswith("queue")
+    if queued:
+        filters = (SamplingFilter({"Success ": 0.01}),) if "sampled" in name else ()
+        logger = get_logger(f"bench.{name}", path, filters=filters)
+        logger.propagate = False
+    else:
+        logger = old_logger(f"bench.{name}", path)
+    if name.endswith("disabled"):
+        logger.setLevel(logging.WARNING)
+
+    log = log_lazy if queued else log_fstring
+    start = time.perf_counter()
+    log(logger, args.calls)
+    caller = time.perf_counter() - start
+    if queued:
+        stop_logging(f"bench.{name}")
+    else:
+        for handler in logger.handlers:
+            handler.close()
+    total = time.perf_counter() - start
+    return caller / args.calls, total
+
+
+def main(args) -> None:
+    cases = [
+        "sync-fstring",
+        "queue",
+        "queue-sampled",
+        "sync-fstring-disabled",
+        "queue-disabled",
+    ]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+            for name in cases:
+                results[name] = run_case(name, args, directory)
+
+    print(f"{args.calls} calls")
+    print(f"{'case':>22} {'per call':>10} {'until on disk':>14}")
+    for name, (per_call, total) in results.items():
+        print(f"{name:>22} {per_call * 1e6:>8.2f}us {total:>13.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100_000)
+    main(parser.parse_args())
@@ -0,0 +1,143 @@
+"""
+Time to first byte of a batch's first wave, cold versus pre-warmed.
+
+A local server is reached under ``--hosts`` different names, all resolved
+to 127.0.0.1 by a stand-in resolver that takes ``--dns-latency`` seconds
+per lookup (local lookups are too fast to show anything). The first wave
+(``--per-host`` requests per name, all at once) is fetched three ways:
+
+- ``cold``: a new session with its own DNS cache, as before.
+- ``shared-dns``: a ``CachingResolver`` filled by an earlier session.
+- ``prewarmed``: the shared resolver plus ``fetcher.prewarm(...)``, so the
+  wave runs on open keep-alive connections.
+
+Over real networks, connection set-up (TCP and TLS round trips) adds to
+the cold numbers, and ``prewarm`` removes that as well.
+
+Run with:
+cd AsyncFetcher
+python -m benchmarks.prewarm_ttfb
+"""
+
+import argparse
+import asyncio
+import logging
+import socket
+import time
+
+from aiohttp import web
+
+from fetcher.dataclass import HTTPRequest
+from fetcher.dns import CachingResolver
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.logging import logger
+from fetcher.metrics import LatencyHistogram
+from benchmarks.server import start_server
+
+
+class SlowResolver:
+    """Resolves every name to 127.0.0.1 after a fixed delay."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        await asyncio.sleep(self.latency)
+        return [
+            {
+                "hostname": host,
+                "host": "127.0.0.1",
+                "port": port,
+                "family": socket.AF_INET,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }
+        ]
+
+    async def close(self):
+        pass
+
+
+def make_app(latency: float) -> web.Application:
+    async def handler(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    return app
+
+
+async def first_wave(resolver, origins: list[str], args, prewarm: bool) -> dict:
+    requests = [
+        HTTPRequest(f"{origin}/item/{i}")
+        for origin in origins
+        for i in range(args.per_host)
+    ]
+    async with AsyncHTTPFetcher(
+        max_concurrent=len(requests), coalesce=False, resolver=resolver
+    ) as fetcher:
+        if prewarm:
+            await fetcher.prewarm(origins, connections=args.per_host)
+        start = time.perf_counter()
+        await fetcher.fetch_all(requests)
+        wall = time.perf_counter() - start
+
+    ttfb = LatencyHistogram()
+    for histogram in fetcher.metrics.ttfb.values():
+        ttfb.merge(histogram)
+    summary = ttfb.summary()
+    return {
+        "p50": summary["p50"],
+        "p99": summary["p99"],
+        "wall": wall,
+        "reused": fetcher.metrics.connections_reused,
+    }
+
+
+async def main(args) -> None:
+    logger.setLevel(logging.CRITICAL)
+    runner, base_url = await start_server(make_app(args.latency))
+    port = base_url.rsplit(":", 1)[1]
+    origins = [f"http://host{i}.bench:{port}" for i in range(args.hosts)]
+
+    def shared_resolver():
+        return CachingResolver(
+            resolver_factory=lambda: SlowResolver(args.dns_latency)
+        )
+
+    try:
+        results = {}
+        results["cold"] = await first_wave(
+            SlowResolver(args.dns_latency), origins, args, prewarm=False
+        )
+
+        resolver = shared_resolver()
+        await first_wave(resolver, origins, args, prewarm=False)
+        results["shared-dns"] = await first_wave(resolver, origins, args, prewarm=False)
+
+        results["prewarmed"] = await first_wave(
+            shared_resolver(), origins, args, prewarm=True
+        )
+    finally:
+        await runner.cleanup()
+
+    print(
+        f"First wave: {args.hosts} hosts x {args.per_host} requests, "
+        f"DNS {args.dns_latency * 1000:.0f} ms, server {args.latency * 1000:.0f} ms"
+    )
+    print(f"{'case':>11} {'ttfb p50':>9} {'ttfb p99':>9} {'wall':>8} {'reused':>7}")
+    for name, r in results.items():
+        print(
+            f"{name:>11} {r['p50'] * 1000:>7.1f}ms {r['p99'] * 1000:>7.1f}ms "
+            f"{r['wall'] * 1000:>6.1f}ms {r['reused']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hosts", type=int, default=20)
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--dns-latency", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.005)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,133 @@
+"""
+Throughput of a healthy host while another host suffers an outage.
+
+Two local servers are started: a healthy one and a flaky one that answers
+503 during an outage window. A mixed stream of requests is fetched through
+two fetchers:
+
+- ``slot-holding``: the old behaviour, sleeping for backoff while holding
+  the concurrency slot.
+- ``parked``: the current behaviour, releasing the slot during jittered
+  backoff and bounding retries with a retry budget.
+
+Run with:
+cd AsyncFetcher
+python -m benchmarks.retry_outage
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import time
+
+import aiohttp
+from aiohttp import web
+
+from fetcher.dataclass import HTTPRequest
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.logging import logger
+from fetcher.retry import RetryBudget, RetryPolicy
+from fetcher.scheduler import host_key
+from benchmarks.server import start_server
+
+
+class SlotHoldingFetcher(AsyncHTTPFetcher):
+    """Baseline that keeps its slot while sleeping between attempts."""
+
+    async def fetch_single(self, request: HTTPRequest):
+        async with self.scheduler.slot(host_key(request.url)):
+            for attempt in range(request.max_retries + 1):
+                try:
+                    return await self._attempt(request, attempt)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    if attempt == request.max_retries:
+                        self.stats["request_failed"] += 1
+                        raise
+                    self.stats["total_retries"] += 1
+                    await asyncio.sleep(self.retry_policy.backoff(attempt))
+
+
+def make_app(latency: float, outage: tuple[float, float] = None) -> web.Application:
+    started = time.perf_counter()
+
+    async def handler(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        elapsed = time.perf_counter() - started
+        if outage and outage[0] <= elapsed < outage[1]:
+            return web.Response(status=503)
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    return app
+
+
+async def run_case(fetcher_cls, policy, args) -> list[int]:
+    healthy_runner, healthy_url = await start_server(make_app(args.latency))
+    flaky_runner, flaky_url = await start_server(
+        make_app(args.latency, (args.outage_start, args.outage_end))
+    )
+    buckets = [0] * int(args.duration / args.bucket + 1)
+
+    try:
+        async with fetcher_cls(
+            max_concurrent=args.concurrency, retry_policy=policy
+        ) as fetcher:
+            start = time.perf_counter()
+
+            def requests():
+                for i in itertools.count():
+                    if time.perf_counter() - start >= args.duration:
+                        return
+                    base = flaky_url if i % 2 else healthy_url
+                    yield HTTPRequest(f"{base}/{i}", max_retries=args.max_retries)
+
+            async for result in fetcher.fetch_iter(requests(), window=args.window):
+                if result.ok and result.request.url.startswith(healthy_url):
+                    elapsed = time.perf_counter() - start
+                    buckets[min(int(elapsed / args.bucket), len(buckets) - 1)] += 1
+    finally:
+        await healthy_runner.cleanup()
+        await flaky_runner.cleanup()
+
+    return buckets
+
+
+async def main(args) -> None:
+    logger.setLevel(logging.CRITICAL)
+
+    cases = {
+        "slot-holding": (
+            SlotHoldingFetcher,
+            RetryPolicy(base_delay=args.base_delay, jitter=False),
+        ),
+        "parked": (
+            AsyncHTTPFetcher,
+            RetryPolicy(base_delay=args.base_delay, budget=RetryBudget(ratio=0.2)),
+        ),
+    }
+    results = {name: await run_case(*case, args) for name, case in cases.items()}
+
+    print(
+        f"Healthy-host successes per {args.bucket}s "
+        f"(outage {args.outage_start}s-{args.outage_end}s on the other host)"
+    )
+    print(f"{'t (s)':>6} " + " ".join(f"{name:>13}" for name in results))
+    for i in range(len(next(iter(results.values())))):
+        row = " ".join(f"{results[name][i]:>13}" for name in results)
+        print(f"{i * args.bucket:>6.1f} {row}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=6.0)
+    parser.add_argument("--outage-start", type=float, default=1.5)
+    parser.add_argument("--outage-end", type=float, default=4.5)
+    parser.add_argument("--bucket", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--window", type=int, default=400)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--base-delay", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
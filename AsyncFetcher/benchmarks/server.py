@@ -0,0 +1,137 @@
+import asyncio
+import json
+import math
+import multiprocessing
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from aiohttp import web
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+
+
+async def start_server(
+    app: web.Application, host: str = "127.0.0.1", port: int = 0
+) -> tuple[web.AppRunner, str]:
+    """
+    Start ``app`` on a local port.
+
+    Returns:
+        The runner (call ``await runner.cleanup()`` to stop it) and the
+        server's base URL.
+    """
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+@dataclass
+class ServerProfile:
+    """
+    Behaviour of the stand-in server.
+
+    ``latency`` picks the distribution of response delays, all with mean
+    ``latency_mean`` seconds. ``latency_spread`` is the relative half-width
+    for ``uniform`` and sigma for ``lognormal``. Requests fail with a 500 at
+    ``error_rate`` and with a 429 at ``throttle_rate``. Above ``max_rps``
+    requests per second the server also answers 429. Throttled responses
+    carry ``Retry-After: retry_after`` unless it is None.
+    """
+
+    latency: str = "constant"
+    latency_mean: float = 0.01
+    latency_spread: float = 0.5
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    max_rps: Optional[float] = None
+    retry_after: Optional[float] = 1.0
+    body_size: int = 1024
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {self.latency!r}")
+
+    def sample_latency(self, rng: random.Random) -> float:
+        mean = self.latency_mean
+        if self.latency == "uniform":
+            spread = mean * self.latency_spread
+            return rng.uniform(mean - spread, mean + spread)
+        if self.latency == "exponential":
+            return rng.expovariate(1 / mean) if mean > 0 else 0.0
+        if self.latency == "lognormal":
+            sigma = self.latency_spread
+            # exp(sigma^2 / 2) is the mean of lognormvariate(0, sigma)
+            return mean * rng.lognormvariate(0.0, sigma) / math.exp(sigma**2 / 2)
+        return mean
+
+
+def make_stand_in_app(profile: ServerProfile) -> web.Application:
+    """Application answering every GET/POST according to ``profile``."""
+    rng = random.Random(profile.seed)
+    payload = json.dumps({"data": "x" * max(0, profile.body_size - 12)}).encode()
+    headers = {}
+    if profile.retry_after is not None:
+        headers["Retry-After"] = f"{profile.retry_after:g}"
+
+    # Fixed one-second window counter for max_rps
+    window = {"start": time.monotonic(), "count": 0}
+
+    def over_limit() -> bool:
+        if profile.max_rps is None:
+            return False
+        now = time.monotonic()
+        if now - window["start"] >= 1.0:
+            window["start"], window["count"] = now, 0
+        window["count"] += 1
+        return window["count"] > profile.max_rps
+
+    async def handler(request: web.Request) -> web.Response:
+        if over_limit() or rng.random() < profile.throttle_rate:
+            return web.Response(status=429, headers=headers)
+        delay = profile.sample_latency(rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if rng.random() < profile.error_rate:
+            return web.Response(status=500)
+        return web.Response(body=payload, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    return app
+
+
+def _serve(profile: ServerProfile, host: str, port: int, ready) -> None:
+    async def run() -> None:
+        _, base_url = await start_server(make_stand_in_app(profile), host, port)
+        ready.send(base_url)
+        ready.close()
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def start_server_process(
+    profile: ServerProfile, host: str = "127.0.0.1", port: int = 0
+) -> tuple[multiprocessing.Process, str]:
+    """
+    Run the stand-in server in its own process, off the client's CPU.
+
+    Returns:
+        The process (call ``terminate()`` to stop it) and the base URL.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_serve, args=(profile, host, port, sender), daemon=True
+    )
+    process.start()
+    sender.close()
+    base_url = receiver.recv()
+    receiver.close()
+    return process, base_url
@@ -0,0 +1,99 @@
+"""
+Requests per second of ShardedFetcher as the number of workers grows.
+
+A local server runs in its own processes (sharing one port via
+SO_REUSEPORT) so that it is not the bottleneck. Requests are spread over
+several loopback addresses (127.0.0.1, 127.0.0.2, ...) that act as distinct
+hosts, giving the host-hash partitioning something to spread. Scaling is
+only visible with spare cores; on a machine with N cores, keep
+``workers + server-processes`` around N.
+
+Run with:
+cd AsyncFetcher
+python -m benchmarks.sharded_scaling --workers 1 2 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import time
+
+from aiohttp import web
+
+from fetcher.dataclass import HTTPRequest
+from fetcher.logging import logger
+from fetcher.sharded import ShardedFetcher
+
+
+def serve(port: int, body_size: int) -> None:
+    payload = json.dumps({"data": "x" * body_size})
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(text=payload, content_type="application/json")
+
+    async def run() -> None:
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", handler)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "0.0.0.0", port, reuse_port=True).start()
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+async def run_case(workers: int, args) -> dict:
+    requests = (
+        HTTPRequest(f"http://127.0.0.{i % args.hosts + 1}:{args.port}/{i}")
+        for i in range(args.requests)
+    )
+    ok = 0
+    start = time.perf_counter()
+    async with ShardedFetcher(
+        workers=workers,
+        window=args.window,
+        max_concurrent=args.window,
+        coalesce=False,
+    ) as fetcher:
+        async for result in fetcher.fetch_iter(requests):
+            ok += result.ok
+    elapsed = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "requests": args.requests,
+        "succeeded": ok,
+        "seconds": round(elapsed, 3),
+        "rps": round(args.requests / elapsed, 1),
+    }
+
+
+async def main(args) -> None:
+    logger.setLevel(logging.CRITICAL)
+    servers = [
+        multiprocessing.Process(target=serve, args=(args.port, args.body_size), daemon=True)
+        for _ in range(args.server_processes)
+    ]
+    for process in servers:
+        process.start()
+    await asyncio.sleep(1.0)
+
+    try:
+        for workers in args.workers:
+            print(json.dumps(await run_case(workers, args)))
+    finally:
+        for process in servers:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--hosts", type=int, default=16)
+    parser.add_argument("--window", type=int, default=200)
+    parser.add_argument("--body-size", type=int, default=512)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--server-processes", type=int, default=2)
+    asyncio.run(main(parser.parse_args()))
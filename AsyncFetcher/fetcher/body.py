@@ -0,0 +1,143 @@
+import asyncio
+from typing import Any, AsyncIterator, Optional
+
+import aiohttp
+
+from .dataclass import BodyMode, HTTPRequest
+from .decoding import BodyDecoder, ErrorBody
+from .exceptions import BodyTooLargeError
+from .metrics import FetcherMetrics
+from .scheduler import host_key
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _too_large(request: HTTPRequest, size: int) -> BodyTooLargeError:
+    return BodyTooLargeError(
+        f"Body of {request.url} exceeds max_body_size "
+        f"({size} > {request.max_body_size} bytes)"
+    )
+
+
+async def _iter_chunks(
+    request: HTTPRequest,
+    response: aiohttp.ClientResponse,
+    metrics: Optional[FetcherMetrics] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yield body chunks, aborting as soon as ``max_body_size`` is exceeded.
+
+    aiohttp reports received chunks to tracing only from ``read()``, so the
+    bytes read here are added to ``metrics`` directly.
+    """
+    limit = request.max_body_size
+    if limit is not None and (response.content_length or 0) > limit:
+        raise _too_large(request, response.content_length)
+
+    host = host_key(request.url)
+    total = 0
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        total += len(chunk)
+        if metrics is not None:
+            metrics.observe_bytes_in(host, len(chunk))
+        if limit is not None and total > limit:
+            raise _too_large(request, total)
+        yield chunk
+
+
+async def _read_all(
+    request: HTTPRequest,
+    response: aiohttp.ClientResponse,
+    metrics: Optional[FetcherMetrics] = None,
+) -> bytes:
+    buffer = bytearray()
+    async for chunk in _iter_chunks(request, response, metrics):
+        buffer += chunk
+    return bytes(buffer)
+
+
+async def _read_prefix(
+    request: HTTPRequest,
+    response: aiohttp.ClientResponse,
+    metrics: Optional[FetcherMetrics] = None,
+) -> bytes:
+    buffer = bytearray()
+    async for chunk in _iter_chunks(request, response, metrics):
+        buffer += chunk
+        if len(buffer) >= request.prefix_size:
+            # Do not download the rest; the connection cannot be reused
+            response.close()
+            break
+    return bytes(buffer[: request.prefix_size])
+
+
+async def _stream(
+    request: HTTPRequest,
+    response: aiohttp.ClientResponse,
+    metrics: Optional[FetcherMetrics] = None,
+) -> int:
+    written = 0
+    if callable(request.sink):
+        async for chunk in _iter_chunks(request, response, metrics):
+            await request.sink(chunk)
+            written += len(chunk)
+        return written
+
+    # File writes run in a worker thread so disk I/O never blocks the loop;
+    # the file is truncated on every attempt so retries do not append
+    sink = await asyncio.to_thread(open, request.sink, "wb")
+    try:
+        async for chunk in _iter_chunks(request, response, metrics):
+            await asyncio.to_thread(sink.write, chunk)
+            written += len(chunk)
+    finally:
+        await asyncio.to_thread(sink.close)
+    return written
+
+
+async def _decode(
+    request: HTTPRequest,
+    response: aiohttp.ClientResponse,
+    decoder: BodyDecoder,
+    metrics: Optional[FetcherMetrics] = None,
+) -> Any:
+    try:
+        if request.max_body_size is None:
+            raw = await response.read()
+        else:
+            raw = await _read_all(request, response, metrics)
+    except BodyTooLargeError:
+        raise
+    except Exception as e:
+        return ErrorBody(f"Error reading data {e}")
+    # Parsing is deferred until the body is first read
+    return decoder.lazy(raw, response.content_type, response.charset)
+
+
+async def read_body(
+    request: HTTPRequest,
+    response: aiohttp.ClientResponse,
+    decoder: BodyDecoder,
+    metrics: Optional[FetcherMetrics] = None,
+) -> Any:
+    """
+    Read ``response`` according to ``request.body_mode``.
+
+    In ``DECODE`` mode the raw bytes are returned wrapped in a ``LazyBody``.
+    Bytes read in chunks are counted in ``metrics.bytes_in``.
+
+    Raises:
+        BodyTooLargeError: If the body exceeds ``request.max_body_size``
+    """
+    mode = request.body_mode
+    if mode is BodyMode.DECODE:
+        return await _decode(request, response, decoder, metrics)
+    if mode is BodyMode.DISCARD:
+        async for _ in _iter_chunks(request, response, metrics):
+            pass
+        return None
+    if mode is BodyMode.BYTES:
+        return await _read_all(request, response, metrics)
+    if mode is BodyMode.PREFIX:
+        return await _read_prefix(request, response, metrics)
+    return await _stream(request, response, metrics)
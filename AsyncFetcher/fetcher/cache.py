@@ -0,0 +1,339 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+from .dataclass import BodyMode, HTTPRequest, HTTPResponse
+from .decoding import BodyDecoder, ErrorBody, LazyBody
+from .logging import logger
+
+
+def _header(headers: dict[str, str], name: str) -> Optional[str]:
+    """Case-insensitive header lookup on a plain dict."""
+    value = headers.get(name)
+    if value is None:
+        lowered = name.lower()
+        for key, candidate in headers.items():
+            if key.lower() == lowered:
+                return candidate
+    return value
+
+
+def _cache_control(headers: dict[str, str]) -> dict[str, Optional[str]]:
+    """Parse a Cache-Control header into a directive -> value mapping."""
+    directives = {}
+    for part in (_header(headers, "Cache-Control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+# Headers that describe the stored body and must not change on a 304
+_BODY_HEADERS = ("content-", "transfer-encoding")
+
+
+@dataclass
+class CacheEntry:
+    """A stored response together with its validators."""
+
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+    body_kind: str  # "json" or "text"
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    max_age: Optional[float] = None
+    stored_at: float = field(default_factory=time.time)
+    charset: Optional[str] = None
+    private: bool = False  # Cache-Control: private; kept out of the disk tier
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """True while the entry may be served without revalidation."""
+        if not self.max_age:
+            return False
+        return (now or time.time()) - self.stored_at < self.max_age
+
+    def validators(self) -> dict[str, str]:
+        """Headers that turn a request into a conditional request."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def refresh(self, headers: dict[str, str]) -> None:
+        """
+        Apply the headers of a ``304 Not Modified`` answer to this entry.
+
+        Validators and freshness are taken from the 304 where it sends them,
+        and the entry counts as stored now.
+        """
+        for name, value in headers.items():
+            if not name.lower().startswith(_BODY_HEADERS):
+                self.headers[name] = value
+        directives = _cache_control(headers)
+        if "no-cache" in directives:
+            self.max_age = None
+        elif directives.get("max-age"):
+            try:
+                self.max_age = float(directives["max-age"])
+            except ValueError:
+                pass
+        self.etag = _header(headers, "ETag") or self.etag
+        self.last_modified = _header(headers, "Last-Modified") or self.last_modified
+        self.stored_at = time.time()
+
+    @property
+    def content_type(self) -> str:
+        return "application/json" if self.body_kind == "json" else "text/plain"
+
+    def decode_body(self, decoder: Optional[BodyDecoder] = None) -> Any:
+        return self.lazy_body(decoder).decode()
+
+    def lazy_body(self, decoder: Optional[BodyDecoder] = None) -> LazyBody:
+        return (decoder or BodyDecoder()).lazy(self.body, self.content_type, self.charset)
+
+    def to_response(
+        self,
+        response_time: float,
+        attempt: int,
+        decoder: Optional[BodyDecoder] = None,
+    ) -> HTTPResponse:
+        return HTTPResponse(
+            url=self.url,
+            status_code=self.status_code,
+            headers=dict(self.headers),
+            body=self.lazy_body(decoder),
+            response_time=response_time,
+            attempt=attempt,
+            from_cache=True,
+        )
+
+    @classmethod
+    def from_response(cls, response: HTTPResponse) -> Optional["CacheEntry"]:
+        """Build an entry, or return None if the response must not be stored."""
+        if response.status_code != 200:
+            return None
+
+        directives = _cache_control(response.headers)
+        if "no-store" in directives:
+            return None
+        # The key covers every request header, so only "*" is left to honour
+        vary = _header(response.headers, "Vary") or ""
+        if "*" in vary:
+            return None
+
+        max_age = None
+        if "no-cache" not in directives and directives.get("max-age"):
+            try:
+                max_age = float(directives["max-age"])
+            except ValueError:
+                pass
+
+        etag = _header(response.headers, "ETag")
+        last_modified = _header(response.headers, "Last-Modified")
+        if not (etag or last_modified or max_age):
+            return None
+
+        charset = None
+        pending = response.lazy_body
+        if pending is None and isinstance(response.body, ErrorBody):
+            # A failed read or decode, not the resource's content
+            return None
+        if pending is not None:
+            body = pending.raw
+            kind = "json" if "application/json" in pending.content_type else "text"
+            charset = pending.charset
+        elif isinstance(response.body, str):
+            body, kind = response.body.encode("utf-8"), "text"
+        else:
+            try:
+                body, kind = json.dumps(response.body).encode("utf-8"), "json"
+            except (TypeError, ValueError):
+                return None
+
+        return cls(
+            url=response.url,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            body=body,
+            body_kind=kind,
+            etag=etag,
+            last_modified=last_modified,
+            max_age=max_age,
+            charset=charset,
+            private="private" in directives,
+        )
+
+
+class SQLiteCacheTier:
+    """
+    Disk tier for ``ResponseCache`` backed by a single SQLite file.
+
+    Entries are evicted least-recently-used once the stored bodies exceed
+    ``max_bytes``. Methods are blocking; ``ResponseCache`` runs them in a
+    worker thread.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, meta TEXT NOT NULL, body BLOB NOT NULL,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT meta, body FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        meta = json.loads(row[0])
+        return CacheEntry(body=row[1], **meta)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        meta = asdict(entry)
+        del meta["body"]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(meta), entry.body, entry.size, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_used"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU cache of responses with an optional disk tier.
+
+    Entries are written through to the disk tier as they are stored or
+    refreshed, so they survive a restart, and disk hits are promoted back
+    into memory. Only GET responses carrying an ETag,
+    Last-Modified or a positive ``max-age`` are stored. Entries are keyed
+    by URL and request headers, so requests with different credentials or
+    ``Accept`` headers never share an entry. ``Cache-Control: private``
+    responses are kept in memory only.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.disk = SQLiteCacheTier(disk_path, disk_max_bytes) if disk_path else None
+
+    @staticmethod
+    def key(request: HTTPRequest) -> Optional[str]:
+        """Cache key for ``request``, or None if it is not cacheable."""
+        if request.method.upper() != "GET" or request.body_mode is not BodyMode.DECODE:
+            return None
+        if not request.headers:
+            return request.url
+        headers = sorted(
+            (name.lower(), value) for name, value in request.headers.items()
+        )
+        # Hashed, so credentials are never written to the disk tier
+        digest = hashlib.sha256(json.dumps(headers).encode()).hexdigest()
+        return f"{request.url}\n{digest}"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        if self.disk is None:
+            return None
+        try:
+            entry = await asyncio.to_thread(self.disk.get, key)
+        except sqlite3.Error as e:
+            logger.warning("Cache disk read failed for %s: %s", key, e)
+            return None
+        if entry is not None:
+            self._put_memory(key, entry)
+        return entry
+
+    async def put(self, key: str, entry: CacheEntry) -> None:
+        """Store or refresh ``entry`` in memory and in the disk tier."""
+        self._put_memory(key, entry)
+        await self._write_disk(key, entry)
+
+    def _put_memory(self, key: str, entry: CacheEntry) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old.size
+
+        if entry.size > self.max_bytes:
+            return
+
+        self._entries[key] = entry
+        self.current_bytes += entry.size
+        # Evicted entries are already on disk (unless private)
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+
+    async def _write_disk(self, key: str, entry: CacheEntry) -> None:
+        if self.disk is None or entry.private:
+            return
+        try:
+            await asyncio.to_thread(self.disk.put, key, entry)
+        except sqlite3.Error as e:
+            logger.warning("Cache disk write failed for %s: %s", key, e)
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
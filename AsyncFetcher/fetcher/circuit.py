@@ -0,0 +1,168 @@
+import time
+from enum import Enum
+from typing import Callable, Optional
+
+from .exceptions import CircuitOpenError
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for one host.
+
+    ``failure_threshold`` consecutive failures open the circuit, and requests
+    are then refused for ``reset_timeout`` seconds. After that the circuit is
+    half-open: up to ``half_open_probes`` requests are let through per
+    ``reset_timeout`` period. ``success_threshold`` successes close the
+    circuit again, while any failure re-opens it.
+
+    Probes are counted when admitted rather than when they finish, so a
+    probe that is cancelled cannot keep the circuit half-open forever.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_probes: int = 1,
+        success_threshold: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold <= 0 or half_open_probes <= 0 or success_threshold <= 0:
+            raise ValueError("thresholds and probe counts must be positive")
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.success_threshold = success_threshold
+        self.clock = clock
+
+        self._state = CircuitState.CLOSED
+        self.failures = 0
+        self.successes = 0
+        self.opened_at = 0.0
+        self._probes = 0
+        self._probe_window = 0.0
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and self.clock() - self.opened_at >= self.reset_timeout
+        ):
+            self._half_open()
+        return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until the next request would be let through."""
+        state = self.state
+        if state is CircuitState.OPEN:
+            return self.opened_at + self.reset_timeout - self.clock()
+        if state is CircuitState.HALF_OPEN and self._probes >= self.half_open_probes:
+            return self._probe_window + self.reset_timeout - self.clock()
+        return 0.0
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; counts half-open probes."""
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.OPEN:
+            return False
+
+        now = self.clock()
+        if now - self._probe_window >= self.reset_timeout:
+            self._probe_window = now
+            self._probes = 0
+        if self._probes >= self.half_open_probes:
+            return False
+        self._probes += 1
+        return True
+
+    def on_success(self) -> None:
+        state = self.state
+        if state is CircuitState.CLOSED:
+            self.failures = 0
+        elif state is CircuitState.HALF_OPEN:
+            self.successes += 1
+            if self.successes >= self.success_threshold:
+                self._state = CircuitState.CLOSED
+                self.failures = 0
+
+    def on_failure(self) -> None:
+        state = self.state
+        if state is CircuitState.CLOSED:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._open()
+        elif state is CircuitState.HALF_OPEN:
+            self._open()
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self.opened_at = self.clock()
+
+    def _half_open(self) -> None:
+        self._state = CircuitState.HALF_OPEN
+        self.successes = 0
+        self._probes = 0
+        self._probe_window = self.clock()
+
+
+class HostCircuitBreaker:
+    """
+    Per-host ``CircuitBreaker``s, created lazily on first use.
+
+    Extra keyword arguments are passed to each ``CircuitBreaker``.
+    """
+
+    def __init__(self, **breaker_options):
+        self.breaker_options = breaker_options
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(**self.breaker_options)
+        return breaker
+
+    def state(self, host: str) -> CircuitState:
+        return self.breaker(host).state
+
+    def check(self, host: str) -> None:
+        """
+        Let a request to ``host`` through, or fail fast.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open, or half-open
+                with all probes already in flight.
+        """
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            raise CircuitOpenError(
+                f"Circuit for {host} is {breaker.state.value}, "
+                f"retry in {breaker.retry_in():.1f}s"
+            )
+
+    def record(self, host: str, success: Optional[bool]) -> None:
+        """Report an attempt's outcome; None means it says nothing about the host."""
+        if success is None:
+            return
+        breaker = self.breaker(host)
+        if success:
+            breaker.on_success()
+        else:
+            breaker.on_failure()
+
+    def snapshot(self) -> dict[str, str]:
+        """State of every host that is not closed."""
+        return {
+            host: breaker.state.value
+            for host, breaker in sorted(self._breakers.items())
+            if breaker.state is not CircuitState.CLOSED
+        }
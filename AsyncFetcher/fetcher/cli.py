@@ -0,0 +1,243 @@
+"""
+Stream requests from NDJSON to responses in NDJSON.
+
+Each input line is either a JSON object with ``HTTPRequest`` fields (only
+``url`` is required) or a JSON string holding a URL. Each output line holds
+the selected response fields, or ``error`` for failed requests, plus the
+request's position in the input as ``index``.
+
+Usage:
+cd AsyncFetcher
+python -m fetcher requests.ndjson -o responses.ndjson --concurrency 100
+cat urls.ndjson | python -m fetcher --fields url,status_code --ordered
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import sys
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, BinaryIO, Optional
+
+from .dataclass import BodyMode, FetchResult, HTTPRequest
+from .exceptions import ConfigurationError, FetcherError
+from .fetch import AsyncHTTPFetcher
+from .journal import CrawlJournal
+from .logging import logger
+
+RESPONSE_FIELDS = (
+    "url",
+    "status_code",
+    "headers",
+    "body",
+    "response_time",
+    "attempt",
+    "from_cache",
+)
+DEFAULT_FIELDS = ("url", "status_code", "body", "response_time")
+READ_HINT = 256 * 1024
+
+
+async def read_requests(
+    stream: BinaryIO, defaults: dict[str, Any]
+) -> AsyncIterator[HTTPRequest]:
+    """
+    Parse NDJSON requests, reading about ``READ_HINT`` bytes per thread hop.
+
+    Blank lines are skipped. Lines that cannot be parsed or hold invalid
+    settings are logged and skipped as well, so one bad record does not stop
+    a long run. Records may not set ``sink`` or the ``stream`` body mode.
+    """
+    line_number = 0
+    while True:
+        lines = await asyncio.to_thread(stream.readlines, READ_HINT)
+        if not lines:
+            return
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if isinstance(record, str):
+                    record = {"url": record}
+                if isinstance(record, dict) and "sink" in record:
+                    # Input data must not choose files to write to
+                    raise ConfigurationError("sink cannot be set from input")
+                request = HTTPRequest(**{**defaults, **record})
+                if request.body_mode is BodyMode.STREAM:
+                    raise ConfigurationError("body_mode 'stream' is not supported")
+            except (TypeError, ValueError, FetcherError) as e:
+                logger.error("Skipping input line %d: %s", line_number, e)
+                continue
+            yield request
+
+
+class NDJSONWriter:
+    """
+    Buffered NDJSON output.
+
+    Lines are collected in memory and written by a worker thread once
+    ``buffer_size`` bytes are pending, so the event loop never blocks on
+    per-line file I/O.
+    """
+
+    def __init__(self, stream: BinaryIO, buffer_size: int = 256 * 1024):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+
+    async def write(self, record: dict[str, Any]) -> None:
+        self._buffer += json.dumps(record, default=str).encode() + b"\n"
+        if len(self._buffer) >= self.buffer_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._buffer:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await asyncio.to_thread(self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        self.stream.write(data)
+        self.stream.flush()
+
+
+async def result_record(
+    result: FetchResult, fields: tuple[str, ...]
+) -> dict[str, Any]:
+    record: dict[str, Any] = {"index": result.index}
+    if result.error is not None:
+        record["url"] = result.request.url
+        record["error"] = f"{type(result.error).__name__}: {result.error}"
+        status = getattr(result.error, "status", None)
+        if status is not None:
+            record["status_code"] = status
+        return record
+
+    if "body" in fields:
+        # Large bodies are decoded off the event loop
+        await result.response.load()
+    for field in fields:
+        value = getattr(result.response, field)
+        if isinstance(value, bytes):
+            record[field + "_base64"] = base64.b64encode(value).decode()
+        else:
+            record[field] = value
+    return record
+
+
+async def run(args: argparse.Namespace) -> dict[str, int]:
+    """Run the CLI with parsed ``args``; returns the fetcher's stats."""
+    defaults: dict[str, Any] = {
+        "timeout": args.timeout,
+        "max_retries": args.retries,
+    }
+    if args.body_mode:
+        defaults["body_mode"] = args.body_mode
+
+    async with AsyncExitStack() as stack:
+        if args.input == "-":
+            source = sys.stdin.buffer
+        else:
+            source = stack.enter_context(open(args.input, "rb"))
+        if args.output == "-":
+            sink = sys.stdout.buffer
+        else:
+            sink = stack.enter_context(open(args.output, "wb"))
+        journal = None
+        if args.journal:
+            journal = await stack.enter_async_context(CrawlJournal(args.journal))
+
+        writer = NDJSONWriter(sink)
+        fetcher = await stack.enter_async_context(
+            AsyncHTTPFetcher(
+                max_concurrent=args.concurrency,
+                max_per_host=args.max_per_host,
+                connector_limit=args.connector_limit,
+                default_timeout=args.total_timeout,
+            )
+        )
+        async for result in fetcher.fetch_iter(
+            read_requests(source, defaults),
+            window=args.window,
+            ordered=args.ordered,
+            journal=journal,
+        ):
+            await writer.write(await result_record(result, args.fields))
+        await writer.flush()
+
+    return fetcher.get_stats()
+
+
+def parse_fields(value: str) -> tuple[str, ...]:
+    fields = tuple(field.strip() for field in value.split(",") if field.strip())
+    unknown = set(fields) - set(RESPONSE_FIELDS)
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown fields {sorted(unknown)}; "
+            f"choose from {', '.join(RESPONSE_FIELDS)}"
+        )
+    return fields
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m fetcher", description=__doc__.strip().splitlines()[0]
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="NDJSON file, or - for stdin"
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="NDJSON file, or - for stdout"
+    )
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--max-per-host", type=int, default=None)
+    parser.add_argument("--connector-limit", type=int, default=100)
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=None,
+        help="requests in flight or buffered (default: 2 x concurrency)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=10.0, help="per-attempt timeout"
+    )
+    parser.add_argument(
+        "--total-timeout",
+        type=float,
+        default=60.0,
+        help="session-wide request timeout",
+    )
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument(
+        "--body-mode",
+        choices=[mode.value for mode in BodyMode if mode is not BodyMode.STREAM],
+    )
+    parser.add_argument(
+        "--fields",
+        type=parse_fields,
+        default=DEFAULT_FIELDS,
+        help=f"comma-separated response fields (default: {','.join(DEFAULT_FIELDS)})",
+    )
+    parser.add_argument("--ordered", action="store_true", help="keep input order")
+    parser.add_argument("--journal", help="resume journal path (see CrawlJournal)")
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        default="WARNING",
+        help="log level; per-request INFO logging slows large runs",
+    )
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Entry point; the exit status is 1 if any request failed."""
+    args = build_parser().parse_args(argv)
+    logger.setLevel(args.log_level)
+
+    stats = asyncio.run(run(args))
+    print(json.dumps(stats), file=sys.stderr)
+    return 1 if stats["request_failed"] else 0
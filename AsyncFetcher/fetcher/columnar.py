@@ -0,0 +1,231 @@
+import dataclasses
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+from .dataclass import FetchResult, HTTPRequest
+from .decoding import BodyDecoder, LazyBody, decode
+from .exceptions import ConfigurationError
+
+
+class RequestBatch:
+    """
+    Column-oriented batch of requests that share their settings.
+
+    URLs are kept UTF-8 encoded in one buffer with an offsets array, so a
+    batch costs about the length of its URLs plus 8 bytes per row instead of
+    an ``HTTPRequest``, a ``str`` and a headers dict per row. ``headers`` and
+    the other keyword arguments (any ``HTTPRequest`` field) apply to every
+    row, and rows that differ carry a sparse override dict.
+
+    Iterating yields ``HTTPRequest``s built on demand, so passing a batch to
+    ``fetch_iter`` keeps only the requests in the window alive. Built
+    requests share the batch's headers dict, which must not be mutated.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str] = (),
+        headers: Optional[dict[str, str]] = None,
+        **defaults,
+    ):
+        if "url" in defaults:
+            raise ConfigurationError("url is set per row")
+        try:
+            self._template = HTTPRequest("", headers=headers, **defaults)
+        except TypeError as e:
+            raise ConfigurationError(str(e)) from None
+        self.headers = headers
+        self._buffer = bytearray()
+        self._offsets = array("Q", [0])
+        self._overrides: dict[int, dict[str, Any]] = {}
+        self.extend(urls)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def append(self, url: str, **overrides) -> None:
+        """
+        Add a row; ``overrides`` replace the batch defaults for it.
+
+        Override headers are merged over the batch headers.
+        """
+        if overrides:
+            if "headers" in overrides and self.headers:
+                overrides["headers"] = {**self.headers, **overrides["headers"]}
+            try:
+                dataclasses.replace(self._template, url=url, **overrides)
+            except TypeError as e:
+                raise ConfigurationError(str(e)) from None
+            self._overrides[len(self)] = overrides
+        self._buffer += url.encode()
+        self._offsets.append(len(self._buffer))
+
+    def extend(self, urls: Iterable[str]) -> None:
+        buffer, offsets = self._buffer, self._offsets
+        for url in urls:
+            buffer += url.encode()
+            offsets.append(len(buffer))
+
+    def url(self, index: int) -> str:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._buffer[start:end].decode()
+
+    def __getitem__(self, index: int) -> HTTPRequest:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        # Skips __init__; the defaults and overrides were validated already
+        request = object.__new__(HTTPRequest)
+        request.__dict__.update(self._template.__dict__)
+        request.url = self.url(index)
+        overrides = self._overrides.get(index)
+        if overrides:
+            for name, value in overrides.items():
+                setattr(request, name, value)
+        return request
+
+    def __iter__(self) -> Iterator[HTTPRequest]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the URL columns."""
+        return len(self._buffer) + self._offsets.itemsize * len(self._offsets)
+
+
+@dataclass(slots=True)
+class ResultRow:
+    """One row of a ``ResultTable``, built when it is read."""
+
+    index: int
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    body: Any
+    response_time: float
+    attempt: int
+    from_cache: bool
+    error: Optional[BaseException]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code != 0
+
+
+class ResultTable:
+    """
+    Column-oriented results of a ``RequestBatch``.
+
+    Status codes, response times, attempts and cache flags are stored in
+    typed arrays, headers as flat tuples of interned names and values, and
+    bodies as raw bytes where possible; they are decoded when a row is read.
+    Nothing per row is tracked by the garbage collector apart from bodies
+    that were already decoded, so large tables do not slow down collections.
+
+    ``keep_headers`` limits the headers kept to the given names (matched
+    case-insensitively); an empty collection drops them all. A row with no
+    result yet has ``status_code`` 0 and no error.
+    """
+
+    def __init__(
+        self, batch: RequestBatch, keep_headers: Optional[Iterable[str]] = None
+    ):
+        size = len(batch)
+        self.batch = batch
+        self.keep_headers = (
+            None
+            if keep_headers is None
+            else frozenset(name.lower() for name in keep_headers)
+        )
+        self.status = array("H", bytes(2 * size))
+        self.response_time = array("d", bytes(8 * size))
+        self.attempt = array("B", bytes(size))
+        self.from_cache = bytearray(size)
+        self.headers: list[Optional[tuple]] = [None] * size
+        self.bodies: list[Any] = [None] * size
+        # (content type, charset) of rows whose body is still raw bytes
+        self.encodings: list[Optional[tuple]] = [None] * size
+        self._decoder: Optional[BodyDecoder] = None
+        self._encoding_cache: dict[tuple, tuple] = {}
+        self.errors: dict[int, BaseException] = {}
+        self.completed = 0
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def add(self, result: FetchResult) -> None:
+        """Store ``result`` in its row, keeping none of its objects but the body."""
+        index = result.index
+        self.completed += 1
+        if result.error is not None:
+            self.errors[index] = result.error
+            self.status[index] = getattr(result.error, "status", 0) or 0
+            return
+
+        response = result.response
+        self.status[index] = response.status_code
+        self.response_time[index] = response.response_time
+        self.attempt[index] = min(response.attempt, 255)
+        self.from_cache[index] = response.from_cache
+        self.headers[index] = self._pack_headers(response.headers)
+        lazy = response.lazy_body
+        if lazy is None:
+            self.bodies[index] = response.body
+            return
+        if self._decoder is None:
+            self._decoder = lazy.decoder
+        if lazy.decoder is not self._decoder:
+            self.bodies[index] = lazy
+            return
+        self.bodies[index] = lazy.raw
+        encoding = (lazy.content_type, lazy.charset)
+        self.encodings[index] = self._encoding_cache.setdefault(encoding, encoding)
+
+    def _pack_headers(self, headers: dict[str, str]) -> tuple:
+        keep = self.keep_headers
+        if keep is not None and not keep:
+            return ()
+        intern = sys.intern
+        packed = []
+        if keep is None:
+            for name, value in headers.items():
+                packed += (intern(name), value)
+        else:
+            for name, value in headers.items():
+                if name.lower() in keep:
+                    packed += (intern(name), value)
+        return tuple(packed)
+
+    def __getitem__(self, index: int) -> ResultRow:
+        if index < 0:
+            index += len(self)
+        packed = self.headers[index] or ()
+        body = self.bodies[index]
+        encoding = self.encodings[index]
+        if encoding is not None:
+            body = decode(self._decoder.json_loads, body, *encoding)
+        elif isinstance(body, LazyBody):
+            body = body.decode()
+        return ResultRow(
+            index=index,
+            url=self.batch.url(index),
+            status_code=self.status[index],
+            headers=dict(zip(packed[::2], packed[1::2])),
+            body=body,
+            response_time=self.response_time[index],
+            attempt=self.attempt[index],
+            from_cache=bool(self.from_cache[index]),
+            error=self.errors.get(index),
+        )
+
+    def __iter__(self) -> Iterator[ResultRow]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
@@ -0,0 +1,116 @@
+import asyncio
+import gzip
+import json
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from aiohttp.compression_utils import HAS_BROTLI, HAS_ZSTD
+
+from .exceptions import ConfigurationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:  # pragma: no cover - optional dependency
+    try:
+        from backports import zstd
+    except ImportError:
+        zstd = None
+
+DEFAULT_THRESHOLD = 1024
+DEFAULT_OFFLOAD_THRESHOLD = 256 * 1024
+
+
+def response_encodings() -> list[str]:
+    """
+    Content codings aiohttp can decode here, best first.
+
+    ``br`` needs ``brotli`` (or ``brotlicffi``) and ``zstd`` needs Python
+    3.14 or ``backports.zstd``.
+    """
+    encodings = []
+    if HAS_ZSTD:
+        encodings.append("zstd")
+    if HAS_BROTLI:
+        encodings.append("br")
+    return encodings + ["gzip", "deflate"]
+
+
+def request_encodings() -> list[str]:
+    """Codings ``RequestCompression`` can produce here."""
+    return ["gzip", "zstd"] if zstd is not None else ["gzip"]
+
+
+def _dumps(data: Any) -> bytes:
+    if orjson is not None:
+        # Non-str keys are converted like the standard library does
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedBody:
+    """A request body ready to send, with the headers that describe it."""
+
+    data: bytes
+    headers: dict[str, str]
+    size: int  # before compression
+
+
+class RequestCompression:
+    """
+    Compresses JSON request bodies of at least ``threshold`` bytes.
+
+    ``encoding`` is ``"gzip"`` or ``"zstd"``; the server must accept it in
+    ``Content-Encoding``. Bodies of at least ``offload_threshold`` bytes
+    are compressed in ``executor`` (the loop's thread pool by default), so
+    the event loop keeps running; both codecs release the GIL.
+    """
+
+    def __init__(
+        self,
+        encoding: str = "gzip",
+        threshold: int = DEFAULT_THRESHOLD,
+        level: Optional[int] = None,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        executor: Optional[Executor] = None,
+    ):
+        if encoding not in ("gzip", "zstd"):
+            raise ConfigurationError(f"Unknown request encoding {encoding!r}")
+        if encoding == "zstd" and zstd is None:
+            raise ConfigurationError(
+                "zstd needs Python 3.14 or the backports.zstd package"
+            )
+        if threshold < 0 or offload_threshold < 0:
+            raise ConfigurationError("Thresholds must not be negative.")
+        self.encoding = encoding
+        self.threshold = threshold
+        self.level = level
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+
+    def compress(self, raw: bytes) -> bytes:
+        if self.encoding == "zstd":
+            return zstd.compress(raw, level=self.level)
+        level = 6 if self.level is None else self.level
+        return gzip.compress(raw, compresslevel=level, mtime=0)
+
+    async def encode(self, data: Any) -> EncodedBody:
+        """Serialize ``data`` as JSON and compress it if it is large enough."""
+        raw = _dumps(data)
+        headers = {"Content-Type": "application/json"}
+        if len(raw) < self.threshold:
+            return EncodedBody(raw, headers, len(raw))
+
+        if len(raw) >= self.offload_threshold:
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(self.executor, self.compress, raw)
+        else:
+            body = self.compress(raw)
+        headers["Content-Encoding"] = self.encoding
+        return EncodedBody(body, headers, len(raw))
@@ -1,7 +1,27 @@
+import copy
+import os
 from dataclasses import dataclass
-from typing import Any, Optional
+from enum import Enum
+from typing import Any, Awaitable, Callable, Optional, Union
 from urllib import response
 
+from .decoding import LazyBody
+from .exceptions import ConfigurationError
+
+
+class BodyMode(str, Enum):
+    """How the fetcher handles a response body."""
+
+    DECODE = "decode"  # parse JSON or decode text
+    DISCARD = "discard"  # read and drop; body is None
+    BYTES = "bytes"  # raw bytes
+    PREFIX = "prefix"  # first ``prefix_size`` bytes, rest is not downloaded
+    STREAM = "stream"  # write chunks to ``sink``; body is the byte count
+
+
+# An async callable receiving each chunk, or a file path to write to
+BodySink = Union[Callable[[bytes], Awaitable[None]], str, os.PathLike]
+
 
 @dataclass
 class HTTPRequest:
@@ -13,15 +33,107 @@ class HTTPRequest:
     data: Optional[dict[str, Any]] = None
     timeout: float = 10.0
     max_retries: int = 3
+    body_mode: BodyMode = BodyMode.DECODE
+    max_body_size: Optional[int] = None
+    prefix_size: int = 64 * 1024
+    sink: Optional[BodySink] = None
+    priority: int = 0  # higher is served first
+    deadline: Optional[float] = None  # absolute, in time.time() seconds
+
+    def __post_init__(self):
+        try:
+            self.body_mode = BodyMode(self.body_mode)
+        except ValueError:
+            raise ConfigurationError(f"Unknown body_mode {self.body_mode!r}")
+        if self.body_mode is BodyMode.STREAM and self.sink is None:
+            raise ConfigurationError("body_mode 'stream' requires a sink")
+        if self.prefix_size <= 0:
+            raise ConfigurationError("prefix_size must be positive.")
+        if self.max_body_size is not None and self.max_body_size < 0:
+            raise ConfigurationError("max_body_size must not be negative.")
+
+
+class _LazyField:
+    """
+    Dataclass field descriptor that resolves a ``LazyBody`` on first read.
+
+    Reading the descriptor from the class raises ``AttributeError`` so that
+    the dataclass still treats the field as required.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.attr = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            raise AttributeError(self.name)
+        value = obj.__dict__[self.attr]
+        if isinstance(value, LazyBody):
+            value = value.decode()
+            obj.__dict__[self.attr] = value
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.attr] = value
 
 
 @dataclass
 class HTTPResponse:
-    """Represents an HTTP response received."""
+    """
+    Represents an HTTP response received.
+
+    ``body`` may be given as a ``LazyBody``; it is then decoded the first time
+    it is read (or by ``await load()``, which can decode large bodies off the
+    event loop).
+    """
 
     url: str
     status_code: int
     headers: dict[str, str]
-    body: Any
+    body: Any = _LazyField()
     response_time: float
     attempt: int
+    from_cache: bool = False
+
+    @property
+    def lazy_body(self) -> Optional[LazyBody]:
+        """The pending ``LazyBody``, or None once the body has been decoded."""
+        value = self.__dict__["_body"]
+        return value if isinstance(value, LazyBody) else None
+
+    @property
+    def raw(self) -> Optional[bytes]:
+        """Undecoded body bytes, while the body has not been decoded yet."""
+        pending = self.lazy_body
+        return pending.raw if pending is not None else None
+
+    def copy(self) -> "HTTPResponse":
+        """
+        Shallow copy with its own headers dict. A pending body is shared
+        but decoded separately by each copy, so it is not decoded here.
+        """
+        duplicate = copy.copy(self)
+        duplicate.headers = dict(self.headers)
+        return duplicate
+
+    async def load(self) -> Any:
+        """Decode the body, in an executor if it is large, and return it."""
+        pending = self.lazy_body
+        if pending is not None:
+            self.body = await pending.decode_async()
+        return self.body
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one request streamed by ``AsyncHTTPFetcher.fetch_iter``."""
+
+    index: int
+    request: HTTPRequest
+    response: Optional[HTTPResponse] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
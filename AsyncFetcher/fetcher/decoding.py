@@ -0,0 +1,132 @@
+import asyncio
+import json
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional, Union
+
+from .exceptions import ConfigurationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+JSONLoads = Callable[[bytes], Any]
+
+DEFAULT_OFFLOAD_THRESHOLD = 1024 * 1024
+
+
+def get_json_decoder(name: str = "auto") -> JSONLoads:
+    """
+    Return a ``bytes -> object`` JSON decoder by name.
+
+    ``"auto"`` picks the fastest installed library: ``orjson``, then
+    ``msgspec``, then the standard library ``json``.
+    """
+    if name == "auto":
+        name = "orjson" if orjson else "msgspec" if msgspec else "json"
+
+    if name == "json":
+        return json.loads
+    if name == "orjson":
+        if orjson is None:
+            raise ConfigurationError("orjson is not installed")
+        return orjson.loads
+    if name == "msgspec":
+        if msgspec is None:
+            raise ConfigurationError("msgspec is not installed")
+        return msgspec.json.decode
+    raise ConfigurationError(f"Unknown JSON decoder {name!r}")
+
+
+class ErrorBody(str):
+    """
+    The error text that stands in for a body that could not be read or
+    decoded. It is a ``str``, so callers see the same message as before, but
+    it is never stored as if it were the body.
+    """
+
+
+def decode(
+    json_loads: JSONLoads, raw: bytes, content_type: str, charset: Optional[str]
+) -> Any:
+    """Decode a body as JSON or text; failures become an ``ErrorBody``."""
+    try:
+        if "application/json" in content_type:
+            return json_loads(raw)
+        return raw.decode(charset or "utf-8", errors="replace")
+    except Exception as e:
+        return ErrorBody(f"Error reading data {e}")
+
+
+class BodyDecoder:
+    """
+    Decoding settings shared by the lazy bodies of one fetcher.
+
+    Bodies of at least ``offload_threshold`` bytes are decoded in
+    ``executor`` by ``LazyBody.decode_async``. The default executor is the
+    loop's thread pool. Pass a ``ProcessPoolExecutor`` to keep pure-Python
+    decoders from holding the GIL.
+    """
+
+    def __init__(
+        self,
+        json_decoder: Union[str, JSONLoads] = "auto",
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        executor: Optional[Executor] = None,
+    ):
+        self.json_loads = (
+            json_decoder if callable(json_decoder) else get_json_decoder(json_decoder)
+        )
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+
+    def __getstate__(self):
+        # Executors cannot be pickled; unpickled copies use the default one
+        state = self.__dict__.copy()
+        state["executor"] = None
+        return state
+
+    def lazy(self, raw: bytes, content_type: str, charset: Optional[str]) -> "LazyBody":
+        return LazyBody(raw, content_type, charset, self)
+
+
+class LazyBody:
+    """Raw body bytes that are decoded on first access."""
+
+    __slots__ = ("raw", "content_type", "charset", "decoder")
+
+    def __init__(
+        self,
+        raw: bytes,
+        content_type: str,
+        charset: Optional[str],
+        decoder: BodyDecoder,
+    ):
+        self.raw = raw
+        self.content_type = content_type
+        self.charset = charset
+        self.decoder = decoder
+
+    def __reduce__(self):
+        return (LazyBody, (self.raw, self.content_type, self.charset, self.decoder))
+
+    def decode(self) -> Any:
+        return decode(self.decoder.json_loads, self.raw, self.content_type, self.charset)
+
+    async def decode_async(self) -> Any:
+        if len(self.raw) < self.decoder.offload_threshold:
+            return self.decode()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.decoder.executor,
+            decode,
+            self.decoder.json_loads,
+            self.raw,
+            self.content_type,
+            self.charset,
+        )
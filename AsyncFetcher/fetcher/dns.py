@@ -0,0 +1,119 @@
+import asyncio
+import socket
+import time
+from typing import Any, Callable
+
+from aiohttp.abc import AbstractResolver, ResolveResult
+from aiohttp.resolver import ThreadedResolver
+
+from .logging import logger
+
+
+class CachingResolver(AbstractResolver):
+    """
+    DNS cache that can be shared by many sessions and event loops.
+
+    Each ``aiohttp.TCPConnector`` keeps its own DNS cache, which is lost
+    when its session closes. Passing one ``CachingResolver`` as
+    ``resolver=`` to every connector (``AsyncHTTPFetcher(resolver=...)``,
+    ``APIClient(resolver=...)``) makes lookups once per ``ttl`` seconds for
+    the whole process instead.
+
+    On a miss the lookup goes to a resolver built by ``resolver_factory``
+    on the calling loop (``ThreadedResolver`` by default, which runs
+    ``getaddrinfo`` in the default executor). Concurrent lookups of the same
+    name on one loop share a single query. Failed lookups are not cached.
+
+    ``close()`` does nothing, because the resolver outlives the connectors
+    that use it; ``clear()`` drops the cached entries.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 10_000,
+        resolver_factory: Callable[[], AbstractResolver] = ThreadedResolver,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl <= 0 or max_entries <= 0:
+            raise ValueError("ttl and max_entries must be positive")
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.resolver_factory = resolver_factory
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[tuple, tuple[float, list[ResolveResult]]] = {}
+        self._pending: dict[tuple, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> list[ResolveResult]:
+        key = (host, port, family)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self.clock():
+            self.hits += 1
+            return list(entry[1])
+
+        # Futures belong to one loop, so sharing is per loop
+        flight = (asyncio.get_running_loop(), key)
+        while (pending := self._pending.get(flight)) is not None:
+            try:
+                results = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The lookup we joined was cancelled, not us: run our own
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+            self.hits += 1
+            return list(results)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[flight] = future
+        try:
+            results = await self._lookup(host, port, family)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here so a lookup nobody else waited on is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(results)
+            self._store(key, results)
+            return list(results)
+        finally:
+            del self._pending[flight]
+
+    async def _lookup(
+        self, host: str, port: int, family: socket.AddressFamily
+    ) -> list[ResolveResult]:
+        resolver = self.resolver_factory()
+        try:
+            return await resolver.resolve(host, port, family)
+        finally:
+            await resolver.close()
+
+    def _store(self, key: tuple, results: list[ResolveResult]) -> None:
+        self._entries.pop(key, None)
+        while len(self._entries) >= self.max_entries:
+            # Dicts keep insertion order, so this drops the oldest entry
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (self.clock() + self.ttl, results)
+        logger.debug("Cached %d addresses for %s:%s", len(results), key[0], key[1])
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    async def close(self) -> None:
+        pass
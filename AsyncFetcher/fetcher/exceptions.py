@@ -0,0 +1,34 @@
+class FetcherError(Exception):
+    """Base exception for fetcher operations."""
+
+    pass
+
+
+class BodyTooLargeError(FetcherError):
+    """Raised when a response body exceeds the request's ``max_body_size``."""
+
+    pass
+
+
+class ConfigurationError(FetcherError):
+    """Raised when a request or fetcher option is invalid."""
+
+    pass
+
+
+class WorkerError(FetcherError):
+    """Raised for failures inside a shard worker process."""
+
+    pass
+
+
+class CircuitOpenError(FetcherError):
+    """Raised without a network call while a host's circuit is open."""
+
+    pass
+
+
+class DeadlineExceededError(FetcherError):
+    """Raised when a request's deadline passes before it could be completed."""
+
+    pass
@@ -1,9 +1,89 @@
 import asyncio
 import time
-from typing import Optional
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Optional, Union
+from urllib.parse import urlsplit
 import aiohttp
+from aiohttp.abc import AbstractResolver
 from .logging import logger
-from .dataclass import HTTPRequest, HTTPResponse
+from .body import read_body
+from .cache import CacheEntry, ResponseCache
+from .dataclass import FetchResult, HTTPRequest, HTTPResponse
+from .circuit import HostCircuitBreaker
+from .compression import EncodedBody, RequestCompression, response_encodings
+from .columnar import RequestBatch, ResultTable
+from .decoding import DEFAULT_OFFLOAD_THRESHOLD, BodyDecoder, JSONLoads
+from .exceptions import (
+    CircuitOpenError,
+    ConfigurationError,
+    DeadlineExceededError,
+    FetcherError,
+)
+from .frontier import CrawlFrontier, html_links
+from .hedging import HedgePolicy, can_hedge
+from .journal import CrawlJournal
+from .limiter import AdaptiveLimit
+from .metrics import DEFAULT_MAX_HOSTS, UNTRACKED, FetcherMetrics
+from .ratelimit import (
+    MAX_RETRY_AFTER,
+    THROTTLE_STATUSES,
+    HostRateLimiter,
+    parse_retry_after,
+)
+from .retry import RetryBudget, RetryPolicy
+from .scheduler import HostScheduler, host_key
+from .singleflight import SingleFlight, flight_key
+from .transport import Transport
+
+
+_EXHAUSTED = object()
+
+
+def _host_healthy(error: Exception) -> Optional[bool]:
+    """
+    What a failed attempt says about its host, for the circuit breaker.
+
+    Transport errors, timeouts and 5xx answers count against the host.
+    Throttling is left to the rate limiter, and other 4xx answers show that
+    the host is up.
+    """
+    if not isinstance(error, aiohttp.ClientResponseError):
+        return False
+    if error.status in THROTTLE_STATUSES:
+        return None
+    return error.status < 500
+
+
+def _check_deadline(request: HTTPRequest) -> Optional[float]:
+    """
+    Seconds left until the request's deadline, or None without one.
+
+    Raises:
+        DeadlineExceededError: If the deadline has passed.
+    """
+    if request.deadline is None:
+        return None
+    remaining = request.deadline - time.time()
+    if remaining <= 0:
+        raise DeadlineExceededError(f"Deadline passed for {request.url}")
+    return remaining
+
+
+def _loop_deadline(deadline: Optional[float]) -> Optional[float]:
+    """Convert a ``time.time()`` deadline to the running loop's clock."""
+    if deadline is None:
+        return None
+    loop = asyncio.get_running_loop()
+    return loop.time() + (deadline - time.time())
+
+
+async def _drain(response: aiohttp.ClientResponse) -> None:
+    """Read and drop an error response's body."""
+    try:
+        await response.read()
+    except aiohttp.ClientError:
+        # The status is what gets reported; the connection is not reused
+        pass
 
 
 async def simple_coroutine():
@@ -13,28 +93,97 @@ async def simple_coroutine():
 
 class AsyncHTTPFetcher:
 
-    def __init__(self, max_concurrent: int = 10, default_timeout: float = 10.09):
+    def __init__(
+        self,
+        max_concurrent: int = 10,
+        default_timeout: float = 10.09,
+        max_per_host: Optional[int] = None,
+        host_weights: Optional[dict[str, int]] = None,
+        connector_limit: int = 100,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        coalesce: bool = True,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        json_decoder: Union[str, JSONLoads] = "auto",
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        decode_executor: Optional[Executor] = None,
+        concurrency_limit: Optional[AdaptiveLimit] = None,
+        hedging: Optional[HedgePolicy] = None,
+        circuit_breaker: Optional[HostCircuitBreaker] = None,
+        resolver: Optional[AbstractResolver] = None,
+        transport: Optional[Transport] = None,
+        compression: Optional[RequestCompression] = None,
+        accept_encoding: Optional[str] = None,
+        metrics_max_hosts: Optional[int] = DEFAULT_MAX_HOSTS,
+    ):
         self.max_concurrent = max_concurrent
         self.default_timeout = default_timeout
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_per_host = max_per_host
+        self.connector_limit = connector_limit
+        # Shared resolvers (see CachingResolver) outlive the session
+        self.resolver = resolver
+        # Replaces self.session for requests (see fetcher.transport)
+        self.transport = transport
+        # Request bodies are compressed; responses are decoded by aiohttp
+        self.compression = compression
+        self.accept_encoding = accept_encoding or ", ".join(response_encodings())
+        # An adaptive limit replaces the fixed max_concurrent
+        self.concurrency_limit = concurrency_limit
+        self.scheduler = HostScheduler(
+            concurrency_limit.limit if concurrency_limit else max_concurrent,
+            max_per_host,
+            host_weights,
+        )
+        self.retry_policy = retry_policy or RetryPolicy(budget=RetryBudget())
+        self.cache = cache
+        self.single_flight = SingleFlight() if coalesce else None
+        self.rate_limiter = rate_limiter
+        self.hedging = hedging
+        self.circuit_breaker = circuit_breaker
+        self.body_decoder = BodyDecoder(
+            json_decoder, offload_threshold, decode_executor
+        )
+        self.metrics = FetcherMetrics(max_hosts=metrics_max_hosts)
+        self.clock = time.perf_counter
         self.session: Optional[aiohttp.ClientSession] = None
         self.stats: dict[str, int] = {
             "request_made": 0,
             "request_failed": 0,
             "request_succeeded": 0,
             "total_retries": 0,
+            "retries_throttled": 0,
+            "cache_hits": 0,
+            "cache_revalidated": 0,
+            "request_deduplicated": 0,
+            "request_throttled": 0,
+            "hedges_sent": 0,
+            "hedges_won": 0,
+            "request_short_circuited": 0,
+            "request_expired": 0,
+            "bodies_compressed": 0,
+            "body_bytes_saved": 0,
         }
 
     async def __aenter__(self):
         """Async context manager entry."""
         self.session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=self.default_timeout),
-            connector=aiohttp.TCPConnector(limit=100),
+            headers={"Accept-Encoding": self.accept_encoding},
+            connector=aiohttp.TCPConnector(
+                limit=self.connector_limit,
+                limit_per_host=self.max_per_host or 0,
+                resolver=self.resolver,
+            ),
+            trace_configs=[self.metrics.trace_config()],
         )
+        if self.transport is not None:
+            await self.transport.open(self.session)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
+        if self.transport is not None:
+            await self.transport.close()
         if self.session:
             await self.session.close()
 
@@ -42,91 +191,475 @@ class AsyncHTTPFetcher:
         await asyncio.sleep(0.1)
 
     async def fetch_single(self, request: HTTPRequest) -> HTTPResponse:
-        """Fetch a single HTTP request with retries and timeout."""
-        async with self.semaphore:
-            for attempt in range(request.max_retries + 1):
-                start = time.time()
-                try:
-                    self.stats["request_made"] += 1
-                    async with self.session.request(
-                        method=request.method,
-                        url=request.url,
-                        headers=request.headers,
-                        json=request.data if request.method != "GET" else None,
-                        timeout=aiohttp.ClientTimeout(total=request.timeout),
-                    ) as response:
-                        try:
-                            if "application/json" in response.content_type:
-                                data = await response.json()
-                            else:
-                                data = await response.text()
-                        except Exception as e:
-                            data = f"Error reading data {e}"
-
-                    response_time = time.time() - start
-
-                    result = HTTPResponse(
-                        url=request.url,
-                        status_code=response.status,
-                        headers=dict(response.headers),
-                        body=data,
-                        response_time=response_time,
-                        attempt=attempt + 1,
-                    )
+        """
+        Fetch a single HTTP request with retries and timeout.
+
+        Identical GET/HEAD requests that are already in flight share that
+        call's result instead of opening another connection. Each caller
+        gets its own copy of the response.
+        """
+        key = flight_key(request) if self.single_flight is not None else None
+        if key is None:
+            return await self._fetch(request)
+
+        if self.single_flight.in_flight(key):
+            self.stats["request_deduplicated"] += 1
+            logger.debug("Joined in-flight request for %s", request.url)
+        response = await self.single_flight.do(key, lambda: self._fetch(request))
+        return response.copy()
+
+    async def prewarm(
+        self,
+        origins: Iterable[str],
+        connections: int = 1,
+        timeout: Optional[float] = None,
+    ) -> dict[str, int]:
+        """
+        Resolve hosts and open keep-alive connections before a batch starts.
+
+        Each origin may be a URL or a bare host name (taken as ``https``).
+        ``connections`` concurrent HEAD requests are sent to the root of each
+        origin, capped at ``max_per_host``; their connections go back to the
+        pool, so the first requests of the batch skip DNS, TCP and TLS set-up.
+        Pre-warm requests do not count in stats or in any metrics, including
+        connections and bytes, but they do go through the rate limiter. Failures are logged and skipped.
+
+        Returns:
+            Connections opened (or reused) per origin.
+        """
+        if self.max_per_host:
+            connections = min(connections, self.max_per_host)
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.default_timeout)
+
+        async def warm(origin: str) -> bool:
+            host = host_key(origin)
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(host)
+            try:
+                async with self._requester().request(
+                    "HEAD",
+                    origin,
+                    timeout=client_timeout,
+                    allow_redirects=False,
+                    trace_request_ctx=UNTRACKED,
+                ) as response:
+                    await response.read()
+                return True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning("Pre-warm of %s failed: %r", origin, e)
+                return False
+
+        opened: dict[str, int] = {}
+        for origin in origins:
+            if "://" not in origin:
+                origin = f"https://{origin}"
+            parts = urlsplit(origin)
+            opened[f"{parts.scheme}://{parts.netloc}/"] = 0
+
+        attempts = [origin for origin in opened for _ in range(connections)]
+        results = await asyncio.gather(*(warm(origin) for origin in attempts))
+        for origin, ok in zip(attempts, results):
+            opened[origin] += ok
+        logger.info(
+            "Pre-warmed %d connections to %d origins",
+            sum(opened.values()),
+            len(opened),
+        )
+        return opened
+
+    async def _fetch(self, request: HTTPRequest) -> HTTPResponse:
+        """Fetch ``request`` through the cache, scheduler and retry loop."""
+        host = host_key(request.url)
+        cache_key = self.cache.key(request) if self.cache is not None else None
+        cached = await self.cache.get(cache_key) if cache_key else None
+        if cached is not None and cached.is_fresh():
+            self.stats["cache_hits"] += 1
+            logger.info("Cache hit %s", request.url)
+            return cached.to_response(0.0, 0, self.body_decoder)
+
+        self.retry_policy.record_request()
+        hedge = self.hedging is not None and can_hedge(request)
+        if hedge:
+            self.hedging.record_request()
 
-                    if response.status >= 400:
-                        raise aiohttp.ClientResponseError(
-                            request_info=response.request_info,
-                            history=response.history,
-                            status=response.status,
-                            message=f"HTTP Error {response.status}",
-                            headers=response.headers,
+        body: Optional[EncodedBody] = None
+        for attempt in range(request.max_retries + 1):
+            try:
+                if attempt == 0:
+                    # Encoded once, so retries and hedges resend the same bytes
+                    body = await self._encode_body(request)
+                _check_deadline(request)
+                # An open circuit fails fast, before any waiting
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.check(host)
+                # Rate-limit waits happen before taking a concurrency slot
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire(host)
+                queued = self.clock()
+                async with self.scheduler.slot(
+                    host, request.priority, request.deadline
+                ):
+                    self.metrics.observe_slot_wait(self.clock() - queued)
+                    if hedge:
+                        result = await self._hedged_attempt(
+                            request, attempt, cached, body
                         )
-                    self.stats["request_succeeded"] += 1
-                    logger.info(
-                        f"Success {request.url} - {response.status} ({response_time:.2f}s)"
+                    else:
+                        result = await self._attempt(request, attempt, cached, body)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.on_response(host, result.status_code)
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(host, True)
+                if cache_key:
+                    await self._update_cache(cache_key, result, cached)
+                return result
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retry_after = self._throttle_delay(host, e)
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(host, _host_healthy(e))
+
+                if attempt == request.max_retries:
+                    self.stats["request_failed"] += 1
+                    logger.error(
+                        "Failed %s after %d attempts: %s", request.url, attempt + 1, e
                     )
-                    return result
+                    raise
 
-                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                    response_time = time.time() - start
+                if not self.retry_policy.allow_retry():
+                    self.stats["request_failed"] += 1
+                    self.stats["retries_throttled"] += 1
+                    logger.error(
+                        "Failed %s after %d attempts: %s (retry budget exhausted)",
+                        request.url,
+                        attempt + 1,
+                        e,
+                    )
+                    raise
 
-                    if attempt == request.max_retries:
-                        self.stats["request_failed"] += 1
-                        logger.error(
-                            f"Failed {request.url} after {attempt+1} attempts: {e}"
-                        )
-                        raise
+                # The slot is released before sleeping, so backoff does not
+                # hold concurrency that other requests could use
+                delay = self.retry_policy.backoff(attempt)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                if (
+                    request.deadline is not None
+                    and time.time() + delay >= request.deadline
+                ):
+                    self.stats["request_failed"] += 1
+                    self.stats["request_expired"] += 1
+                    logger.error(
+                        "Failed %s after %d attempts: %s (deadline reached)",
+                        request.url,
+                        attempt + 1,
+                        e,
+                    )
+                    raise DeadlineExceededError(
+                        f"Deadline reached before retrying {request.url}"
+                    ) from e
+                self.stats["total_retries"] += 1
+                logger.warning(
+                    "Warning %s - Attempt %d failed (%s), retrying in %.2fs",
+                    request.url,
+                    attempt + 1,
+                    e,
+                    delay,
+                )
 
-                    delay = min(2**attempt, 30)
-                    self.stats["total_retries"] += 1
-                    logger.warning(
-                        f"Warning {request.url} - Attempt {attempt + 1} failed ({e}), "
-                        f"retrying in {delay}s"
+                await asyncio.sleep(delay)
+
+            except DeadlineExceededError as e:
+                self.stats["request_failed"] += 1
+                self.stats["request_expired"] += 1
+                logger.warning("Dropped %s: %s", request.url, e)
+                raise
+
+            except CircuitOpenError as e:
+                self.stats["request_failed"] += 1
+                self.stats["request_short_circuited"] += 1
+                logger.warning("Failed fast %s: %s", request.url, e)
+                raise
+
+            except FetcherError as e:
+                self.stats["request_failed"] += 1
+                logger.error("Failed %s: %s", request.url, e)
+                raise
+
+            except Exception as e:
+                logger.exception("Unexpected error for %s: %s", request.url, e)
+                raise
+
+    async def _encode_body(self, request: HTTPRequest) -> Optional[EncodedBody]:
+        """
+        Serialize and compress ``request.data`` when compression is on.
+
+        Raises:
+            ConfigurationError: If ``request.data`` cannot be serialized
+        """
+        if self.compression is None or request.method == "GET":
+            return None
+        if request.data is None:
+            return None
+        try:
+            body = await self.compression.encode(request.data)
+        except (TypeError, ValueError) as e:
+            raise ConfigurationError(
+                f"Cannot encode the body of {request.url}: {e}"
+            ) from e
+        if "Content-Encoding" in body.headers:
+            self.stats["bodies_compressed"] += 1
+            self.stats["body_bytes_saved"] += body.size - len(body.data)
+        return body
+
+    @staticmethod
+    def _body_kwargs(request: HTTPRequest, body: Optional[EncodedBody]) -> dict:
+        if body is not None:
+            return {"data": body.data}
+        return {"json": request.data if request.method != "GET" else None}
+
+    def _requester(self) -> Union[aiohttp.ClientSession, Transport]:
+        return self.transport if self.transport is not None else self.session
+
+    def _throttle_delay(self, host: str, error: Exception) -> Optional[float]:
+        """Record a 429/503 and return the server's Retry-After delay, if any."""
+        if not isinstance(error, aiohttp.ClientResponseError):
+            return None
+        if self.rate_limiter is not None:
+            self.rate_limiter.on_response(host, error.status, error.headers)
+        if error.status not in THROTTLE_STATUSES:
+            return None
+
+        self.stats["request_throttled"] += 1
+        retry_after = parse_retry_after(error.headers)
+        if retry_after is not None:
+            retry_after = min(retry_after, MAX_RETRY_AFTER)
+        return retry_after
+
+    async def _attempt(
+        self,
+        request: HTTPRequest,
+        attempt: int,
+        cached: Optional[CacheEntry] = None,
+        body: Optional[EncodedBody] = None,
+    ) -> HTTPResponse:
+        """
+        Perform one network attempt; raises on transport or HTTP errors.
+
+        With a ``cached`` entry the request is sent as a conditional request,
+        and a 304 answer is turned into the cached response. An encoded
+        ``body`` is sent instead of ``request.data``.
+        """
+        host = host_key(request.url)
+        headers = request.headers
+        if cached is not None:
+            headers = {**(request.headers or {}), **cached.validators()}
+        if body is not None:
+            headers = {**body.headers, **(headers or {})}
+
+        timeout = request.timeout
+        remaining = _check_deadline(request)
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+
+        self.stats["request_made"] += 1
+        start = self.clock()
+        try:
+            async with self._requester().request(
+                method=request.method,
+                url=request.url,
+                headers=headers,
+                **self._body_kwargs(request, body),
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                self.metrics.observe_ttfb(host, self.clock() - start)
+                if response.status >= 400:
+                    # Error pages never reach the sink or count against
+                    # max_body_size; they are drained so a retry can follow
+                    await _drain(response)
+                    data = None
+                else:
+                    data = await read_body(
+                        request, response, self.body_decoder, self.metrics
                     )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            duration = self.clock() - start
+            self.metrics.observe_request(host, None, duration)
+            if isinstance(e, asyncio.TimeoutError):
+                self._sample_limit(duration, dropped=True)
+            raise
 
-                    await asyncio.sleep(delay)
+        response_time = self.clock() - start
+        self.metrics.observe_request(host, response.status, response_time)
+        if response.status in THROTTLE_STATUSES:
+            self._sample_limit(response_time, dropped=True)
+        elif response.status < 500:
+            self._sample_limit(response_time)
 
-                except Exception as e:
-                    logger.exception(f"Unexpected error for {request.url}: {e}")
-                    raise
+        if response.status == 304 and cached is not None:
+            self.stats["request_succeeded"] += 1
+            self.stats["cache_revalidated"] += 1
+            logger.info("Not modified %s (%.2fs)", request.url, response_time)
+            cached.refresh(dict(response.headers))
+            return cached.to_response(response_time, attempt + 1, self.body_decoder)
+
+        if response.status >= 400:
+            raise aiohttp.ClientResponseError(
+                request_info=response.request_info,
+                history=response.history,
+                status=response.status,
+                message=f"HTTP Error {response.status}",
+                headers=response.headers,
+            )
+
+        result = HTTPResponse(
+            url=request.url,
+            status_code=response.status,
+            headers=dict(response.headers),
+            body=data,
+            response_time=response_time,
+            attempt=attempt + 1,
+        )
+        self.stats["request_succeeded"] += 1
+        logger.info(
+            "Success %s - %d (%.2fs)", request.url, response.status, response_time
+        )
+        return result
+
+    async def _hedged_attempt(
+        self,
+        request: HTTPRequest,
+        attempt: int,
+        cached: Optional[CacheEntry] = None,
+        body: Optional[EncodedBody] = None,
+    ) -> HTTPResponse:
+        """
+        Run ``_attempt``, racing a second copy if it is slower than usual.
+
+        The hedge is sent after the host's hedging quantile, and only if the
+        hedge budget, the scheduler and the rate limiter all allow it without
+        waiting. The first successful attempt wins and the other is cancelled.
+        If both fail, the first attempt's error is raised.
+        """
+        host = host_key(request.url)
+        primary = asyncio.ensure_future(
+            self._attempt(request, attempt, cached, body)
+        )
+        attempts = [primary]
+        hedge_slot = False
+        try:
+            label = self.metrics.label(host)
+            delay = self.hedging.delay(self.metrics.latency.get((label, "2xx")))
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            if not self.hedging.allow_hedge():
+                return await primary
+            hedge_slot = self.scheduler.try_acquire(host)
+            if not hedge_slot or (
+                self.rate_limiter is not None
+                and not self.rate_limiter.try_acquire(host)
+            ):
+                return await primary
+
+            self.stats["hedges_sent"] += 1
+            logger.debug("Hedging %s after %.3fs", request.url, delay)
+            hedged = asyncio.ensure_future(
+                self._attempt(request, attempt, cached, body)
+            )
+            attempts.append(hedged)
+
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedged:
+                            self.stats["hedges_won"] += 1
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+            if hedge_slot:
+                self.scheduler.release(host)
+
+    def _sample_limit(self, duration: float, dropped: bool = False) -> None:
+        """Feed an attempt into the adaptive limit and resize the scheduler."""
+        if self.concurrency_limit is None:
+            return
+        limit = self.concurrency_limit.on_sample(
+            duration, self.scheduler.in_use, dropped
+        )
+        if limit != self.scheduler.max_concurrent:
+            self.scheduler.set_limit(limit)
+
+    async def _update_cache(
+        self, key: str, result: HTTPResponse, cached: Optional[CacheEntry]
+    ) -> None:
+        """Store a fresh response, or write back the entry it revalidated."""
+        if result.from_cache:
+            await self.cache.put(key, cached)
+            return
+
+        entry = CacheEntry.from_response(result)
+        if entry is not None:
+            await self.cache.put(key, entry)
+
+    async def fetch_all(
+        self,
+        requests: list[HTTPRequest],
+        deadline: Optional[float] = None,
+        journal: Optional[CrawlJournal] = None,
+    ) -> list[HTTPResponse]:
+        """
+        Fetch multiple HTTP requests concurrently.
+
+        Args:
+            requests: Requests to fetch
+            deadline: Optional absolute ``time.time()`` at which requests that
+                are still running are cancelled and counted as failed.
+            journal: Optional open ``CrawlJournal``. Requests it has already
+                finished are skipped, and only this run's successful
+                responses are returned. Requests are then streamed through
+                ``fetch_iter`` rather than started all at once.
+        """
+        if journal is not None:
+            return await self._fetch_all_journaled(requests, deadline, journal)
 
-    async def fetch_all(self, requests: list[HTTPRequest]) -> list[HTTPResponse]:
-        """Fetch multiple HTTP requests concurrently."""
         tasks = [asyncio.create_task(self.fetch_single(req)) for req in requests]
         try:
+            if deadline is not None and tasks:
+                _, stragglers = await asyncio.wait(
+                    tasks, timeout=max(0.0, deadline - time.time())
+                )
+                for task in stragglers:
+                    task.cancel()
+                if stragglers:
+                    self.stats["request_failed"] += len(stragglers)
+                    self.stats["request_expired"] += len(stragglers)
+                    logger.warning(
+                        "Cancelled %d requests at the deadline", len(stragglers)
+                    )
+
             results = await asyncio.gather(*tasks, return_exceptions=True)
             succeed = []
             failed = []
 
             for i, result in enumerate(results):
-                if isinstance(result, Exception):
+                if isinstance(result, BaseException):
                     failed.append((requests[i], result))
                 else:
                     succeed.append(result)
 
             if failed:
-                logger.warning(f"Failed to fetch {len(failed)} URLs")
+                logger.warning("Failed to fetch %d URLs", len(failed))
 
             return succeed
         except Exception as e:
@@ -137,6 +670,297 @@ class AsyncHTTPFetcher:
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
 
+    async def _fetch_all_journaled(
+        self,
+        requests: list[HTTPRequest],
+        deadline: Optional[float],
+        journal: CrawlJournal,
+    ) -> list[HTTPResponse]:
+        succeed = []
+        failed = 0
+        async for result in self.fetch_iter(
+            requests, ordered=True, journal=journal, deadline=deadline
+        ):
+            if result.ok:
+                succeed.append(result.response)
+            else:
+                failed += 1
+
+        if failed:
+            logger.warning("Failed to fetch %d URLs", failed)
+        return succeed
+
+    async def fetch_iter(
+        self,
+        requests: Union[Iterable[HTTPRequest], AsyncIterable[HTTPRequest]],
+        window: Optional[int] = None,
+        ordered: bool = False,
+        journal: Optional[CrawlJournal] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[FetchResult]:
+        """
+        Stream results while keeping at most ``window`` requests in flight.
+
+        Requests are pulled from ``requests`` only when a slot in the window
+        frees up, so memory depends on the window size and not on the input
+        size. Failures are yielded as ``FetchResult`` objects with ``error``
+        set instead of being raised.
+
+        Args:
+            requests: Iterable or async iterable of requests
+            window: Maximum number of requests in flight (and, when ordered,
+                buffered for output). Defaults to twice ``max_concurrent``,
+                or twice the adaptive limit's ``max_limit``.
+            ordered: Yield results in input order instead of completion order
+            journal: Open ``CrawlJournal``. Requests it has already finished
+                are skipped without being yielded, and every new result is
+                recorded in it before it is yielded.
+            deadline: Optional absolute ``time.time()``. Requests still
+                running then are cancelled, counted as failed and expired,
+                and yielded with a ``DeadlineExceededError``; no further
+                requests are started.
+
+        Yields:
+            FetchResult: One result per input request
+        """
+        if window is None:
+            limit = self.concurrency_limit
+            window = (limit.max_limit if limit else self.max_concurrent) * 2
+        if window <= 0:
+            raise ValueError("window must be positive")
+
+        # Async sources are pulled in a background future so that a slow
+        # source never delays yielding results that are already complete
+        sync_source = None if hasattr(requests, "__aiter__") else iter(requests)
+        async_source = requests.__aiter__() if sync_source is None else None
+        pull: Optional[asyncio.Future] = None
+        in_flight: dict[asyncio.Task, tuple[int, HTTPRequest]] = {}
+        buffered: dict[int, Optional[FetchResult]] = {}
+        next_index = 0
+        next_to_yield = 0
+        exhausted = False
+        loop_deadline = _loop_deadline(deadline)
+
+        try:
+            while True:
+                while not exhausted and len(in_flight) + len(buffered) < window:
+                    if sync_source is not None:
+                        request = next(sync_source, _EXHAUSTED)
+                        if request is _EXHAUSTED:
+                            exhausted = True
+                            break
+                    else:
+                        if pull is None:
+                            pull = asyncio.ensure_future(anext(async_source))
+                        if not pull.done():
+                            break
+                        try:
+                            request = pull.result()
+                        except StopAsyncIteration:
+                            exhausted = True
+                            break
+                        finally:
+                            pull = None
+
+                    index = next_index
+                    next_index += 1
+                    if journal is not None and journal.is_done(index):
+                        if ordered and index == next_to_yield:
+                            next_to_yield += 1
+                        elif ordered:
+                            buffered[index] = None
+                        continue
+
+                    task = asyncio.create_task(self.fetch_single(request))
+                    in_flight[task] = (index, request)
+
+                waiting = set(in_flight)
+                if pull is not None:
+                    waiting.add(pull)
+                if not waiting:
+                    break
+
+                timeout = None
+                if loop_deadline is not None:
+                    now = asyncio.get_running_loop().time()
+                    timeout = max(0.0, loop_deadline - now)
+                done, _ = await asyncio.wait(
+                    waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Deadline reached: fail what is running, start nothing new
+                    done = await self._expire(in_flight, pull)
+                    pull = None
+                    exhausted = True
+                for task in done:
+                    if task is pull:
+                        continue
+                    index, request = in_flight.pop(task)
+                    if task.cancelled():
+                        error = DeadlineExceededError(
+                            f"Deadline reached while fetching {request.url}"
+                        )
+                    else:
+                        error = task.exception()
+                    result = FetchResult(
+                        index=index,
+                        request=request,
+                        response=None if error else task.result(),
+                        error=error,
+                    )
+                    if journal is not None:
+                        journal.record(result)
+                    if ordered:
+                        buffered[index] = result
+                    else:
+                        yield result
+
+                while next_to_yield in buffered:
+                    result = buffered.pop(next_to_yield)
+                    next_to_yield += 1
+                    # None marks a request skipped by the journal
+                    if result is not None:
+                        yield result
+        finally:
+            if pull is not None:
+                pull.cancel()
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _expire(
+        self, in_flight: dict[asyncio.Task, tuple], pull: Optional[asyncio.Future]
+    ) -> set[asyncio.Task]:
+        """Cancel the requests still running at a deadline and count them."""
+        if pull is not None:
+            pull.cancel()
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+        if in_flight:
+            self.stats["request_failed"] += len(in_flight)
+            self.stats["request_expired"] += len(in_flight)
+            logger.warning("Cancelled %d requests at the deadline", len(in_flight))
+        return set(in_flight)
+
+    async def fetch_batch(
+        self,
+        batch: RequestBatch,
+        keep_headers: Optional[Iterable[str]] = None,
+        window: Optional[int] = None,
+        journal: Optional[CrawlJournal] = None,
+    ) -> ResultTable:
+        """
+        Fetch a ``RequestBatch`` into a compact ``ResultTable``.
+
+        Requests are built from the batch as the window frees up, and each
+        response is packed into the table as soon as it arrives, so only
+        the requests and responses in flight exist as objects. See
+        ``fetch_iter`` for ``window`` and ``journal``.
+        """
+        table = ResultTable(batch, keep_headers)
+        async for result in self.fetch_iter(batch, window=window, journal=journal):
+            table.add(result)
+        logger.info(
+            "Batch of %d done: %d succeeded, %d failed",
+            len(batch),
+            table.completed - table.failed,
+            table.failed,
+        )
+        return table
+
+    async def crawl(
+        self,
+        seeds: Iterable[str],
+        frontier: Optional[CrawlFrontier] = None,
+        extract_links: Callable[[HTTPResponse], Iterable[str]] = html_links,
+        max_pages: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        window: Optional[int] = None,
+        **request_options,
+    ) -> AsyncIterator[FetchResult]:
+        """
+        Crawl from ``seeds``, following the links found in each response.
+
+        URLs are deduplicated and scheduled by a ``CrawlFrontier`` (a default
+        one is created if none is given); pass your own to set its size,
+        politeness delay and overflow file, or to read ``host_throughput()``
+        afterwards. ``extract_links`` returns the URLs to follow from a
+        successful response; the default follows ``<a href>`` in HTML.
+        ``request_options`` are passed to every ``HTTPRequest``.
+
+        Args:
+            seeds: URLs to start from, at depth 0
+            max_pages: Stop after this many requests have been sent
+            max_depth: Do not follow links from pages at this depth
+            window: Maximum number of requests in flight (see ``fetch_iter``)
+
+        Yields:
+            FetchResult: One result per crawled URL, in completion order
+        """
+        if frontier is None:
+            frontier = CrawlFrontier()
+        frontier.extend(seeds)
+        progress = asyncio.Event()
+        sent = 0
+
+        async def requests() -> AsyncIterator[HTTPRequest]:
+            nonlocal sent
+            while max_pages is None or sent < max_pages:
+                entry = frontier.pop()
+                if entry is None:
+                    wait = frontier.wait_time()
+                    if wait is None and not frontier.in_flight:
+                        return
+                    # Wake up for new links or when a host becomes ready
+                    progress.clear()
+                    try:
+                        async with asyncio.timeout(wait):
+                            await progress.wait()
+                    except TimeoutError:
+                        pass
+                    continue
+                sent += 1
+                yield HTTPRequest(entry[0], **request_options)
+
+        results = self.fetch_iter(requests(), window=window)
+        try:
+            async for result in results:
+                depth = frontier.complete(result)
+                if result.ok and (max_depth is None or depth < max_depth):
+                    frontier.extend(extract_links(result.response), depth + 1)
+                progress.set()
+                yield result
+        finally:
+            await results.aclose()
+            logger.info(
+                "Crawl finished: %d pages from %d hosts, %d URLs left",
+                sent,
+                len(frontier.hosts),
+                len(frontier),
+            )
+
     def get_stats(self) -> dict[str, int]:
         """Get current statistics."""
         return self.stats.copy()
+
+    def get_metrics(self) -> dict:
+        """Snapshot of latency histograms, byte counts and connection reuse."""
+        snapshot = self.metrics.snapshot()
+        snapshot["stats"] = self.get_stats()
+        if self.circuit_breaker is not None:
+            snapshot["circuits"] = self.circuit_breaker.snapshot()
+        if self.concurrency_limit is not None:
+            snapshot["concurrency_limit"] = {
+                "current": self.concurrency_limit.limit,
+                "history": list(self.concurrency_limit.history),
+            }
+        return snapshot
+
+    def prometheus_metrics(self) -> str:
+        """Metrics and stats in the Prometheus text exposition format."""
+        gauges = {}
+        if self.concurrency_limit is not None:
+            gauges["concurrency_limit"] = self.concurrency_limit.limit
+        return self.metrics.to_prometheus(self.stats, gauges=gauges)
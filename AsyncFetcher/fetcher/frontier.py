@@ -0,0 +1,344 @@
+import hashlib
+import heapq
+import math
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Union
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from .dataclass import FetchResult, HTTPResponse
+from .exceptions import ConfigurationError
+from .logging import logger
+from .metrics import DEFAULT_MAX_HOSTS, OTHER_HOST
+from .scheduler import host_key
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# Idle hosts' ready times are swept once this many have piled up
+SWEEP_THRESHOLD = 1024
+_HREF = re.compile(r"""<a\s[^>]*?href\s*=\s*["']([^"'#>]+)""", re.IGNORECASE)
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """
+    Canonical form used to deduplicate URLs, or None for non-HTTP URLs.
+
+    Scheme and host are lowercased, default ports and fragments dropped and
+    an empty path becomes ``/``. The query string is kept as it is.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def html_links(response: HTTPResponse) -> list[str]:
+    """Absolute ``<a href>`` targets of an HTML response (the default extractor)."""
+    content_type = next(
+        (v for k, v in response.headers.items() if k.lower() == "content-type"), ""
+    )
+    body = response.body
+    if "html" not in content_type or not isinstance(body, str):
+        return []
+    return [urljoin(response.url, href.strip()) for href in _HREF.findall(body)]
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership with no false negatives.
+
+    Sized for ``capacity`` items at a false positive rate of ``error_rate``;
+    100 million URLs at 0.1% take about 180 MB, whatever the URL lengths.
+    Past ``capacity`` the rate grows, so size it for the whole crawl.
+    """
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ConfigurationError("capacity must be positive.")
+        if not 0 < error_rate < 1:
+            raise ConfigurationError("error_rate must be between 0 and 1.")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> bool:
+        """Add ``item``; returns False if it was (probably) already present."""
+        bits = self._bits
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        if added:
+            self._count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+@dataclass(slots=True)
+class HostCrawlStats:
+    """Pages fetched from one host during a crawl."""
+
+    fetched: int = 0
+    failed: int = 0
+    bytes: int = 0
+    first: Optional[float] = None
+    last: Optional[float] = None
+
+    @property
+    def per_second(self) -> float:
+        """Completed pages per second between the first and last completion."""
+        if self.first is None or self.last is None or self.last <= self.first:
+            return 0.0
+        return (self.fetched + self.failed - 1) / (self.last - self.first)
+
+
+class CrawlFrontier:
+    """
+    URLs waiting to be crawled, queued per host and deduplicated.
+
+    Every URL is normalized and checked against a ``BloomFilter``, so each
+    is queued at most once (a false positive skips a new URL, at
+    ``error_rate``). Hosts take turns: ``pop`` returns a URL from the host
+    that has been ready longest, and a host is ready again ``delay`` seconds
+    after its last URL was handed out. With ``overflow_path`` set, URLs
+    beyond ``max_queued`` are appended to that file and read back as the
+    in-memory queues drain.
+
+    Per-host state is bounded too: a host with nothing queued is forgotten
+    once its delay has passed, and throughput is tracked for the first
+    ``max_hosts`` hosts, with later hosts folded into ``"other"`` as in
+    ``FetcherMetrics``.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10_000_000,
+        error_rate: float = 0.001,
+        delay: float = 0.0,
+        max_queued: int = 1_000_000,
+        overflow_path: Optional[Union[str, os.PathLike]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        max_hosts: Optional[int] = DEFAULT_MAX_HOSTS,
+    ):
+        if delay < 0:
+            raise ConfigurationError("delay must not be negative.")
+        if max_queued <= 0:
+            raise ConfigurationError("max_queued must be positive.")
+        self.seen = BloomFilter(capacity, error_rate)
+        self.delay = delay
+        self.max_queued = max_queued
+        self.overflow_path = overflow_path
+        self.clock = clock
+        self.max_hosts = max_hosts
+        self.queued = 0
+        self.duplicates = 0
+        self.hosts: dict[str, HostCrawlStats] = {}
+        self._queues: dict[str, deque[tuple[str, int]]] = {}
+        # Ready times of hosts whose queue ran empty within their delay
+        self._next_ready: dict[str, float] = {}
+        self._sweep_at = SWEEP_THRESHOLD
+        # (ready at, sequence, host) for every host with queued URLs
+        self._ready: list[tuple[float, int, str]] = []
+        self._sequence = 0
+        self._in_flight: dict[str, int] = {}
+        self._overflow = None
+        self._overflow_read = 0
+        self._overflowed = 0
+
+    def __len__(self) -> int:
+        """URLs queued in memory or on disk."""
+        return self.queued + self._overflowed
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def add(self, url: str, depth: int = 0) -> bool:
+        """Queue ``url`` unless it is malformed or was seen before."""
+        url = normalize_url(url)
+        if url is None:
+            return False
+        if not self.seen.add(url):
+            self.duplicates += 1
+            return False
+        if self.overflow_path is not None and self.queued >= self.max_queued:
+            self._spill(url, depth)
+        else:
+            self._push(url, depth)
+        return True
+
+    def extend(self, urls: Iterable[str], depth: int = 0) -> int:
+        """Queue several URLs; returns how many were new."""
+        return sum(self.add(url, depth) for url in urls)
+
+    def _push(self, url: str, depth: int) -> None:
+        host = host_key(url)
+        queue = self._queues.get(host)
+        if queue is None:
+            queue = self._queues[host] = deque()
+        if not queue:
+            self._schedule(host, self._next_ready.pop(host, 0.0))
+        queue.append((url, depth))
+        self.queued += 1
+
+    def _schedule(self, host: str, ready_at: float) -> None:
+        self._sequence += 1
+        heapq.heappush(self._ready, (ready_at, self._sequence, host))
+
+    def _spill(self, url: str, depth: int) -> None:
+        if self._overflow is None:
+            self._overflow = open(self.overflow_path, "w+b")
+            logger.info("Frontier overflowing to %s", self.overflow_path)
+        self._overflow.seek(0, os.SEEK_END)
+        self._overflow.write(b"%d\t%s\n" % (depth, url.encode()))
+        self._overflowed += 1
+
+    def _refill(self) -> None:
+        """Move URLs from the overflow file back into memory."""
+        overflow = self._overflow
+        overflow.seek(self._overflow_read)
+        while self._overflowed and self.queued < self.max_queued:
+            depth, _, url = overflow.readline().rstrip(b"\n").partition(b"\t")
+            self._overflowed -= 1
+            self._push(url.decode(), int(depth))
+        self._overflow_read = overflow.tell()
+        if not self._overflowed:
+            # Everything was read back: start the file over
+            overflow.seek(0)
+            overflow.truncate()
+            self._overflow_read = 0
+
+    def pop(self) -> Optional[tuple[str, int]]:
+        """
+        Next ``(url, depth)`` whose host is ready, or None.
+
+        The URL counts as in flight until ``complete`` is called for it.
+        """
+        if self._overflowed and self.queued <= self.max_queued // 2:
+            self._refill()
+        if not self._ready or self._ready[0][0] > self.clock():
+            return None
+        _, _, host = heapq.heappop(self._ready)
+        queue = self._queues[host]
+        url, depth = queue.popleft()
+        self.queued -= 1
+        ready_at = self.clock() + self.delay
+        if queue:
+            self._schedule(host, ready_at)
+        else:
+            del self._queues[host]
+            if self.delay:
+                self._next_ready[host] = ready_at
+                if len(self._next_ready) >= self._sweep_at:
+                    self._sweep()
+        self._in_flight[url] = depth
+        return url, depth
+
+    def _sweep(self) -> None:
+        """Forget idle hosts whose delay has passed."""
+        now = self.clock()
+        self._next_ready = {
+            host: ready_at
+            for host, ready_at in self._next_ready.items()
+            if ready_at > now
+        }
+        self._sweep_at = max(SWEEP_THRESHOLD, 2 * len(self._next_ready))
+
+    def wait_time(self) -> Optional[float]:
+        """Seconds until ``pop`` can return a URL, or None if nothing is queued."""
+        if self._overflowed and not self._ready:
+            self._refill()
+        if not self._ready:
+            return None
+        return max(0.0, self._ready[0][0] - self.clock())
+
+    def complete(self, result: FetchResult) -> int:
+        """Record the outcome of a popped URL and return its depth."""
+        url = result.request.url
+        depth = self._in_flight.pop(url, 0)
+        host = host_key(url)
+        stats = self.hosts.get(host)
+        if stats is None:
+            if self.max_hosts is not None and len(self.hosts) >= self.max_hosts:
+                host = OTHER_HOST
+                stats = self.hosts.get(host)
+            if stats is None:
+                stats = self.hosts[host] = HostCrawlStats()
+        now = self.clock()
+        if stats.first is None:
+            stats.first = now
+        stats.last = now
+        if result.ok:
+            stats.fetched += 1
+            raw = result.response.raw
+            if raw is not None:
+                stats.bytes += len(raw)
+        else:
+            stats.failed += 1
+        return depth
+
+    def host_throughput(self) -> dict[str, dict]:
+        """Per-host pages, failures, bytes and pages per second so far."""
+        return {
+            host: {
+                "fetched": stats.fetched,
+                "failed": stats.failed,
+                "bytes": stats.bytes,
+                "per_second": stats.per_second,
+            }
+            for host, stats in self.hosts.items()
+        }
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "seen": len(self.seen),
+            "queued": self.queued,
+            "overflowed": self._overflowed,
+            "in_flight": self.in_flight,
+            "duplicates": self.duplicates,
+            "hosts": len(self.hosts),
+            "filter_bytes": self.seen.nbytes,
+        }
+
+    def close(self) -> None:
+        """Close and delete the overflow file, if one was opened."""
+        if self._overflow is not None:
+            self._overflow.close()
+            self._overflow = None
+            os.remove(self.overflow_path)
+            self._overflowed = 0
@@ -0,0 +1,62 @@
+from typing import Optional
+
+from .dataclass import BodyMode, HTTPRequest
+from .metrics import LatencyHistogram
+from .retry import RetryBudget
+
+HEDGED_METHODS = frozenset({"GET", "HEAD"})
+
+
+def can_hedge(request: HTTPRequest) -> bool:
+    """Only idempotent, body-less requests whose body is not streamed are hedged."""
+    return (
+        request.method.upper() in HEDGED_METHODS
+        and request.data is None
+        and request.body_mode is not BodyMode.STREAM
+    )
+
+
+class HedgePolicy:
+    """
+    When to send a second, hedged attempt of a slow request.
+
+    A request still running after the host's ``quantile`` latency (the
+    running p95 by default) gets a duplicate attempt, and whichever finishes
+    first wins. The delay needs ``min_samples`` successful responses from the
+    host, and is clamped to ``[min_delay, max_delay]``.
+
+    Hedges draw from ``budget``, which by default allows hedges for about 5%
+    of requests, so a slow host cannot double the load on itself.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        min_samples: int = 20,
+        min_delay: float = 0.0,
+        max_delay: Optional[float] = None,
+        budget: Optional[RetryBudget] = None,
+    ):
+        if not 0 < quantile < 1:
+            raise ValueError("quantile must be between 0 and 1")
+
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget(ratio=0.05, min_per_second=0.5)
+
+    def delay(self, histogram: Optional[LatencyHistogram]) -> Optional[float]:
+        """Seconds to wait before hedging, or None without enough samples."""
+        if histogram is None or histogram.count < self.min_samples:
+            return None
+        delay = max(self.min_delay, histogram.percentile(self.quantile))
+        if self.max_delay is not None:
+            delay = min(delay, self.max_delay)
+        return delay
+
+    def record_request(self) -> None:
+        self.budget.record_request()
+
+    def allow_hedge(self) -> bool:
+        return self.budget.try_spend()
@@ -0,0 +1,204 @@
+import asyncio
+import base64
+import json
+import os
+import struct
+from typing import Any, Iterator, Optional
+
+from .dataclass import FetchResult
+from .logging import logger
+
+# index, status code (0 for transport errors), flags
+RECORD = struct.Struct("<QHB")
+FLAG_OK = 1
+
+
+def _status(result: FetchResult) -> int:
+    if result.response is not None:
+        return result.response.status_code
+    return getattr(result.error, "status", 0) or 0
+
+
+def _spill_line(result: FetchResult) -> bytes:
+    line: dict[str, Any] = {"index": result.index, "url": result.request.url}
+    response = result.response
+    if response is None:
+        line["error"] = f"{type(result.error).__name__}: {result.error}"
+    else:
+        line.update(
+            status_code=response.status_code,
+            headers=response.headers,
+            response_time=response.response_time,
+            attempt=response.attempt,
+        )
+        # Spill undecoded bodies as they arrived instead of decoding them here
+        pending = response.lazy_body
+        if pending is not None and "application/json" in pending.content_type:
+            line["body_json"] = pending.raw.decode(
+                pending.charset or "utf-8", errors="replace"
+            )
+        elif pending is not None:
+            line["body_base64"] = base64.b64encode(pending.raw).decode()
+        elif isinstance(response.body, bytes):
+            line["body_base64"] = base64.b64encode(response.body).decode()
+        else:
+            line["body"] = response.body
+    return json.dumps(line, default=str).encode() + b"\n"
+
+
+def iter_spilled_results(path: str) -> Iterator[dict[str, Any]]:
+    """Read results written by a journal with ``spill_results=True``."""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                yield json.loads(line)
+
+
+class CrawlJournal:
+    """
+    Append-only journal of finished requests, for resuming large crawls.
+
+    Each finished request is appended as a fixed-size binary record keyed by
+    its position in the input. Records are buffered in memory and written in
+    batches, and ``fsync`` runs in a worker thread every ``sync_interval``
+    seconds, so journaling costs little per request.
+
+    On open, existing records are loaded into a bitmap (one bit per input
+    position). ``AsyncHTTPFetcher.fetch_iter(..., journal=journal)`` then
+    skips positions that already succeeded, and also positions that failed
+    unless ``retry_failed`` is set. The input must be in the same order on
+    every run. A torn record left by a crash is truncated.
+
+    With ``spill_results=True``, results are also written as NDJSON to
+    ``path + ".results"``. Each line is flushed before the journal record
+    that marks it done. Read it back with ``iter_spilled_results``. Bodies
+    that were already decoded are written as ``body``; bodies that were not
+    are written as received, JSON as text in ``body_json`` and anything else
+    in ``body_base64``, so spilling never decodes a body.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        spill_results: bool = False,
+        retry_failed: bool = True,
+        sync_interval: float = 1.0,
+        buffer_size: int = 64 * 1024,
+    ):
+        self.path = str(path)
+        self.results_path = self.path + ".results"
+        self.spill_results = spill_results
+        self.retry_failed = retry_failed
+        self.sync_interval = sync_interval
+        self.buffer_size = buffer_size
+
+        self.completed = 0
+        self.failed = 0
+        self._done = bytearray()
+        self._records = bytearray()
+        self._spill = bytearray()
+        self._fd: Optional[int] = None
+        self._spill_fd: Optional[int] = None
+        self._syncer: Optional[asyncio.Task] = None
+
+    def open(self) -> "CrawlJournal":
+        """Load existing records and open the journal for appending."""
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % RECORD.size
+            for index, _, flags in RECORD.iter_unpack(data[:usable]):
+                if flags & FLAG_OK:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                if flags & FLAG_OK or not self.retry_failed:
+                    self._mark(index)
+            if usable != len(data):
+                logger.warning("Truncating torn record at the end of %s", self.path)
+                os.truncate(self.path, usable)
+            logger.info(
+                "Resuming from %s: %d completed, %d failed",
+                self.path,
+                self.completed,
+                self.failed,
+            )
+
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        self._fd = os.open(self.path, flags, 0o644)
+        if self.spill_results:
+            self._spill_fd = os.open(self.results_path, flags, 0o644)
+        return self
+
+    def is_done(self, index: int) -> bool:
+        byte = index >> 3
+        return byte < len(self._done) and bool(self._done[byte] & (1 << (index & 7)))
+
+    def _mark(self, index: int) -> None:
+        byte = index >> 3
+        if byte >= len(self._done):
+            self._done.extend(bytes(byte - len(self._done) + 1))
+        self._done[byte] |= 1 << (index & 7)
+
+    def record(self, result: FetchResult) -> None:
+        """Append the outcome of ``result``; written out in batches."""
+        if result.ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        if result.ok or not self.retry_failed:
+            self._mark(result.index)
+
+        if self._spill_fd is not None:
+            self._spill += _spill_line(result)
+        flags = FLAG_OK if result.ok else 0
+        self._records += RECORD.pack(result.index, min(_status(result), 0xFFFF), flags)
+        if len(self._records) + len(self._spill) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand buffered records to the OS (without fsync)."""
+        # Results go first, so a journal record never refers to a lost line
+        if self._spill:
+            _write_all(self._spill_fd, self._spill)
+            self._spill.clear()
+        if self._records:
+            _write_all(self._fd, self._records)
+            self._records.clear()
+
+    async def sync(self) -> None:
+        """Flush and fsync in a worker thread."""
+        self.flush()
+        if self._spill_fd is not None:
+            await asyncio.to_thread(os.fsync, self._spill_fd)
+        await asyncio.to_thread(os.fsync, self._fd)
+
+    async def _sync_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self.sync()
+
+    def close(self) -> None:
+        self.flush()
+        for fd in (self._spill_fd, self._fd):
+            if fd is not None:
+                os.fsync(fd)
+                os.close(fd)
+        self._fd = self._spill_fd = None
+
+    async def __aenter__(self):
+        self.open()
+        self._syncer = asyncio.create_task(self._sync_periodically())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._syncer.cancel()
+        await asyncio.gather(self._syncer, return_exceptions=True)
+        await asyncio.to_thread(self.close)
+
+
+def _write_all(fd: int, data: bytearray) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
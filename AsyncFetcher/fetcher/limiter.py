@@ -0,0 +1,158 @@
+import math
+from abc import ABC, abstractmethod
+import time
+from collections import deque
+from typing import Callable, Optional
+
+
+class AdaptiveLimit(ABC):
+    """
+    Concurrency limit that adapts to observed latency and drops.
+
+    The fetcher reports every attempt with ``on_sample``: its round-trip time,
+    how many requests were in flight, and whether it was dropped (a timeout
+    or a 429/503). Subclasses compute the new limit in ``_update``. Drops
+    within ``cooldown`` seconds of the last one are ignored, so a burst of
+    failures counts as a single congestion signal. The limit is kept within
+    ``[min_limit, max_limit]``, and every change of its integer value is
+    recorded in ``history`` as ``(clock(), limit)``.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        cooldown: float = 1.0,
+        history_size: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 0 < min <= initial <= max")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.cooldown = cooldown
+        self.clock = clock
+        self._limit = float(initial_limit)
+        self._last_drop = float("-inf")
+        self.history: deque[tuple[float, int]] = deque(maxlen=history_size)
+        self.history.append((clock(), initial_limit))
+
+    @property
+    def limit(self) -> int:
+        """Current number of concurrency slots."""
+        return int(self._limit)
+
+    def on_sample(self, rtt: float, in_flight: int, dropped: bool = False) -> int:
+        """Feed one attempt into the controller and return the new limit."""
+        if dropped:
+            now = self.clock()
+            if now - self._last_drop < self.cooldown:
+                return self.limit
+            self._last_drop = now
+
+        previous = self.limit
+        new_limit = self._update(rtt, in_flight, dropped)
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), new_limit))
+        if self.limit != previous:
+            self.history.append((self.clock(), self.limit))
+        return self.limit
+
+    @abstractmethod
+    def _update(self, rtt: float, in_flight: int, dropped: bool) -> float:
+        """Return the new (unclamped) limit after one sample."""
+
+
+class AIMDLimit(AdaptiveLimit):
+    """
+    Additive-increase / multiplicative-decrease, as in TCP congestion control.
+
+    Each successful sample grows the limit by ``increase / limit``, which is
+    about ``increase`` slots per round trip of a full window. Growth happens
+    only while at least half the slots are in use, so an idle fetcher does
+    not inflate its limit. A drop, or an RTT above ``timeout``, multiplies
+    the limit by ``backoff_ratio``.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        backoff_ratio: float = 0.9,
+        increase: float = 1.0,
+        timeout: Optional[float] = None,
+        **options,
+    ):
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        super().__init__(initial_limit, min_limit, max_limit, **options)
+        self.backoff_ratio = backoff_ratio
+        self.increase = increase
+        self.timeout = timeout
+
+    def _update(self, rtt: float, in_flight: int, dropped: bool) -> float:
+        if dropped or (self.timeout is not None and rtt > self.timeout):
+            return self._limit * self.backoff_ratio
+
+        if in_flight * 2 >= self._limit:
+            return self._limit + self.increase / self._limit
+        return self._limit
+
+
+class GradientLimit(AdaptiveLimit):
+    """
+    Latency-gradient limit in the style of TCP Vegas.
+
+    A long-term average RTT (``long_window`` samples) serves as the no-load
+    baseline, and a short-term average (``short_window`` samples) is the
+    current RTT. While they agree, the limit grows by a queue allowance of
+    ``sqrt(limit)``. When the current RTT rises above ``tolerance`` times the
+    baseline, queueing is building up upstream and the limit shrinks in
+    proportion, by at most half per sample. Drops count as the steepest
+    gradient. ``smoothing`` damps each step.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        short_window: int = 10,
+        long_window: int = 600,
+        **options,
+    ):
+        super().__init__(initial_limit, min_limit, max_limit, **options)
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self._short_alpha = 2 / (short_window + 1)
+        self._long_alpha = 2 / (long_window + 1)
+        self.short_rtt: Optional[float] = None
+        self.long_rtt: Optional[float] = None
+
+    def _update(self, rtt: float, in_flight: int, dropped: bool) -> float:
+        if dropped:
+            gradient = 0.5
+        else:
+            if self.short_rtt is None:
+                self.short_rtt = self.long_rtt = rtt
+            self.short_rtt += (rtt - self.short_rtt) * self._short_alpha
+            self.long_rtt += (rtt - self.long_rtt) * self._long_alpha
+
+            # Let the baseline follow a lasting improvement quickly
+            if self.long_rtt > 2 * self.short_rtt:
+                self.long_rtt *= 0.95
+
+            # An underused limit says nothing about the upstream's capacity
+            if in_flight * 2 < self._limit:
+                return self._limit
+            gradient = max(
+                0.5, min(1.0, self.tolerance * self.long_rtt / self.short_rtt)
+            )
+
+        queue_size = 0.0 if dropped else math.sqrt(self._limit)
+        target = self._limit * gradient + queue_size
+        return self._limit * (1 - self.smoothing) + target * self.smoothing
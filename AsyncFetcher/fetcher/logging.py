@@ -1,36 +1,269 @@
+import atexit
 import logging
 import logging.handlers
+import os
+import queue
+import time
+from typing import Callable, Mapping, Optional
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+_listeners: dict[str, logging.handlers.QueueListener] = {}
+_exception_formatter = logging.Formatter()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    ``QueueHandler`` that leaves formatting to the listener thread.
+
+    The stock handler formats every record before enqueueing it. Here only
+    exception text is rendered on the calling thread (so tracebacks do not
+    keep frames alive); message arguments are merged by the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            if not record.exc_text:
+                formatter = _exception_formatter
+                record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of the records of each message type.
+
+    A message type is the unformatted message (the ``%``-style template).
+    ``rates`` maps template prefixes to the fraction kept, for example
+    ``{"Success ": 0.01}``; other templates use ``default_rate``. Sampling
+    is deterministic (every n-th record) and records at ``min_level`` or
+    above are always kept.
+    """
+
+    def __init__(
+        self,
+        rates: Optional[Mapping[str, float]] = None,
+        default_rate: float = 1.0,
+        min_level: int = logging.WARNING,
+    ):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self.min_level = min_level
+        self._every: dict[str, int] = {}
+        self._seen: dict[str, int] = {}
+
+    def _interval(self, template: str) -> int:
+        rate = self.default_rate
+        for prefix, prefix_rate in self.rates.items():
+            if template.startswith(prefix):
+                rate = prefix_rate
+                break
+        return round(1 / rate) if rate > 0 else 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.min_level:
+            return True
+        template = str(record.msg)
+        every = self._every.get(template)
+        if every is None:
+            every = self._every[template] = self._interval(template)
+        if every <= 1:
+            return every == 1
+        seen = self._seen.get(template, 0)
+        self._seen[template] = seen + 1
+        return seen % every == 0
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per message type and level.
+
+    Each type may log ``burst`` records at once and ``per_second`` records
+    per second after that; the rest are dropped, and the next record that
+    gets through says how many similar ones were suppressed. Records at
+    ``exempt_level`` or above are never limited.
+    """
+
+    def __init__(
+        self,
+        per_second: float = 20.0,
+        burst: int = 50,
+        exempt_level: int = logging.ERROR,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        self.exempt_level = exempt_level
+        self.clock = clock
+        # key -> [tokens, last refill, suppressed]
+        self._buckets: dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        key = (record.levelno, str(record.msg))
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now, 0]
+        else:
+            refill = (now - bucket[1]) * self.per_second
+            bucket[0] = min(self.burst, bucket[0] + refill)
+            bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return False
+
+        bucket[0] -= 1
+        if bucket[2]:
+            # Rare, so formatting eagerly here is fine
+            record.msg = f"{record.getMessage()} ({bucket[2]} similar suppressed)"
+            record.args = None
+            bucket[2] = 0
+        return True
 
 
 def get_logger(
-    name: str = "fetcher", log_file_path: str = "fetcher.log"
+    name: str = "fetcher",
+    log_file_path: str = "fetcher.log",
+    max_bytes: int = MAX_BYTES,
+    backup_count: int = BACKUP_COUNT,
+    filters: tuple[logging.Filter, ...] = (),
 ) -> logging.Logger:
-    """Create and return a configured logger for the library"""
+    """
+    Create and return a configured logger for the library.
+
+    Records go through a queue to a listener thread that writes them to the
+    console (INFO and up) and to a rotating file (DEBUG and up), so logging
+    never blocks on I/O. ``filters`` (e.g. ``SamplingFilter``,
+    ``RateLimitFilter``) run on the calling thread, before the queue.
+    """
 
     logger = logging.getLogger(name)
     if logger.handlers:
         return logger
 
     logger.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(LOG_FORMAT)
 
     # Console Handler
     ch = logging.StreamHandler()
     ch.setLevel(logging.INFO)
-    ch_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-    ch.setFormatter(ch_formatter)
+    ch.setFormatter(formatter)
 
     # File Handler
     fh = logging.handlers.RotatingFileHandler(
-        log_file_path, maxBytes=2048, backupCount=3
+        log_file_path, maxBytes=max_bytes, backupCount=backup_count, delay=True
     )
     fh.setLevel(logging.DEBUG)
-    fh_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-    fh.setFormatter(fh_formatter)
+    fh.setFormatter(formatter)
 
-    logger.addHandler(ch)
-    logger.addHandler(fh)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    qh = DeferredQueueHandler(log_queue)
+    for log_filter in filters:
+        qh.addFilter(log_filter)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, ch, fh, respect_handler_level=True
+    )
+    listener.start()
+    _listeners[name] = listener
+
+    logger.addHandler(qh)
 
     return logger
 
 
-logger = get_logger(__name__)
+def set_log_file(path: str, name: str = __name__) -> None:
+    """
+    Write the file log of logger ``name`` to ``path`` from now on.
+
+    The current file is closed; the new one is opened (and rotated) by the
+    listener when the next record arrives.
+    """
+    listener = _listeners.get(name)
+    if listener is None:
+        return
+    for handler in listener.handlers:
+        if isinstance(handler, logging.handlers.RotatingFileHandler):
+            with handler.lock:
+                handler.close()
+                handler.baseFilename = os.path.abspath(path)
+
+
+def stop_logging(name: Optional[str] = None) -> None:
+    """
+    Write out queued records and stop the listener of one logger, or of all.
+
+    Runs at interpreter exit. Call it where exit handlers are skipped, such
+    as at the end of a multiprocessing worker.
+    """
+    names = [name] if name is not None else list(_listeners)
+    for listener_name in names:
+        listener = _listeners.pop(listener_name, None)
+        if listener is not None and listener._thread is not None:
+            listener.stop()
+        logger = logging.getLogger(listener_name)
+        for handler in list(logger.handlers):
+            if isinstance(handler, DeferredQueueHandler):
+                logger.removeHandler(handler)
+        if listener is not None:
+            for handler in listener.handlers:
+                handler.close()
+
+
+class _ForwardHandler(logging.Handler):
+    """Passes records to a logger's own handlers."""
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__()
+        self.logger = logger
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.logger.handle(record)
+
+
+def log_to_queue(log_queue, name: str = __name__) -> None:
+    """
+    Send the records of logger ``name`` to ``log_queue`` instead of writing
+    them in this process.
+
+    For multiprocessing workers: several processes rotating one log file
+    would lose or interleave records, so workers put their records on a
+    ``multiprocessing`` queue and the parent writes them out with
+    ``forward_records``. The logger's filters are kept.
+    """
+    logger = logging.getLogger(name)
+    filters = [f for handler in logger.handlers for f in handler.filters]
+    stop_logging(name)
+    # The stock handler merges message arguments, so records always pickle
+    handler = logging.handlers.QueueHandler(log_queue)
+    for log_filter in filters:
+        handler.addFilter(log_filter)
+    logger.addHandler(handler)
+
+
+def forward_records(
+    log_queue, name: str = __name__
+) -> logging.handlers.QueueListener:
+    """
+    Start a thread that hands records other processes put on ``log_queue``
+    (see ``log_to_queue``) to the handlers of logger ``name``. Call
+    ``stop()`` on the returned listener once those processes have exited.
+    """
+    listener = logging.handlers.QueueListener(
+        log_queue, _ForwardHandler(logging.getLogger(name))
+    )
+    listener.start()
+    return listener
+
+
+atexit.register(stop_logging)
+
+
+logger = get_logger(__name__, filters=(RateLimitFilter(),))
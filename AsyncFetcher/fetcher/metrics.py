@@ -0,0 +1,303 @@
+import math
+from collections import defaultdict
+from typing import Any, Optional
+
+import aiohttp
+
+from .scheduler import host_key
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+DEFAULT_MAX_HOSTS = 1000
+OTHER_HOST = "other"
+# Pass as ``trace_request_ctx`` to keep a request out of the traced metrics
+UNTRACKED = {"metrics": False}
+
+
+def _tracked(ctx) -> bool:
+    return ctx.trace_request_ctx is not UNTRACKED
+
+
+def status_class(status: Optional[int]) -> str:
+    """Group a status code as ``"2xx"``, ``"4xx"``, ...; None means transport error."""
+    if status is None:
+        return "error"
+    return f"{status // 100}xx"
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram of durations in seconds.
+
+    Bucket ``i`` covers ``[lowest * growth**i, lowest * growth**(i+1))``, so
+    every recorded value is reported with a relative error of at most
+    ``growth - 1`` (HDR-style), using a fixed number of counters regardless
+    of how many samples are recorded.
+    """
+
+    def __init__(
+        self, lowest: float = 1e-6, highest: float = 3600.0, precision: float = 0.02
+    ):
+        self.lowest = lowest
+        self.highest = highest
+        self.growth = 1.0 + precision
+        self._log_growth = math.log(self.growth)
+        self.counts = [0] * (self._index(highest) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        return int(math.log(value / self.lowest) / self._log_growth)
+
+    def record(self, value: float) -> None:
+        index = min(self._index(value), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Value below which a fraction ``q`` (0..1) of samples fall."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                upper = self.lowest * self.growth ** (index + 1)
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if len(other.counts) != len(self.counts):
+            raise ValueError("cannot merge histograms with different layouts")
+        for index, bucket_count in enumerate(other.counts):
+            self.counts[index] += bucket_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def summary(self, quantiles=DEFAULT_QUANTILES) -> dict[str, float]:
+        result = {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+        }
+        for q in quantiles:
+            result[f"p{q * 100:g}"] = self.percentile(q)
+        return result
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _series(name: str, labels) -> str:
+    """``name{k="v",...}``, or just ``name`` without labels."""
+    if not labels:
+        return name
+    label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f"{name}{{{label_text}}}"
+
+
+class FetcherMetrics:
+    """
+    Latency, throughput and connection metrics for an ``AsyncHTTPFetcher``.
+
+    Durations come from ``time.perf_counter`` and are kept in
+    ``LatencyHistogram``s:
+
+    - request latency per host and status class
+    - time to first byte (response headers) per host
+    - time spent waiting for a concurrency slot
+
+    Bytes and connection reuse are collected through aiohttp tracing; see
+    ``trace_config``.
+
+    Only the first ``max_hosts`` hosts seen get series of their own; later
+    hosts share the ``"other"`` label, so a crawl over millions of hosts
+    keeps a fixed number of histograms. ``None`` removes the cap.
+    """
+
+    def __init__(
+        self, quantiles=DEFAULT_QUANTILES, max_hosts: Optional[int] = DEFAULT_MAX_HOSTS
+    ):
+        self.quantiles = quantiles
+        self.max_hosts = max_hosts
+        self._hosts: set[str] = set()
+        self.latency: dict[tuple[str, str], LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+        self.ttfb: dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.slot_wait = LatencyHistogram()
+        self.bytes_in: dict[str, int] = defaultdict(int)
+        self.bytes_out: dict[str, int] = defaultdict(int)
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def label(self, host: str) -> str:
+        """The host label ``host`` is recorded under."""
+        if host in self._hosts:
+            return host
+        if self.max_hosts is not None and len(self._hosts) >= self.max_hosts:
+            return OTHER_HOST
+        self._hosts.add(host)
+        return host
+
+    def observe_request(
+        self, host: str, status: Optional[int], duration: float
+    ) -> None:
+        self.latency[(self.label(host), status_class(status))].record(duration)
+
+    def observe_ttfb(self, host: str, duration: float) -> None:
+        self.ttfb[self.label(host)].record(duration)
+
+    def observe_bytes_in(self, host: str, size: int) -> None:
+        self.bytes_in[self.label(host)] += size
+
+    def observe_slot_wait(self, duration: float) -> None:
+        self.slot_wait.record(duration)
+
+    @property
+    def connection_reuse_ratio(self) -> float:
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        TraceConfig that feeds byte counts and connection reuse into this object.
+
+        Requests sent with ``trace_request_ctx=UNTRACKED`` are left out.
+        """
+
+        async def on_request_chunk_sent(session, ctx, params):
+            if _tracked(ctx):
+                host = self.label(host_key(str(params.url)))
+                self.bytes_out[host] += len(params.chunk)
+
+        async def on_response_chunk_received(session, ctx, params):
+            if _tracked(ctx):
+                self.observe_bytes_in(host_key(str(params.url)), len(params.chunk))
+
+        async def on_connection_create_end(session, ctx, params):
+            if _tracked(ctx):
+                self.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            if _tracked(ctx):
+                self.connections_reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+        trace_config.on_response_chunk_received.append(on_response_chunk_received)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def snapshot(self) -> dict[str, Any]:
+        """Plain-dict view of all metrics, suitable for JSON."""
+        latency: dict[str, dict[str, Any]] = defaultdict(dict)
+        for (host, klass), histogram in sorted(self.latency.items()):
+            latency[host][klass] = histogram.summary(self.quantiles)
+
+        return {
+            "latency": dict(latency),
+            "ttfb": {
+                host: histogram.summary(self.quantiles)
+                for host, histogram in sorted(self.ttfb.items())
+            },
+            "slot_wait": self.slot_wait.summary(self.quantiles),
+            "bytes_in": dict(self.bytes_in),
+            "bytes_out": dict(self.bytes_out),
+            "connections": {
+                "created": self.connections_created,
+                "reused": self.connections_reused,
+                "reuse_ratio": self.connection_reuse_ratio,
+            },
+        }
+
+    def to_prometheus(
+        self,
+        stats: Optional[dict[str, int]] = None,
+        prefix: str = "fetcher",
+        gauges: Optional[dict[str, float]] = None,
+    ) -> str:
+        """
+        Render metrics in Prometheus text format.
+
+        Flat ``stats`` become counters and ``gauges`` become gauges.
+        """
+        lines: list[str] = []
+
+        def summary(name, help_text, series):
+            metric = f"{prefix}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for labels, histogram in series:
+                for q in self.quantiles:
+                    quantile = (*labels, ("quantile", f"{q:g}"))
+                    lines.append(
+                        f"{_series(metric, quantile)} {histogram.percentile(q):.6g}"
+                    )
+                lines.append(f"{_series(metric + '_sum', labels)} {histogram.sum:.6g}")
+                lines.append(f"{_series(metric + '_count', labels)} {histogram.count}")
+
+        def counter(name, help_text, series):
+            metric = f"{prefix}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in series:
+                lines.append(f"{_series(metric, labels)} {value}")
+
+        summary(
+            "request_duration_seconds",
+            "Request latency by host and status class.",
+            [
+                ((("host", host), ("status_class", klass)), histogram)
+                for (host, klass), histogram in sorted(self.latency.items())
+            ],
+        )
+        summary(
+            "time_to_first_byte_seconds",
+            "Time until response headers were received.",
+            [((("host", host),), h) for host, h in sorted(self.ttfb.items())],
+        )
+        summary(
+            "slot_wait_seconds",
+            "Time spent waiting for a concurrency slot.",
+            [((), self.slot_wait)],
+        )
+        counter(
+            "received_bytes_total",
+            "Response bytes received.",
+            [((("host", host),), n) for host, n in sorted(self.bytes_in.items())],
+        )
+        counter(
+            "sent_bytes_total",
+            "Request bytes sent.",
+            [((("host", host),), n) for host, n in sorted(self.bytes_out.items())],
+        )
+        counter(
+            "connections_total",
+            "Connections used, by whether they were newly created or reused.",
+            [
+                ((("state", "created"),), self.connections_created),
+                ((("state", "reused"),), self.connections_reused),
+            ],
+        )
+        for key, value in sorted((stats or {}).items()):
+            counter(f"{key}_total", f"Fetcher statistic {key}.", [((), value)])
+        for key, value in sorted((gauges or {}).items()):
+            metric = f"{prefix}_{key}"
+            lines.append(f"# HELP {metric} Fetcher gauge {key}.")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,209 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Mapping, Optional
+
+THROTTLE_STATUSES = frozenset({429, 503})
+MAX_RETRY_AFTER = 300.0
+
+
+def parse_retry_after(
+    headers: Optional[Mapping[str, str]], now: Optional[float] = None
+) -> Optional[float]:
+    """
+    Seconds to wait according to a ``Retry-After`` header, if present.
+
+    Accepts both forms allowed by RFC 9110: delay-seconds and an HTTP-date.
+    """
+    if not headers:
+        return None
+
+    value = headers.get("Retry-After")
+    if value is None:
+        for name, candidate in headers.items():
+            if name.lower() == "retry-after":
+                value = candidate
+                break
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (now or time.time()))
+
+
+class TokenBucket:
+    """
+    Token bucket with additive-increase / multiplicative-decrease of its rate.
+
+    ``reserve`` hands out tokens in FIFO order by letting the balance go
+    negative, so callers only need to sleep for the returned delay. A
+    throttling signal halves the rate (at most once per ``cooldown`` seconds)
+    and successes grow it back by about ``increase`` requests/second per
+    second, up to the configured ``max_rate``. With ``rate=None`` the bucket
+    never limits, but it still honours ``block`` (``Retry-After``).
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        increase: Optional[float] = None,
+        cooldown: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate or 1.0)
+        self.min_rate = min_rate if min_rate is not None else (rate or 0) / 100
+        self.decrease_factor = decrease_factor
+        self.increase = increase if increase is not None else (rate or 0) / 100
+        self.cooldown = cooldown
+        self.clock = clock
+
+        self.tokens = self.burst
+        self.updated = clock()
+        self.blocked_until = 0.0
+        self._last_decrease = float("-inf")
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take one token and return how long to wait before using it."""
+        now = self.clock()
+        blocked = max(0.0, self.blocked_until - now)
+        if self.rate is None:
+            return blocked
+
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        # Queued reservations keep their spacing after a Retry-After block
+        return blocked + wait
+
+    def try_take(self) -> bool:
+        """Take one token only if it can be used without waiting."""
+        now = self.clock()
+        if now < self.blocked_until:
+            return False
+        if self.rate is None:
+            return True
+
+        self._refill(now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def block(self, seconds: float) -> None:
+        """Hand out no tokens for the next ``seconds``."""
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """React to a 429/503: back off and lower the rate."""
+        now = self.clock()
+        if retry_after:
+            self.block(retry_after)
+        if self.rate is None or now - self._last_decrease < self.cooldown:
+            return
+
+        self._refill(now)
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        # Drop accumulated burst so the lower rate takes effect immediately
+        self.tokens = min(self.tokens, 0.0)
+
+    def on_success(self) -> None:
+        """Grow the rate back towards ``max_rate`` after a success."""
+        if self.rate is None or self.rate >= self.max_rate:
+            return
+        self._refill(self.clock())
+        self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+
+class HostRateLimiter:
+    """
+    Per-host token buckets, created lazily on first use.
+
+    ``rate`` (requests per second) applies to every host unless overridden
+    in ``per_host``. Hosts without a rate are not limited but still honour
+    ``Retry-After``. Extra keyword arguments are passed to each
+    ``TokenBucket``.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        per_host: Optional[dict[str, float]] = None,
+        max_retry_after: float = MAX_RETRY_AFTER,
+        clock: Callable[[], float] = time.monotonic,
+        **bucket_options,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.per_host = dict(per_host or {})
+        self.max_retry_after = max_retry_after
+        self.clock = clock
+        self.bucket_options = bucket_options
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate = self.per_host.get(host, self.rate)
+            burst = self.burst if host not in self.per_host else None
+            bucket = self._buckets[host] = TokenBucket(
+                rate, burst, clock=self.clock, **self.bucket_options
+            )
+        return bucket
+
+    def current_rate(self, host: str) -> Optional[float]:
+        return self.bucket(host).rate
+
+    async def acquire(self, host: str) -> float:
+        """Wait for a token for ``host``; returns the time waited."""
+        delay = self.bucket(host).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def try_acquire(self, host: str) -> bool:
+        """Take a token for ``host`` only if no wait is needed."""
+        return self.bucket(host).try_take()
+
+    def on_response(
+        self, host: str, status: int, headers: Optional[Mapping[str, str]] = None
+    ) -> Optional[float]:
+        """
+        Feed a response status back into the host's bucket.
+
+        Returns:
+            The ``Retry-After`` delay for throttled responses, if any.
+        """
+        bucket = self.bucket(host)
+        if status in THROTTLE_STATUSES:
+            retry_after = parse_retry_after(headers)
+            if retry_after is not None:
+                retry_after = min(retry_after, self.max_retry_after)
+            bucket.on_throttled(retry_after)
+            return retry_after
+        if status < 400:
+            bucket.on_success()
+        return None
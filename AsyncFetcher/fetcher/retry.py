@@ -0,0 +1,99 @@
+import random
+import time
+from collections import deque
+from typing import Callable, Optional
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of recent traffic.
+
+    Every logical request deposits into the budget and every retry withdraws
+    from it. Over a sliding ``window`` of seconds, at most
+    ``ratio * requests + min_per_second * window`` retries are allowed, so a
+    partial outage cannot turn into a retry storm while low-traffic clients
+    can still retry.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 10.0,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ratio < 0:
+            raise ValueError("ratio must not be negative")
+        if window <= 0:
+            raise ValueError("window must be positive")
+
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self.clock = clock
+        # One [second, requests, retries] bucket per second in the window
+        self._buckets: deque[list] = deque()
+
+    def _bucket(self) -> list:
+        now = int(self.clock())
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+        return self._buckets[-1]
+
+    def record_request(self) -> None:
+        """Deposit one logical request into the budget."""
+        self._bucket()[1] += 1
+
+    def try_spend(self) -> bool:
+        """Withdraw one retry, returning False if the budget is exhausted."""
+        bucket = self._bucket()
+        requests = sum(b[1] for b in self._buckets)
+        retries = sum(b[2] for b in self._buckets)
+        allowed = self.ratio * requests + self.min_per_second * self.window
+        if retries >= allowed:
+            return False
+        bucket[2] += 1
+        return True
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter plus an optional global retry budget.
+
+    The fetcher releases its concurrency slot before sleeping for
+    ``backoff(attempt)``, so requests waiting to be retried are parked on the
+    event loop's timer heap rather than holding a slot. Jitter is drawn from
+    ``rng``, or the ``random`` module by default; pass a seeded
+    ``random.Random`` for reproducible delays.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        jitter: bool = True,
+        budget: Optional[RetryBudget] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.budget = budget
+        self.rng = rng
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retrying after the given (0-based) failed attempt."""
+        delay = min(self.base_delay * 2**attempt, self.max_delay)
+        if self.jitter:
+            # "Full jitter": spreads synchronised failures over the interval
+            delay = (self.rng or random).uniform(0, delay)
+        return delay
+
+    def record_request(self) -> None:
+        if self.budget is not None:
+            self.budget.record_request()
+
+    def allow_retry(self) -> bool:
+        return self.budget is None or self.budget.try_spend()
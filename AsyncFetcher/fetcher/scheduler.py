@@ -0,0 +1,228 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+from urllib.parse import urlsplit
+
+from .exceptions import DeadlineExceededError
+
+
+def host_key(url: str) -> str:
+    """Return the ``host[:port]`` part of a URL used to group requests."""
+    return urlsplit(url).netloc.lower()
+
+
+class HostScheduler:
+    """
+    Hands out concurrency slots fairly across hosts.
+
+    Requests waiting for a slot are queued per host, and free slots are
+    granted by weighted round-robin over the hosts that have waiters. A host
+    with weight ``w`` receives up to ``w`` grants per turn. With
+    ``max_per_host`` set, a single slow host can hold at most that many slots,
+    so it cannot starve the other hosts.
+
+    Waiters carry a priority and an optional wall-clock deadline. The highest
+    waiting priority is always served first, and round-robin applies among
+    the hosts whose next waiter has that priority. Within a host, waiters of
+    equal priority are served nearest-deadline first, then in arrival order.
+    A waiter whose deadline passes is woken with ``DeadlineExceededError``.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_per_host: Optional[int] = None,
+        weights: Optional[dict[str, int]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_concurrent <= 0:
+            raise ValueError("max_concurrent must be positive")
+        if max_per_host is not None and max_per_host <= 0:
+            raise ValueError("max_per_host must be positive")
+
+        self.max_concurrent = max_concurrent
+        self.max_per_host = max_per_host
+        self.weights = dict(weights or {})
+        self.clock = clock
+        self._in_use = 0
+        self._active: dict[str, int] = {}
+        # Per-host heaps of (-priority, deadline, sequence, future)
+        self._waiters: dict[str, list[tuple]] = {}
+        self._sequence = itertools.count()
+        self._rotation: deque[str] = deque()
+        self._credit: dict[str, int] = {}
+
+    @property
+    def in_use(self) -> int:
+        """Number of slots currently held."""
+        return self._in_use
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting for a slot."""
+        return sum(len(queue) for queue in self._waiters.values())
+
+    def active(self, host: str) -> int:
+        """Number of slots currently held by ``host``."""
+        return self._active.get(host, 0)
+
+    def set_limit(self, max_concurrent: int) -> None:
+        """
+        Change the number of slots.
+
+        Raising the limit wakes waiters at once. Lowering it takes effect as
+        held slots are released.
+        """
+        if max_concurrent <= 0:
+            raise ValueError("max_concurrent must be positive")
+        self.max_concurrent = max_concurrent
+        self._dispatch()
+
+    async def acquire(
+        self, host: str, priority: int = 0, deadline: Optional[float] = None
+    ) -> None:
+        """
+        Wait until a slot for ``host`` is granted.
+
+        Raises:
+            DeadlineExceededError: If ``deadline`` passes first.
+        """
+        if deadline is not None and self.clock() >= deadline:
+            raise DeadlineExceededError(f"Deadline passed waiting for {host}")
+        if (
+            not self._rotation
+            and self._in_use < self.max_concurrent
+            and self._can_run(host)
+        ):
+            self._grant(host)
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._waiters.get(host)
+        if queue is None:
+            queue = self._waiters[host] = []
+            self._rotation.append(host)
+        entry = (
+            -priority,
+            math.inf if deadline is None else deadline,
+            next(self._sequence),
+            future,
+        )
+        heapq.heappush(queue, entry)
+        timer = None
+        if deadline is not None:
+            timer = loop.call_later(
+                deadline - self.clock(), self._expire, host, future
+            )
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been granted just before the cancellation
+            if (
+                future.done()
+                and not future.cancelled()
+                and future.exception() is None
+            ):
+                self.release(host)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def try_acquire(self, host: str) -> bool:
+        """Take a slot for ``host`` only if one is free right now."""
+        if (
+            self._rotation
+            or self._in_use >= self.max_concurrent
+            or not self._can_run(host)
+        ):
+            return False
+        self._grant(host)
+        return True
+
+    def release(self, host: str) -> None:
+        """Return a slot held by ``host`` and wake the next waiter."""
+        self._in_use -= 1
+        remaining = self._active[host] - 1
+        if remaining:
+            self._active[host] = remaining
+        else:
+            del self._active[host]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self, host: str, priority: int = 0, deadline: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """Hold a slot for ``host`` for the duration of the block."""
+        await self.acquire(host, priority, deadline)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    def _can_run(self, host: str) -> bool:
+        return self.max_per_host is None or self.active(host) < self.max_per_host
+
+    def _grant(self, host: str) -> None:
+        self._in_use += 1
+        self._active[host] = self._active.get(host, 0) + 1
+
+    def _drop_host(self, host: str) -> None:
+        self._rotation.remove(host)
+        del self._waiters[host]
+        self._credit.pop(host, None)
+
+    def _expire(self, host: str, future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_exception(
+                DeadlineExceededError(f"Deadline passed waiting for {host}")
+            )
+
+    def _next_priority(self) -> Optional[int]:
+        """Best queued priority among hosts that can run; prunes empty hosts."""
+        best = None
+        for host in list(self._rotation):
+            queue = self._waiters[host]
+            # Drop waiters that were cancelled or expired while queued
+            while queue and queue[0][3].done():
+                heapq.heappop(queue)
+            if not queue:
+                self._drop_host(host)
+            elif self._can_run(host) and (best is None or queue[0][0] < best):
+                best = queue[0][0]
+        return best
+
+    def _dispatch(self) -> None:
+        while self._in_use < self.max_concurrent and self._rotation:
+            best = self._next_priority()
+            if best is None:
+                return
+
+            # Round-robin among the hosts serving the best priority
+            while True:
+                host = self._rotation[0]
+                queue = self._waiters[host]
+                if queue[0][0] == best and self._can_run(host):
+                    break
+                self._rotation.rotate(-1)
+
+            heapq.heappop(queue)[3].set_result(None)
+            self._grant(host)
+
+            credit = self._credit.get(host, self.weights.get(host, 1)) - 1
+            if not queue:
+                self._drop_host(host)
+            elif credit <= 0:
+                self._credit.pop(host, None)
+                self._rotation.rotate(-1)
+            else:
+                self._credit[host] = credit
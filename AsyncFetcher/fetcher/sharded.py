@@ -0,0 +1,407 @@
+import asyncio
+import multiprocessing
+import os
+import pickle
+import queue
+import zlib
+from collections import Counter
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Optional, Union
+
+from .dataclass import FetchResult, HTTPRequest, HTTPResponse
+from .exceptions import ConfigurationError, WorkerError
+from .fetch import _EXHAUSTED, AsyncHTTPFetcher
+from .logging import forward_records, log_to_queue, logger, stop_logging
+from .scheduler import host_key
+
+
+def shard_for(url: str, shards: int) -> int:
+    """Stable shard index for ``url``; all URLs of one host share a shard."""
+    return zlib.crc32(host_key(url).encode()) % shards
+
+
+def _portable(error: Optional[BaseException]) -> Optional[BaseException]:
+    """Return ``error`` if it survives pickling, else a ``WorkerError`` copy."""
+    if error is None:
+        return None
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return WorkerError(f"{type(error).__name__}: {error}")
+
+
+def _exited(process) -> WorkerError:
+    return WorkerError(
+        f"Shard worker {process.name} exited with code {process.exitcode}"
+    )
+
+
+def _worker_main(
+    shard: int,
+    requests_queue,
+    results_queue,
+    options: dict[str, Any],
+    window: int,
+    batch_size: int,
+    flush_interval: float,
+    log_level: int,
+    log_queue,
+) -> None:
+    """Entry point of a shard worker process."""
+    log_to_queue(log_queue)
+    logger.setLevel(log_level)
+    try:
+        asyncio.run(
+            _worker(
+                shard,
+                requests_queue,
+                results_queue,
+                options,
+                window,
+                batch_size,
+                flush_interval,
+            )
+        )
+    finally:
+        # Worker processes skip exit handlers, so write out queued records
+        stop_logging()
+
+
+async def _worker(
+    shard, requests_queue, results_queue, options, window, batch_size, flush_interval
+) -> None:
+    loop = asyncio.get_running_loop()
+    tags: dict[int, tuple[int, int]] = {}
+    pending: list[tuple] = []
+
+    async def source():
+        local_index = 0
+        while True:
+            batch = await loop.run_in_executor(None, requests_queue.get)
+            if batch is None:
+                return
+            for call_id, index, request in batch:
+                tags[local_index] = (call_id, index)
+                local_index += 1
+                yield request
+
+    async def flush() -> None:
+        if pending:
+            batch = pending[:]
+            pending.clear()
+            await loop.run_in_executor(None, results_queue.put, ("results", batch))
+
+    async with AsyncHTTPFetcher(**options) as fetcher:
+
+        async def flush_periodically() -> None:
+            while True:
+                await asyncio.sleep(flush_interval)
+                await flush()
+                await loop.run_in_executor(
+                    None, results_queue.put, ("stats", shard, fetcher.get_stats())
+                )
+
+        flusher = asyncio.create_task(flush_periodically())
+        try:
+            async for result in fetcher.fetch_iter(source(), window=window):
+                call_id, index = tags.pop(result.index)
+                pending.append(
+                    (call_id, index, result.response, _portable(result.error))
+                )
+                if len(pending) >= batch_size:
+                    await flush()
+        finally:
+            flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+
+        await flush()
+        await loop.run_in_executor(
+            None, results_queue.put, ("stats", shard, fetcher.get_stats())
+        )
+
+
+class ShardedFetcher:
+    """
+    Spreads requests over worker processes, each running its own event loop,
+    ``AsyncHTTPFetcher``, session and scheduler.
+
+    Requests are partitioned by a stable hash of their host, so connections to
+    one host are pooled in a single worker. Requests and results travel in
+    batches of ``batch_size`` through multiprocessing queues. Workers flush
+    partial result batches and their stats every ``flush_interval`` seconds.
+    At most ``max_in_flight`` requests are dispatched but not yet yielded, so
+    memory stays bounded for arbitrarily large inputs.
+
+    Extra keyword arguments are passed to each worker's ``AsyncHTTPFetcher``,
+    so they must be picklable. Workers log at the parent logger's level, and
+    their records are written by the parent's handlers.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        window: int = 256,
+        max_in_flight: Optional[int] = None,
+        batch_size: int = 64,
+        flush_interval: float = 0.05,
+        start_method: str = "spawn",
+        **fetcher_options,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.window = window
+        self.max_in_flight = max_in_flight or self.workers * window * 2
+        if self.max_in_flight < batch_size:
+            raise ConfigurationError("max_in_flight must be at least batch_size.")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fetcher_options = fetcher_options
+        self._context = multiprocessing.get_context(start_method)
+        self._processes: list = []
+        self._request_queues: list = []
+        self._results = None
+        self._log_queue = None
+        self._log_listener = None
+        self._shard_stats: dict[int, dict[str, int]] = {}
+        self._call_id = 0
+        self._lock = asyncio.Lock()
+        # A queue read outlives an abandoned fetch_iter; the next one reuses it
+        self._get: Optional[asyncio.Future] = None
+
+    async def __aenter__(self):
+        self._results = self._context.Queue(maxsize=self.workers * 4)
+        self._log_queue = self._context.Queue()
+        self._log_listener = forward_records(self._log_queue)
+        for shard in range(self.workers):
+            requests_queue = self._context.Queue(maxsize=4)
+            process = self._context.Process(
+                target=_worker_main,
+                name=f"fetcher-shard-{shard}",
+                args=(
+                    shard,
+                    requests_queue,
+                    self._results,
+                    self.fetcher_options,
+                    self.window,
+                    self.batch_size,
+                    self.flush_interval,
+                    logger.level,
+                    self._log_queue,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._request_queues.append(requests_queue)
+            self._processes.append(process)
+        logger.info("Started %d fetcher shard workers", self.workers)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        loop = asyncio.get_running_loop()
+        if self._get is not None:
+            await asyncio.gather(self._get, return_exceptions=True)
+            self._get = None
+        for shard in range(len(self._request_queues)):
+            try:
+                await self._put(shard, None)
+            except WorkerError:
+                pass  # Already gone; nothing to stop
+
+        # Keep draining results so workers are never blocked on a full queue
+        while any(p.is_alive() for p in self._processes):
+            try:
+                message = await loop.run_in_executor(
+                    None, self._results.get, True, 0.1
+                )
+            except queue.Empty:
+                continue
+            if message[0] == "stats":
+                self._shard_stats[message[1]] = message[2]
+
+        for process in self._processes:
+            process.join()
+        self._processes.clear()
+        self._request_queues.clear()
+        # Workers have exited, so everything they logged is on the queue
+        self._log_listener.stop()
+        self._log_listener = None
+
+    def get_stats(self) -> dict[str, int]:
+        """Stats summed over all workers, as last reported."""
+        total: Counter = Counter()
+        for stats in self._shard_stats.values():
+            total.update(stats)
+        return dict(total)
+
+    async def _next_message(self) -> tuple:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                return await loop.run_in_executor(None, self._results.get, True, 0.5)
+            except queue.Empty:
+                for process in self._processes:
+                    if not process.is_alive():
+                        raise _exited(process)
+
+    async def _put(self, shard: int, item: Any) -> None:
+        """
+        Put ``item`` on a worker's bounded request queue.
+
+        Raises:
+            WorkerError: If the worker exits before there is room.
+        """
+        loop = asyncio.get_running_loop()
+        requests_queue = self._request_queues[shard]
+        process = self._processes[shard]
+        while True:
+            if not process.is_alive():
+                raise _exited(process)
+            try:
+                return await loop.run_in_executor(
+                    None, requests_queue.put, item, True, 0.5
+                )
+            except queue.Full:
+                continue
+
+    async def _dispatch(
+        self,
+        call_id: int,
+        requests: Union[Iterable[HTTPRequest], AsyncIterable[HTTPRequest]],
+        credits: asyncio.Semaphore,
+        in_flight: dict[int, HTTPRequest],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        batches: list[list] = [[] for _ in range(self.workers)]
+
+        async def send(shard: int) -> None:
+            batch, batches[shard] = batches[shard], []
+            await self._put(shard, batch)
+
+        async def send_all() -> None:
+            for shard in range(self.workers):
+                if batches[shard]:
+                    await send(shard)
+
+        async def add(request: HTTPRequest) -> None:
+            nonlocal total
+            # Credits held by unsent partial batches only come back once the
+            # batches are sent, so send them before waiting for a credit
+            if credits.locked():
+                await send_all()
+            await credits.acquire()
+            shard = shard_for(request.url, self.workers)
+            batches[shard].append((call_id, total, request))
+            in_flight[total] = request
+            total += 1
+            if len(batches[shard]) >= self.batch_size:
+                await send(shard)
+
+        total = 0
+        if hasattr(requests, "__aiter__"):
+            # A slow async source must not hold back partial batches, so they
+            # are sent whenever the next request takes over flush_interval
+            source = requests.__aiter__()
+            pull: Optional[asyncio.Future] = None
+            try:
+                while True:
+                    if pull is None:
+                        pull = asyncio.ensure_future(anext(source, _EXHAUSTED))
+                    done, _ = await asyncio.wait({pull}, timeout=self.flush_interval)
+                    if not done:
+                        await send_all()
+                        continue
+                    request, pull = pull.result(), None
+                    if request is _EXHAUSTED:
+                        break
+                    await add(request)
+            finally:
+                if pull is not None:
+                    pull.cancel()
+        else:
+            for request in requests:
+                await add(request)
+
+        await send_all()
+        await loop.run_in_executor(
+            None, self._results.put, ("dispatched", call_id, total)
+        )
+
+    async def fetch_iter(
+        self,
+        requests: Union[Iterable[HTTPRequest], AsyncIterable[HTTPRequest]],
+        ordered: bool = False,
+    ) -> AsyncIterator[FetchResult]:
+        """
+        Stream results from the workers, in completion or input order.
+
+        Results of requests dispatched by an abandoned earlier call are
+        discarded. Only one ``fetch_iter`` runs at a time per instance.
+        """
+        async with self._lock:
+            self._call_id += 1
+            call_id = self._call_id
+            credits = asyncio.Semaphore(self.max_in_flight)
+            in_flight: dict[int, HTTPRequest] = {}
+            dispatcher = asyncio.create_task(
+                self._dispatch(call_id, requests, credits, in_flight)
+            )
+            buffered: dict[int, FetchResult] = {}
+            next_to_yield = 0
+            received = 0
+            total: Optional[int] = None
+
+            try:
+                while total is None or received < total:
+                    if self._get is None:
+                        self._get = asyncio.ensure_future(self._next_message())
+                    waiting = {self._get}
+                    if not dispatcher.done():
+                        waiting.add(dispatcher)
+                    done, _ = await asyncio.wait(
+                        waiting, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if dispatcher in done and dispatcher.exception():
+                        raise dispatcher.exception()
+                    if self._get not in done:
+                        continue
+                    get, self._get = self._get, None
+                    message = get.result()
+
+                    if message[0] == "stats":
+                        self._shard_stats[message[1]] = message[2]
+                        continue
+                    if message[0] == "dispatched":
+                        if message[1] == call_id:
+                            total = message[2]
+                        continue
+
+                    for result_call, index, response, error in message[1]:
+                        if result_call != call_id:
+                            continue
+                        received += 1
+                        result = FetchResult(
+                            index=index,
+                            request=in_flight.pop(index),
+                            response=response,
+                            error=error,
+                        )
+                        if not ordered:
+                            credits.release()
+                            yield result
+                            continue
+                        buffered[index] = result
+                        while next_to_yield in buffered:
+                            credits.release()
+                            yield buffered.pop(next_to_yield)
+                            next_to_yield += 1
+            finally:
+                if not dispatcher.done():
+                    dispatcher.cancel()
+                await asyncio.gather(dispatcher, return_exceptions=True)
+
+    async def fetch_all(self, requests: Iterable[HTTPRequest]) -> list[HTTPResponse]:
+        """Fetch all requests and return the successful responses in input order."""
+        return [
+            result.response
+            async for result in self.fetch_iter(requests, ordered=True)
+            if result.ok
+        ]
@@ -0,0 +1,386 @@
+import asyncio
+import logging
+import math
+import random
+import selectors
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import aiohttp
+
+from .dataclass import HTTPRequest
+from .fetch import AsyncHTTPFetcher
+from .logging import logger
+from .metrics import DEFAULT_QUANTILES, LatencyHistogram
+from .retry import RetryBudget, RetryPolicy
+from .scheduler import host_key
+from .transport import RecordedResponse, ReplayResponse, _prepare
+
+# How long a request that never gets an answer hangs without a timeout
+MAX_HANG = 300.0
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """
+    Selector that polls instead of waiting and advances a virtual clock.
+
+    The event loop asks the selector to wait until its next timer is due;
+    when no I/O is ready, that wait is skipped by moving the clock forward.
+    Without timers (``timeout=None``) it waits for I/O as usual, e.g. for
+    executor threads to finish.
+    """
+
+    def __init__(self, start: float):
+        super().__init__()
+        self.now = start
+
+    def select(self, timeout: Optional[float] = None):
+        events = super().select(None if timeout is None else 0)
+        if not events and timeout:
+            self.now += timeout
+        return events
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop whose clock jumps to the next timer instead of waiting.
+
+    ``asyncio.sleep``, ``asyncio.timeout`` and ``call_later`` all use
+    ``loop.time()``, so hours of backoff and latency pass in the time it
+    takes to run the callbacks. Sockets still work but are polled without
+    waiting, so simulations should use a transport rather than the network.
+    Only public hooks are used: the loop's own selector and ``time()``.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._clock = _VirtualSelector(start)
+        super().__init__(self._clock)
+
+    def time(self) -> float:
+        return self._clock.now
+
+
+@dataclass
+class UpstreamModel:
+    """
+    Synthetic behaviour of each simulated upstream host.
+
+    Latency is log-normal around ``latency`` (the median); ``latency_sigma``
+    sets the tail, with p99 at about ``latency * exp(2.33 * sigma)``.
+    ``error_rate`` of the requests get a 503 and ``timeout_rate`` never get
+    an answer. Above ``rate_limit`` requests per second (with ``burst``) a
+    host answers 429 with ``Retry-After``. With ``capacity`` set, a host
+    serves that many requests at once and queues the rest.
+    """
+
+    latency: float = 0.05
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    rate_limit: Optional[float] = None
+    burst: int = 10
+    retry_after: float = 1.0
+    capacity: Optional[int] = None
+    body: bytes = b'{"ok": true}'
+
+
+class _HostState:
+    __slots__ = ("tokens", "updated", "workers", "in_flight")
+
+    def __init__(self, model: UpstreamModel, now: float):
+        self.tokens = float(model.burst)
+        self.updated = now
+        self.workers = asyncio.Semaphore(model.capacity) if model.capacity else None
+        self.in_flight = 0
+
+
+class _SimulatedContext:
+    __slots__ = ("transport", "method", "url", "timeout")
+
+    def __init__(self, transport, method: str, url: str, timeout: float):
+        self.transport = transport
+        self.method = method
+        self.url = url
+        self.timeout = timeout
+
+    async def __aenter__(self) -> ReplayResponse:
+        return await self.transport._respond(self.method, self.url, self.timeout)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+class SimulatedTransport:
+    """
+    Answers requests from an ``UpstreamModel`` on the running loop's clock.
+
+    Counts what the upstream saw: requests (retries and hedges included),
+    status codes, timeouts and the peak number of requests in progress.
+    """
+
+    def __init__(self, model: UpstreamModel, seed: Optional[int] = None):
+        self.model = model
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.statuses: Counter = Counter()
+        self.timeouts = 0
+        self.peak_in_flight = 0
+        self._hosts: dict[str, _HostState] = {}
+        self._responses = {
+            status: RecordedResponse("", status, headers, body)
+            for status, headers, body in (
+                (200, {"Content-Type": "application/json"}, model.body),
+                (503, {}, b""),
+                (429, {"Retry-After": f"{model.retry_after:g}"}, b""),
+            )
+        }
+        self._prepared = {
+            status: _prepare(recorded) for status, recorded in self._responses.items()
+        }
+
+    def request(self, method: str, url: str, **kwargs) -> _SimulatedContext:
+        timeout = kwargs.get("timeout")
+        total = timeout.total if timeout is not None and timeout.total else None
+        return _SimulatedContext(self, method, url, total or MAX_HANG)
+
+    def _rate_limited(self, state: _HostState, now: float) -> bool:
+        model = self.model
+        if model.rate_limit is None:
+            return False
+        elapsed = now - state.updated
+        state.tokens = min(model.burst, state.tokens + elapsed * model.rate_limit)
+        state.updated = now
+        if state.tokens < 1:
+            return True
+        state.tokens -= 1
+        return False
+
+    async def _respond(self, method: str, url: str, timeout: float) -> ReplayResponse:
+        model = self.model
+        loop = asyncio.get_running_loop()
+        host = host_key(url)
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(model, loop.time())
+        self.requests += 1
+
+        rng = self.random
+        latency = rng.lognormvariate(math.log(model.latency), model.latency_sigma)
+        if self._rate_limited(state, loop.time()):
+            status = 429
+        elif rng.random() < model.error_rate:
+            status = 503
+        else:
+            status = 200
+        hang = status == 200 and rng.random() < model.timeout_rate
+
+        state.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, state.in_flight)
+        try:
+            async with asyncio.timeout(timeout):
+                if state.workers is not None:
+                    async with state.workers:
+                        await asyncio.sleep(math.inf if hang else latency)
+                else:
+                    await asyncio.sleep(math.inf if hang else latency)
+        except TimeoutError:
+            self.timeouts += 1
+            raise aiohttp.ServerTimeoutError(f"Simulated timeout for {url}")
+        finally:
+            state.in_flight -= 1
+
+        self.statuses[status] += 1
+        recorded = self._responses[status]
+        return ReplayResponse(method, url, recorded, self._prepared[status])
+
+    async def open(self, session: aiohttp.ClientSession) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+@dataclass
+class SimulationReport:
+    """Outcome of one ``Simulation.run``; latencies include retries and queueing."""
+
+    requests: int
+    succeeded: int
+    failed: int
+    simulated_seconds: float
+    wall_seconds: float
+    upstream_requests: int
+    latency: LatencyHistogram
+    upstream_statuses: dict[int, int] = field(default_factory=dict)
+    upstream_timeouts: int = 0
+    peak_upstream_in_flight: int = 0
+    errors: dict[str, int] = field(default_factory=dict)
+    stats: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Successful requests per simulated second."""
+        if self.simulated_seconds <= 0:
+            return 0.0
+        return self.succeeded / self.simulated_seconds
+
+    @property
+    def retry_amplification(self) -> float:
+        """Upstream requests sent per logical request."""
+        return self.upstream_requests / self.requests if self.requests else 0.0
+
+    @property
+    def speedup(self) -> float:
+        """Simulated seconds per wall-clock second."""
+        return self.simulated_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "throughput": self.throughput,
+            "latency": {
+                f"p{round(q * 100)}": self.latency.percentile(q)
+                for q in DEFAULT_QUANTILES
+            },
+            "latency_max": self.latency.max,
+            "retry_amplification": self.retry_amplification,
+            "upstream_statuses": dict(self.upstream_statuses),
+            "upstream_timeouts": self.upstream_timeouts,
+            "peak_upstream_in_flight": self.peak_upstream_in_flight,
+            "errors": dict(self.errors),
+            "simulated_seconds": self.simulated_seconds,
+            "wall_seconds": self.wall_seconds,
+            "speedup": self.speedup,
+        }
+
+
+class Simulation:
+    """
+    Runs ``AsyncHTTPFetcher`` on a ``VirtualTimeLoop`` against an upstream model.
+
+    Requests arrive as a Poisson process at ``rate`` per second for
+    ``duration`` simulated seconds, spread round-robin over ``hosts``
+    hosts, and each is sent with ``fetch_single`` as it arrives, so a
+    fetcher that cannot keep up shows it as queueing latency.
+    ``request_options`` are passed to every ``HTTPRequest``.
+
+    Components that keep time (rate limiters, circuit breakers, adaptive
+    limits, retry budgets) must be built with ``clock=simulation.clock``;
+    a default retry budget is created on that clock. Request deadlines
+    use wall-clock time and should not be set. The default retry policy
+    draws its jitter from ``random.Random(seed)``, so runs with the same
+    seed and options give the same report.
+    """
+
+    def __init__(
+        self,
+        upstream: UpstreamModel,
+        rate: float,
+        duration: float,
+        hosts: int = 1,
+        seed: Optional[int] = 0,
+        request_options: Optional[dict[str, Any]] = None,
+    ):
+        if rate <= 0 or duration <= 0 or hosts <= 0:
+            raise ValueError("rate, duration and hosts must be positive")
+        self.upstream = upstream
+        self.rate = rate
+        self.duration = duration
+        self.hosts = hosts
+        self.seed = seed
+        self.request_options = request_options or {}
+        self.loop = VirtualTimeLoop()
+
+    def clock(self) -> float:
+        """The simulation's virtual time, for ``clock=`` arguments."""
+        return self.loop.time()
+
+    def run(
+        self, log_level: int = logging.CRITICAL, **fetcher_options
+    ) -> SimulationReport:
+        """
+        Simulate the whole workload with one fetcher and report the result.
+
+        ``fetcher_options`` are ``AsyncHTTPFetcher`` arguments. The fetcher's
+        log level is set to ``log_level`` for the run; per-request log lines
+        would otherwise cost more than the simulation itself.
+        """
+        fetcher_options.setdefault(
+            "retry_policy",
+            RetryPolicy(
+                budget=RetryBudget(clock=self.clock), rng=random.Random(self.seed)
+            ),
+        )
+        previous_level = logger.level
+        logger.setLevel(log_level)
+        try:
+            return self.loop.run_until_complete(self._run(fetcher_options))
+        finally:
+            logger.setLevel(previous_level)
+
+    async def _run(self, fetcher_options: dict[str, Any]) -> SimulationReport:
+        transport = SimulatedTransport(self.upstream, self.seed)
+        arrivals = random.Random(self.seed)
+        latency = LatencyHistogram()
+        errors: Counter = Counter()
+        counts = {"requests": 0, "succeeded": 0}
+
+        async def one(url: str) -> None:
+            arrived = self.loop.time()
+            try:
+                await fetcher.fetch_single(HTTPRequest(url, **self.request_options))
+                counts["succeeded"] += 1
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            latency.record(self.loop.time() - arrived)
+
+        wall_start = time.perf_counter()
+        async with AsyncHTTPFetcher(transport=transport, **fetcher_options) as fetcher:
+            fetcher.clock = self.clock
+            start = self.loop.time()
+            end = start + self.duration
+            next_arrival = start
+            tasks: set[asyncio.Task] = set()
+            while True:
+                next_arrival += arrivals.expovariate(self.rate)
+                if next_arrival >= end:
+                    break
+                await asyncio.sleep(next_arrival - self.loop.time())
+                index = counts["requests"]
+                counts["requests"] += 1
+                url = f"https://host{index % self.hosts}.sim/items/{index}"
+                task = asyncio.create_task(one(url))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            simulated = self.loop.time() - start
+            stats = fetcher.get_stats()
+
+        return SimulationReport(
+            requests=counts["requests"],
+            succeeded=counts["succeeded"],
+            failed=counts["requests"] - counts["succeeded"],
+            simulated_seconds=simulated,
+            wall_seconds=time.perf_counter() - wall_start,
+            upstream_requests=transport.requests,
+            latency=latency,
+            upstream_statuses=dict(transport.statuses),
+            upstream_timeouts=transport.timeouts,
+            peak_upstream_in_flight=transport.peak_in_flight,
+            errors=dict(errors),
+            stats=stats,
+        )
+
+    def close(self) -> None:
+        self.loop.close()
+
+    def __enter__(self) -> "Simulation":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar
+
+from .dataclass import BodyMode, HTTPRequest
+
+T = TypeVar("T")
+
+COALESCED_METHODS = frozenset({"GET", "HEAD"})
+
+
+def flight_key(request: HTTPRequest) -> Optional[tuple]:
+    """
+    Key identifying requests that may share one network call.
+
+    Only body-less GET and HEAD requests are coalesced, and never when the
+    body is streamed to a sink. Header names are case-normalised so that
+    equivalent header dicts map to the same key. Requests with different
+    deadlines, timeouts or retry counts are not merged, since the shared
+    call follows the first caller's settings.
+    """
+    method = request.method.upper()
+    if (
+        method not in COALESCED_METHODS
+        or request.data is not None
+        or request.body_mode is BodyMode.STREAM
+    ):
+        return None
+    headers = tuple(
+        sorted((name.lower(), value) for name, value in (request.headers or {}).items())
+    )
+    body = (request.body_mode, request.max_body_size, request.prefix_size)
+    limits = (request.deadline, request.timeout, request.max_retries)
+    return (method, request.url, headers, body, limits)
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call among concurrent callers with the same key.
+
+    The first caller starts the call in its own task and later callers
+    attach to it. A caller that is cancelled detaches without affecting the
+    others, and the call itself is cancelled only once every caller is gone.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn()``, or join the call already running for ``key``."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,184 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from .dataclass import HTTPRequest, HTTPResponse
+from .fetch import AsyncHTTPFetcher
+from .logging import logger
+
+
+class SyncHTTPFetcher:
+    """
+    Thread-safe blocking facade over one long-lived ``AsyncHTTPFetcher``.
+
+    ``asyncio.run(fetcher.fetch_all(...))`` per batch builds a new loop,
+    session and connection pool every time. This class instead starts one
+    event loop in a daemon thread on first use and keeps a single fetcher
+    open on it, so keep-alive connections, the cache, rate limits and
+    circuit breakers are shared by every call from every thread.
+
+    ``submit`` and ``fetch_many`` return ``concurrent.futures.Future``s;
+    cancelling one cancels the underlying request. ``fetch`` blocks for the
+    response. Extra keyword arguments are passed to ``AsyncHTTPFetcher``.
+    Call ``close()``, or use the fetcher as a context manager, to cancel
+    pending requests and stop the loop.
+    """
+
+    def __init__(self, **fetcher_options):
+        self.fetcher_options = fetcher_options
+        self.fetcher: Optional[AsyncHTTPFetcher] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> "SyncHTTPFetcher":
+        """Start the loop thread and open the session; called on first use."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SyncHTTPFetcher is closed")
+            if self._loop is not None:
+                return self
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="fetcher-loop", daemon=True
+            )
+            thread.start()
+            fetcher = AsyncHTTPFetcher(**self.fetcher_options)
+            try:
+                asyncio.run_coroutine_threadsafe(fetcher.__aenter__(), loop).result()
+            except BaseException:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            self.fetcher = fetcher
+            self._loop, self._thread = loop, thread
+            logger.info("Started fetcher loop thread")
+        return self
+
+    def _running_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self.start()
+        if self._closed:
+            raise RuntimeError("SyncHTTPFetcher is closed")
+        return self._loop
+
+    def submit(self, request: HTTPRequest) -> concurrent.futures.Future:
+        """Schedule one request; the future resolves to its ``HTTPResponse``."""
+        return self.fetch_many([request])[0]
+
+    def fetch(
+        self, request: HTTPRequest, timeout: Optional[float] = None
+    ) -> HTTPResponse:
+        """
+        Fetch one request, blocking the calling thread.
+
+        Raises:
+            concurrent.futures.TimeoutError: If ``timeout`` seconds pass first;
+                the request is then cancelled.
+        """
+        future = self.submit(request)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def fetch_many(
+        self, requests: Iterable[HTTPRequest]
+    ) -> list[concurrent.futures.Future]:
+        """
+        Schedule a batch of requests with a single wake-up of the loop thread.
+
+        Returns one future per request, in input order. Each resolves to an
+        ``HTTPResponse`` or raises the request's error.
+        """
+        loop = self._running_loop()
+        requests = list(requests)
+        futures = [concurrent.futures.Future() for _ in requests]
+
+        def schedule() -> None:
+            for request, future in zip(requests, futures):
+                if self._closed:
+                    future.cancel()
+                elif not future.cancelled():
+                    task = loop.create_task(self.fetcher.fetch_single(request))
+                    _chain(task, future)
+
+        loop.call_soon_threadsafe(schedule)
+        return futures
+
+    def prewarm(self, origins: Iterable[str], **options) -> dict[str, int]:
+        """Blocking ``AsyncHTTPFetcher.prewarm``."""
+        origins = list(origins)
+        return self._call(lambda: self.fetcher.prewarm(origins, **options))
+
+    def get_stats(self) -> dict[str, int]:
+        return self._call(lambda: _on_loop(self.fetcher.get_stats))
+
+    def get_metrics(self) -> dict:
+        return self._call(lambda: _on_loop(self.fetcher.get_metrics))
+
+    def _call(self, make_coroutine: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a coroutine on the loop thread and wait for its result."""
+        loop = self._running_loop()
+        return asyncio.run_coroutine_threadsafe(make_coroutine(), loop).result()
+
+    def close(self) -> None:
+        """Cancel pending requests, close the session and stop the loop."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._loop is None:
+                return
+
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        logger.info("Stopped fetcher loop thread")
+
+    async def _shutdown(self) -> None:
+        pending = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await self.fetcher.__aexit__(None, None, None)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+async def _on_loop(function: Callable[[], Any]) -> Any:
+    """Call ``function`` on the loop thread, where fetcher state is safe to read."""
+    return function()
+
+
+def _chain(task: asyncio.Task, future: concurrent.futures.Future) -> None:
+    """Copy ``task``'s outcome to ``future``, and cancel ``task`` with it."""
+    loop = task.get_loop()
+
+    def copy_outcome(task: asyncio.Task) -> None:
+        try:
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+        except concurrent.futures.InvalidStateError:
+            pass  # cancelled by the caller in the meantime
+
+    def cancel_task(future: concurrent.futures.Future) -> None:
+        if future.cancelled() and not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+
+    task.add_done_callback(copy_outcome)
+    future.add_done_callback(cancel_task)
@@ -0,0 +1,260 @@
+import asyncio
+import base64
+import json
+import os
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Iterable,
+    Optional,
+    Protocol,
+    Union,
+)
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .logging import logger
+
+
+class Transport(Protocol):
+    """What ``AsyncHTTPFetcher(transport=...)`` accepts in place of the session."""
+
+    def request(self, method: str, url: str, **kwargs) -> AsyncContextManager: ...
+
+    async def open(self, session: aiohttp.ClientSession) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+@dataclass
+class RecordedResponse:
+    """One recorded exchange, as saved and replayed by the transports below."""
+
+    url: str
+    status: int = 200
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    method: str = "GET"
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "method": self.method,
+            "url": self.url,
+            "status": self.status,
+            "headers": self.headers,
+            "body_base64": base64.b64encode(self.body).decode(),
+        }
+
+    @classmethod
+    def from_json(cls, record: dict[str, Any]) -> "RecordedResponse":
+        if "body_base64" in record:
+            body = base64.b64decode(record["body_base64"])
+        else:
+            body = record.get("body", "")
+            if not isinstance(body, str):
+                body = json.dumps(body)
+            body = body.encode()
+        return cls(
+            url=record["url"],
+            status=record.get("status", 200),
+            headers=record.get("headers", {}),
+            body=body,
+            method=record.get("method", "GET").upper(),
+        )
+
+
+class _ReplayContent:
+    """Stands in for ``ClientResponse.content`` (a ``StreamReader``)."""
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(self._body), size):
+            yield self._body[start : start + size]
+
+
+def _prepare(recorded: RecordedResponse) -> tuple:
+    """Parse a recording's headers once: (headers, content type, charset)."""
+    headers = CIMultiDictProxy(CIMultiDict(recorded.headers))
+    content_type = headers.get("Content-Type", "application/octet-stream")
+    mimetype, _, params = content_type.partition(";")
+    charset = None
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            charset = value.strip().strip('"') or None
+    return headers, mimetype.strip().lower(), charset
+
+
+class ReplayResponse:
+    """The part of ``aiohttp.ClientResponse`` the fetcher uses, served from memory."""
+
+    def __init__(
+        self, method: str, url: str, recorded: RecordedResponse, prepared: tuple
+    ):
+        self.method = method
+        self.url = url
+        self.status = recorded.status
+        self.headers, self.content_type, self.charset = prepared
+        self._body = recorded.body
+        self.content = _ReplayContent(recorded.body)
+        self.history = ()
+
+    @property
+    def content_length(self) -> int:
+        return len(self._body)
+
+    @property
+    def request_info(self) -> aiohttp.RequestInfo:
+        url = URL(self.url)
+        headers = CIMultiDictProxy(CIMultiDict())
+        return aiohttp.RequestInfo(url, self.method, headers, url)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    def close(self) -> None:
+        pass
+
+    def release(self) -> None:
+        pass
+
+
+class _ReplayContext:
+    """Async context manager returned by ``ReplayTransport.request``."""
+
+    __slots__ = ("response", "latency")
+
+    def __init__(self, response: ReplayResponse, latency: float):
+        self.response = response
+        self.latency = latency
+
+    async def __aenter__(self) -> ReplayResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.response
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+class ReplayTransport:
+    """
+    Serves recorded responses without opening sockets.
+
+    Pass it as ``AsyncHTTPFetcher(transport=...)`` to test or benchmark the
+    fetcher's own overhead. Responses are matched on method and URL; URLs
+    with no recording get ``default``, or fail with
+    ``aiohttp.ClientConnectionError`` when there is none. ``latency`` adds
+    a fixed delay per request; with the default of 0 nothing is awaited, so
+    a run measures CPU cost alone.
+    """
+
+    def __init__(
+        self,
+        responses: Iterable[RecordedResponse] = (),
+        default: Optional[RecordedResponse] = None,
+        latency: float = 0.0,
+    ):
+        self.responses = {
+            (response.method, response.url): response for response in responses
+        }
+        self.default = default
+        self.latency = latency
+        self.requests = 0
+        self._prepared: dict[int, tuple] = {}
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike], **options) -> "ReplayTransport":
+        """Read recordings from an NDJSON file written by ``RecordingTransport``."""
+        with open(path, "rb") as f:
+            responses = [
+                RecordedResponse.from_json(json.loads(line))
+                for line in f
+                if line.strip()
+            ]
+        logger.info("Loaded %d recorded responses from %s", len(responses), path)
+        return cls(responses, **options)
+
+    def request(self, method: str, url: str, **kwargs) -> _ReplayContext:
+        self.requests += 1
+        recorded = self.responses.get((method, url), self.default)
+        if recorded is None:
+            raise aiohttp.ClientConnectionError(
+                f"No recorded response for {method} {url}"
+            )
+        prepared = self._prepared.get(id(recorded))
+        if prepared is None:
+            prepared = self._prepared[id(recorded)] = _prepare(recorded)
+        response = ReplayResponse(method, url, recorded, prepared)
+        return _ReplayContext(response, self.latency)
+
+    async def open(self, session: aiohttp.ClientSession) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class _RecordingContext:
+    def __init__(
+        self, transport: "RecordingTransport", method: str, url: str, kwargs
+    ):
+        self.transport = transport
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+
+    async def __aenter__(self) -> ReplayResponse:
+        session = self.transport.session
+        request = session.request(self.method, self.url, **self.kwargs)
+        async with request as response:
+            body = await response.read()
+            recorded = RecordedResponse(
+                url=self.url,
+                status=response.status,
+                headers=dict(response.headers),
+                body=body,
+                method=self.method,
+            )
+        self.transport.recorded.append(recorded)
+        return ReplayResponse(self.method, self.url, recorded, _prepare(recorded))
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+class RecordingTransport:
+    """
+    Sends requests over the fetcher's session and records every response.
+
+    Bodies are read in full before the fetcher sees them. The recordings are
+    written to ``path`` as NDJSON when the fetcher closes, for
+    ``ReplayTransport.load``.
+    """
+
+    def __init__(self, path: Optional[Union[str, os.PathLike]] = None):
+        self.path = path
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.recorded: list[RecordedResponse] = []
+
+    def request(self, method: str, url: str, **kwargs) -> _RecordingContext:
+        return _RecordingContext(self, method, url, kwargs)
+
+    async def open(self, session: aiohttp.ClientSession) -> None:
+        self.session = session
+
+    async def close(self) -> None:
+        if self.path is not None:
+            await asyncio.to_thread(self.save, self.path)
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        with open(path, "w") as f:
+            for recorded in self.recorded:
+                f.write(json.dumps(recorded.to_json()) + "\n")
+        logger.info("Saved %d recorded responses to %s", len(self.recorded), path)
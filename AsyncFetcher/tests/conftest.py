@@ -2,6 +2,18 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def log_file(tmp_path_factory):
+    """Keep the fetcher's rotating log out of the working directory."""
+    from fetcher.logging import set_log_file
+
+    path = tmp_path_factory.mktemp("logs") / "fetcher.log"
+    set_log_file(str(path))
+    return path
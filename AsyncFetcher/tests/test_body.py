@@ -0,0 +1,150 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher.dataclass import BodyMode, HTTPRequest
+from fetcher.exceptions import BodyTooLargeError, ConfigurationError
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.retry import RetryPolicy
+
+PAYLOAD = bytes(range(256)) * 1024  # 256 KiB
+
+
+async def fixed_handler(request):
+    return web.Response(body=PAYLOAD, content_type="application/octet-stream")
+
+
+async def chunked_handler(request):
+    response = web.StreamResponse()
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    for offset in range(0, len(PAYLOAD), 16 * 1024):
+        await response.write(PAYLOAD[offset : offset + 16 * 1024])
+    await response.write_eof()
+    return response
+
+
+@pytest_asyncio.fixture
+async def base_url():
+    app = web.Application()
+    app.router.add_get("/fixed", fixed_handler)
+    app.router.add_get("/chunked", chunked_handler)
+    async with TestServer(app) as server:
+        yield str(server.make_url(""))
+
+
+@pytest_asyncio.fixture
+async def http_fetcher():
+    async with AsyncHTTPFetcher() as fetcher:
+        yield fetcher
+
+
+class TestBodyModes:
+
+    def test_request_validation(self):
+        assert HTTPRequest("http://a/", body_mode="bytes").body_mode is BodyMode.BYTES
+        with pytest.raises(ConfigurationError):
+            HTTPRequest("http://a/", body_mode="everything")
+        with pytest.raises(ConfigurationError):
+            HTTPRequest("http://a/", body_mode=BodyMode.STREAM)
+
+    @pytest.mark.asyncio
+    async def test_bytes_and_discard(self, http_fetcher, base_url):
+        raw = await http_fetcher.fetch_single(
+            HTTPRequest(f"{base_url}/chunked", body_mode=BodyMode.BYTES)
+        )
+        dropped = await http_fetcher.fetch_single(
+            HTTPRequest(f"{base_url}/fixed", body_mode=BodyMode.DISCARD)
+        )
+
+        assert raw.body == PAYLOAD
+        assert dropped.status_code == 200
+        assert dropped.body is None
+
+    @pytest.mark.asyncio
+    async def test_prefix(self, http_fetcher, base_url):
+        result = await http_fetcher.fetch_single(
+            HTTPRequest(f"{base_url}/chunked", body_mode=BodyMode.PREFIX, prefix_size=1000)
+        )
+        assert result.body == PAYLOAD[:1000]
+
+    @pytest.mark.asyncio
+    async def test_stream_to_file_and_callable(self, http_fetcher, base_url, tmp_path):
+        path = tmp_path / "body.bin"
+        to_file = await http_fetcher.fetch_single(
+            HTTPRequest(f"{base_url}/fixed", body_mode=BodyMode.STREAM, sink=path)
+        )
+
+        chunks = []
+
+        async def sink(chunk):
+            chunks.append(chunk)
+
+        to_callable = await http_fetcher.fetch_single(
+            HTTPRequest(f"{base_url}/chunked", body_mode=BodyMode.STREAM, sink=sink)
+        )
+
+        assert to_file.body == len(PAYLOAD)
+        assert path.read_bytes() == PAYLOAD
+        assert to_callable.body == len(PAYLOAD)
+        assert b"".join(chunks) == PAYLOAD
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path", ["/fixed", "/chunked"])
+    async def test_max_body_size_aborts_without_retry(
+        self, http_fetcher, base_url, path
+    ):
+        with pytest.raises(BodyTooLargeError):
+            await http_fetcher.fetch_single(
+                HTTPRequest(
+                    f"{base_url}{path}",
+                    body_mode=BodyMode.BYTES,
+                    max_body_size=10_000,
+                    max_retries=3,
+                )
+            )
+        assert http_fetcher.get_stats()["request_made"] == 1
+
+    @pytest.mark.asyncio
+    async def test_decode_with_limit(self, http_fetcher, base_url):
+        small = await http_fetcher.fetch_single(
+            HTTPRequest(f"{base_url}/fixed", max_body_size=len(PAYLOAD))
+        )
+        assert isinstance(small.body, str)
+        with pytest.raises(BodyTooLargeError):
+            await http_fetcher.fetch_single(
+                HTTPRequest(f"{base_url}/fixed", max_body_size=100)
+            )
+
+    @pytest.mark.asyncio
+    async def test_error_pages_are_not_streamed_or_limited(self, tmp_path):
+        attempts = []
+
+        async def flaky(request):
+            attempts.append(request.path)
+            if len(attempts) == 1:
+                return web.Response(status=503, text="<html>" + "x" * 5000)
+            return web.Response(body=b"REAL-CONTENT")
+
+        app = web.Application()
+        app.router.add_get("/flaky", flaky)
+        chunks = []
+
+        async def sink(chunk):
+            chunks.append(chunk)
+
+        policy = RetryPolicy(base_delay=0.0, jitter=False)
+        async with TestServer(app) as server:
+            async with AsyncHTTPFetcher(retry_policy=policy) as fetcher:
+                result = await fetcher.fetch_single(
+                    HTTPRequest(
+                        str(server.make_url("/flaky")),
+                        body_mode=BodyMode.STREAM,
+                        sink=sink,
+                        max_body_size=100,
+                    )
+                )
+
+        assert len(attempts) == 2
+        assert chunks == [b"REAL-CONTENT"] and result.body == 12
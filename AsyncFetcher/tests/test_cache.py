@@ -0,0 +1,240 @@
+from unittest.mock import AsyncMock, patch
+import aiohttp
+import pytest
+
+from fetcher.cache import CacheEntry, ResponseCache
+from fetcher.dataclass import HTTPRequest, HTTPResponse
+from fetcher.fetch import AsyncHTTPFetcher
+from test_fetch import FakeRequestContext
+
+
+class FailingReadContext(FakeRequestContext):
+    """A 200 whose body read fails half way."""
+
+    async def __aenter__(self):
+        response = await super().__aenter__()
+        response.read = AsyncMock(side_effect=aiohttp.ClientPayloadError("truncated"))
+        return response
+
+
+def make_entry(url, size, etag='"v1"'):
+    return CacheEntry(
+        url=url,
+        status_code=200,
+        headers={"ETag": etag},
+        body=b"x" * size,
+        body_kind="text",
+        etag=etag,
+    )
+
+
+class TestResponseCache:
+
+    def test_entry_from_response(self):
+        response = HTTPResponse(
+            url="http://a.host/",
+            status_code=200,
+            headers={"etag": '"abc"', "Cache-Control": "public, max-age=60"},
+            body={"ok": True},
+            response_time=0.1,
+            attempt=1,
+        )
+        entry = CacheEntry.from_response(response)
+        assert entry.validators() == {"If-None-Match": '"abc"'}
+        assert entry.max_age == 60
+        assert entry.is_fresh()
+        assert entry.decode_body() == {"ok": True}
+
+        response.headers["Cache-Control"] = "no-store"
+        assert CacheEntry.from_response(response) is None
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_bytes(self):
+        cache = ResponseCache(max_bytes=250)
+        await cache.put("a", make_entry("a", 100))
+        await cache.put("b", make_entry("b", 100))
+        assert await cache.get("a") is not None  # "b" is now least recent
+        await cache.put("c", make_entry("c", 100))
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert cache.current_bytes == 200
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_keeps_evicted_entries(self, tmp_path):
+        cache = ResponseCache(max_bytes=150, disk_path=str(tmp_path / "cache.db"))
+        await cache.put("a", make_entry("a", 100))
+        await cache.put("b", make_entry("b", 100))
+        assert len(cache) == 1
+
+        entry = await cache.get("a")
+        assert entry is not None
+        assert entry.etag == '"v1"'
+        assert entry.body == b"x" * 100
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_entries_survive_close_and_reopen(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        cache = ResponseCache(disk_path=path)
+        await cache.put("a", make_entry("a", 100))
+        cache.close()
+
+        cache = ResponseCache(disk_path=path)
+        entry = await cache.get("a")
+        assert entry is not None and entry.body == b"x" * 100
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_vary_star_and_private_responses(self, tmp_path):
+        response = HTTPResponse(
+            "http://a.host/", 200, {"ETag": '"v1"', "Vary": "*"}, "x", 0.1, 1
+        )
+        assert CacheEntry.from_response(response) is None
+
+        response.headers = {"ETag": '"v1"', "Cache-Control": "private, max-age=60"}
+        entry = CacheEntry.from_response(response)
+        assert entry.private
+
+        cache = ResponseCache(max_bytes=0, disk_path=str(tmp_path / "cache.db"))
+        await cache.put("a", entry)
+        assert await cache.get("a") is None  # too big for memory, not on disk
+        cache.close()
+
+    def test_key_covers_request_headers(self):
+        plain = ResponseCache.key(HTTPRequest("http://a.host/"))
+        alice = ResponseCache.key(
+            HTTPRequest("http://a.host/", headers={"Authorization": "Bearer alice"})
+        )
+        bob = ResponseCache.key(
+            HTTPRequest("http://a.host/", headers={"authorization": "Bearer bob"})
+        )
+        assert plain == "http://a.host/"
+        assert len({plain, alice, bob}) == 3
+        assert "alice" not in alice
+
+
+class TestFetcherCache:
+
+    @pytest.mark.asyncio
+    async def test_different_credentials_do_not_share_entries(self):
+        calls = []
+
+        def request(method, url, **kwargs):
+            calls.append(kwargs["headers"])
+            tracker = {"in_flight": 0, "peak": 0}
+            user = kwargs["headers"]["Authorization"]
+            return FakeRequestContext(
+                tracker, body={"user": user}, headers={"Cache-Control": "max-age=300"}
+            )
+
+        async with AsyncHTTPFetcher(cache=ResponseCache()) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                responses = [
+                    await fetcher.fetch_single(
+                        HTTPRequest("http://a.host/me", headers={"Authorization": user})
+                    )
+                    for user in ("alice", "bob", "alice")
+                ]
+
+        assert len(calls) == 2
+        assert [r.body["user"] for r in responses] == ["alice", "bob", "alice"]
+        assert responses[2].from_cache
+
+    @pytest.mark.asyncio
+    async def test_conditional_request_serves_cached_body_on_304(self):
+        calls = []
+        responses = [
+            (200, {"v": 1}, {"ETag": '"v1"'}),
+            (304, {}, {}),
+        ]
+
+        def request(method, url, **kwargs):
+            calls.append(kwargs["headers"])
+            status, body, headers = responses[len(calls) - 1]
+            tracker = {"in_flight": 0, "peak": 0}
+            return FakeRequestContext(tracker, status=status, body=body, headers=headers)
+
+        async with AsyncHTTPFetcher(cache=ResponseCache()) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                first = await fetcher.fetch_single(HTTPRequest("http://a.host/doc"))
+                second = await fetcher.fetch_single(HTTPRequest("http://a.host/doc"))
+
+        assert calls[0] is None
+        assert calls[1] == {"If-None-Match": '"v1"'}
+        assert not first.from_cache
+        assert second.from_cache
+        assert second.status_code == 200
+        assert second.body == {"v": 1}
+        assert fetcher.get_stats()["cache_revalidated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_304_refreshes_the_entry_on_disk(self, tmp_path):
+        calls = []
+        responses = [
+            (200, {"v": 1}, {"ETag": '"v1"'}),
+            (304, {}, {"ETag": '"v2"', "Cache-Control": "max-age=300"}),
+        ]
+
+        def request(method, url, **kwargs):
+            calls.append(kwargs["headers"])
+            status, body, headers = responses[len(calls) - 1]
+            tracker = {"in_flight": 0, "peak": 0}
+            return FakeRequestContext(tracker, status=status, body=body, headers=headers)
+
+        path = str(tmp_path / "cache.db")
+        cache = ResponseCache(disk_path=path)
+        async with AsyncHTTPFetcher(cache=cache) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                for _ in range(3):
+                    await fetcher.fetch_single(HTTPRequest("http://a.host/doc"))
+        cache.close()
+
+        assert len(calls) == 2  # the 304 made the entry fresh
+        cache = ResponseCache(disk_path=path)
+        entry = await cache.get("http://a.host/doc")
+        cache.close()
+        assert entry.validators() == {"If-None-Match": '"v2"'}
+        assert entry.max_age == 300 and entry.is_fresh()
+        assert entry.decode_body() == {"v": 1}
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_skips_network(self):
+        calls = []
+
+        def request(method, url, **kwargs):
+            calls.append(url)
+            tracker = {"in_flight": 0, "peak": 0}
+            return FakeRequestContext(
+                tracker, body={"v": 1}, headers={"Cache-Control": "max-age=300"}
+            )
+
+        async with AsyncHTTPFetcher(cache=ResponseCache()) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                await fetcher.fetch_single(HTTPRequest("http://a.host/doc"))
+                cached = await fetcher.fetch_single(HTTPRequest("http://a.host/doc"))
+
+        assert len(calls) == 1
+        assert cached.body == {"v": 1}
+        assert fetcher.get_stats()["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_body_read_is_not_cached(self):
+        calls = []
+
+        def request(method, url, **kwargs):
+            calls.append(kwargs["headers"])
+            tracker = {"in_flight": 0, "peak": 0}
+            if len(calls) == 1:
+                return FailingReadContext(tracker, headers={"ETag": '"v1"'})
+            return FakeRequestContext(tracker, status=304, body={})
+
+        async with AsyncHTTPFetcher(cache=ResponseCache()) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                first = await fetcher.fetch_single(HTTPRequest("http://a.host/doc"))
+                second = await fetcher.fetch_single(HTTPRequest("http://a.host/doc"))
+
+        assert first.body.startswith("Error reading data")
+        assert len(fetcher.cache) == 0
+        assert calls[1] is None  # not sent as a conditional request
+        assert not second.from_cache
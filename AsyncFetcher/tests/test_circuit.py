@@ -0,0 +1,114 @@
+from unittest.mock import patch
+import pytest
+
+from fetcher.circuit import CircuitBreaker, CircuitState, HostCircuitBreaker
+from fetcher.dataclass import HTTPRequest
+from fetcher.exceptions import CircuitOpenError
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.retry import RetryPolicy
+from test_fetch import fake_session_request
+from test_retry import FakeClock
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+        breaker.on_failure()
+        breaker.on_failure()
+        breaker.on_success()
+        breaker.on_failure()
+        breaker.on_failure()
+        assert breaker.state is CircuitState.CLOSED
+
+        breaker.on_failure()
+        assert breaker.state is CircuitState.OPEN
+        assert not breaker.allow()
+
+    def test_half_open_probe_closes_or_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.on_failure()
+        assert breaker.retry_in() == 10
+
+        clock.now += 10
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()  # one probe at a time
+
+        breaker.on_failure()
+        assert breaker.state is CircuitState.OPEN
+
+        clock.now += 10
+        assert breaker.allow()
+        breaker.on_success()
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.allow()
+
+    def test_lost_probe_is_replaced_after_reset_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.on_failure()
+        clock.now += 5
+        assert breaker.allow()
+
+        # The probe never reports back
+        clock.now += 4
+        assert not breaker.allow()
+        clock.now += 1
+        assert breaker.allow()
+
+    def test_host_breaker_raises_when_open(self):
+        breakers = HostCircuitBreaker(failure_threshold=1, clock=FakeClock())
+        breakers.record("a.host", False)
+        breakers.record("b.host", None)
+
+        with pytest.raises(CircuitOpenError):
+            breakers.check("a.host")
+        breakers.check("b.host")
+        assert breakers.snapshot() == {"a.host": "open"}
+
+
+class TestFetcherCircuitBreaker:
+
+    @pytest.mark.asyncio
+    async def test_dead_host_fails_fast(self):
+        dead = [f"http://dead.host/{i}" for i in range(10)]
+        request, tracker = fake_session_request(statuses={url: 500 for url in dead})
+        breakers = HostCircuitBreaker(failure_threshold=3, reset_timeout=60)
+        policy = RetryPolicy(base_delay=0.0, jitter=False)
+
+        async with AsyncHTTPFetcher(
+            max_concurrent=1, retry_policy=policy, circuit_breaker=breakers
+        ) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                results = [
+                    result
+                    async for result in fetcher.fetch_iter(
+                        [HTTPRequest(url, max_retries=3) for url in dead]
+                        + [HTTPRequest("http://ok.host/")],
+                        window=1,
+                    )
+                ]
+
+        # Three attempts of the first request open the circuit
+        dead_calls = [call for call in tracker["calls"] if "dead.host" in call[1]]
+        assert len(dead_calls) == 3
+        assert all(isinstance(r.error, CircuitOpenError) for r in results[1:10])
+        assert results[10].ok
+
+        stats = fetcher.get_stats()
+        assert stats["request_short_circuited"] == 10
+        assert fetcher.get_metrics()["circuits"] == {"dead.host": "open"}
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_open_the_circuit(self):
+        urls = [f"http://a.host/missing/{i}" for i in range(5)]
+        request, _ = fake_session_request(statuses={url: 404 for url in urls})
+        breakers = HostCircuitBreaker(failure_threshold=2)
+
+        async with AsyncHTTPFetcher(circuit_breaker=breakers) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                await fetcher.fetch_all([HTTPRequest(url, max_retries=0) for url in urls])
+
+        assert breakers.state("a.host") is CircuitState.CLOSED
@@ -0,0 +1,63 @@
+import json
+from unittest.mock import patch
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher.cli import build_parser, run
+from fetcher.dataclass import HTTPResponse
+
+
+class TestCLI:
+
+    @pytest.mark.asyncio
+    async def test_ndjson_in_ndjson_out(self, tmp_path):
+        async def handler(request):
+            if request.match_info["n"] == "missing":
+                return web.Response(status=404)
+            return web.json_response({"n": int(request.match_info["n"])})
+
+        app = web.Application()
+        app.router.add_get("/{n}", handler)
+        async with TestServer(app) as server:
+            base = str(server.make_url("/"))
+            lines = [json.dumps(f"{base}{i}") for i in range(5)]
+            lines.insert(2, "")
+            lines.append(json.dumps({"url": f"{base}missing", "max_retries": 0}))
+            lines.append("not json")
+            lines.append(json.dumps({"url": f"{base}1", "body_mode": "nope"}))
+            sink = tmp_path / "written.bin"
+            stream = {"url": f"{base}1", "body_mode": "stream", "sink": str(sink)}
+            lines.append(json.dumps(stream))
+            lines.append(json.dumps({"url": f"{base}1", "sink": str(sink)}))
+            source = tmp_path / "in.ndjson"
+            source.write_text("\n".join(lines) + "\n")
+            output = tmp_path / "out.ndjson"
+
+            args = build_parser().parse_args(
+                [str(source), "-o", str(output), "--ordered", "--fields", "url,body"]
+            )
+            load = HTTPResponse.load
+            with patch.object(
+                HTTPResponse, "load", autospec=True, side_effect=load
+            ) as spy:
+                stats = await run(args)
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [r["index"] for r in records] == list(range(6))
+        assert [r["body"] for r in records[:5]] == [{"n": i} for i in range(5)]
+        assert set(records[0]) == {"index", "url", "body"}
+        assert records[5]["status_code"] == 404
+        assert "error" in records[5]
+        assert stats["request_failed"] == 1
+        assert not sink.exists()
+        assert spy.call_count == 5  # bodies are decoded through load()
+
+    def test_rejects_unknown_fields(self):
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(["--fields", "url,nope"])
+
+    def test_log_level_is_validated(self):
+        assert build_parser().parse_args(["--log-level", "debug"]).log_level == "DEBUG"
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(["--log-level", "verbose"])
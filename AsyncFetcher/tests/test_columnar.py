@@ -0,0 +1,104 @@
+import gc
+from unittest.mock import patch
+import aiohttp
+import pytest
+
+from fetcher.columnar import RequestBatch, ResultTable
+from fetcher.dataclass import FetchResult, HTTPResponse
+from fetcher.decoding import BodyDecoder, LazyBody
+from fetcher.exceptions import ConfigurationError
+from fetcher.fetch import AsyncHTTPFetcher
+from test_fetch import fake_session_request
+
+
+class TestRequestBatch:
+
+    def test_rows_share_defaults_and_apply_overrides(self):
+        batch = RequestBatch(
+            [f"http://a.host/{i}" for i in range(3)],
+            headers={"Accept": "application/json"},
+            max_retries=1,
+        )
+        batch.append("http://b.host/é", headers={"X-Row": "4"}, priority=5)
+
+        assert len(batch) == 4
+        assert batch.url(3) == "http://b.host/é"
+        first, second = batch[0], batch[1]
+        assert (first.url, first.max_retries) == ("http://a.host/0", 1)
+        assert first.headers is second.headers
+
+        last = batch[-1]
+        assert last.priority == 5
+        assert last.headers == {"Accept": "application/json", "X-Row": "4"}
+        assert batch[0].priority == 0
+        assert [request.url for request in batch][:2] == [first.url, second.url]
+
+    def test_invalid_settings_are_rejected(self):
+        with pytest.raises(ConfigurationError):
+            RequestBatch(["http://a.host/"], body_mode="nope")
+        batch = RequestBatch()
+        with pytest.raises(ConfigurationError):
+            batch.append("http://a.host/", colour="red")
+        with pytest.raises(IndexError):
+            batch[0]
+
+
+class TestResultTable:
+
+    def test_rows_are_rebuilt_from_columns(self):
+        batch = RequestBatch([f"http://a.host/{i}" for i in range(3)])
+        table = ResultTable(batch, keep_headers=["content-type"])
+        body = LazyBody(b'{"n": 1}', "application/json", None, BodyDecoder())
+        response = HTTPResponse(
+            batch.url(0),
+            200,
+            {"Content-Type": "application/json", "Date": "today"},
+            body,
+            0.25,
+            2,
+        )
+        table.add(FetchResult(0, batch[0], response))
+        table.add(FetchResult(2, batch[2], error=aiohttp.ServerTimeoutError()))
+
+        row = table[0]
+        assert row.ok and row.body == {"n": 1}
+        assert row.headers == {"Content-Type": "application/json"}
+        assert (row.status_code, row.response_time, row.attempt) == (200, 0.25, 2)
+        assert table.bodies[0] == body.raw  # still undecoded in the table
+
+        assert not table[1].ok and table[1].status_code == 0
+        assert isinstance(table[2].error, aiohttp.ServerTimeoutError)
+        assert (table.completed, table.failed) == (2, 1)
+
+    def test_header_names_are_interned_and_untracked(self):
+        batch = RequestBatch(["http://a.host/0", "http://a.host/1"])
+        table = ResultTable(batch)
+        for index in range(2):
+            headers = {"".join(["Content", "-Type"]): "text/plain"}
+            response = HTTPResponse(batch.url(index), 200, headers, None, 0.1, 1)
+            table.add(FetchResult(index, batch[index], response))
+
+        assert table.headers[0][0] is table.headers[1][0]
+        gc.collect()
+        assert not gc.is_tracked(table.headers[0])
+
+
+class TestFetchBatch:
+
+    @pytest.mark.asyncio
+    async def test_fetch_batch_fills_the_table(self):
+        urls = [f"http://a.host/{i}" for i in range(10)]
+        request, tracker = fake_session_request(statuses={urls[4]: 404})
+        batch = RequestBatch(urls, headers={"X-Batch": "1"}, max_retries=0)
+
+        async with AsyncHTTPFetcher() as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                table = await fetcher.fetch_batch(batch, keep_headers=(), window=4)
+
+        assert len(tracker["calls"]) == 10
+        sent_headers = [call[2]["headers"] for call in tracker["calls"]]
+        assert all(headers == {"X-Batch": "1"} for headers in sent_headers)
+        assert table[4].status_code == 404 and not table[4].ok
+        assert table[7].ok and table[7].body == {"url": urls[7]}
+        assert table[7].headers == {}
+        assert (table.completed, table.failed) == (10, 1)
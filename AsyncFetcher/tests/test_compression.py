@@ -0,0 +1,93 @@
+import gzip
+import json
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher import compression
+from fetcher.compression import RequestCompression, response_encodings
+from fetcher.dataclass import HTTPRequest
+from fetcher.exceptions import ConfigurationError
+from fetcher.fetch import AsyncHTTPFetcher
+
+ITEMS = {"items": [{"id": i, "name": f"item-{i}", "ok": True} for i in range(500)]}
+
+
+class TestRequestCompression:
+
+    @pytest.mark.asyncio
+    async def test_only_bodies_above_the_threshold_are_compressed(self):
+        codec = RequestCompression(threshold=1024)
+
+        small = await codec.encode({"id": 1})
+        assert small.headers == {"Content-Type": "application/json"}
+        assert json.loads(small.data) == {"id": 1}
+
+        large = await codec.encode(ITEMS)
+        assert large.headers["Content-Encoding"] == "gzip"
+        assert len(large.data) < large.size / 4
+        assert json.loads(gzip.decompress(large.data)) == ITEMS
+
+    @pytest.mark.asyncio
+    async def test_non_str_keys_are_accepted(self):
+        body = await RequestCompression().encode({1: "a", "b": {2: True}})
+        assert json.loads(body.data) == {"1": "a", "b": {"2": True}}
+
+    @pytest.mark.asyncio
+    async def test_offloaded_compression_gives_the_same_bytes(self):
+        inline = await RequestCompression().encode(ITEMS)
+        offloaded = await RequestCompression(offload_threshold=0).encode(ITEMS)
+        assert offloaded.data == inline.data
+
+    def test_unavailable_or_unknown_encodings_are_rejected(self):
+        with pytest.raises(ConfigurationError):
+            RequestCompression("br")
+        if compression.zstd is None:
+            with pytest.raises(ConfigurationError):
+                RequestCompression("zstd")
+        assert response_encodings()[-2:] == ["gzip", "deflate"]
+
+
+class TestFetcherCompression:
+
+    @pytest.mark.asyncio
+    async def test_unencodable_body_is_counted_as_failed(self):
+        async with AsyncHTTPFetcher(compression=RequestCompression()) as fetcher:
+            with pytest.raises(ConfigurationError):
+                await fetcher.fetch_single(
+                    HTTPRequest("http://a.host/", method="POST", data={"x": object()})
+                )
+            stats = fetcher.get_stats()
+
+        assert stats["request_failed"] == 1 and stats["request_made"] == 0
+
+    @pytest.mark.asyncio
+    async def test_large_post_is_sent_compressed(self):
+        seen = []
+
+        async def handler(request):
+            seen.append(request.headers.copy())
+            # aiohttp decompresses request bodies by Content-Encoding
+            payload = await request.json()
+            return web.json_response({"items": len(payload["items"])})
+
+        app = web.Application()
+        app.router.add_post("/batch", handler)
+
+        async with TestServer(app) as server:
+            url = str(server.make_url("/batch"))
+            async with AsyncHTTPFetcher(compression=RequestCompression()) as fetcher:
+                large = await fetcher.fetch_single(
+                    HTTPRequest(url, method="POST", data=ITEMS)
+                )
+                small = await fetcher.fetch_single(
+                    HTTPRequest(url, method="POST", data={"items": [1]})
+                )
+                stats = fetcher.get_stats()
+
+        assert large.body == {"items": 500} and small.body == {"items": 1}
+        assert seen[0]["Content-Encoding"] == "gzip"
+        assert "Content-Encoding" not in seen[1]
+        assert seen[0]["Accept-Encoding"] == ", ".join(response_encodings())
+        assert stats["bodies_compressed"] == 1
+        assert stats["body_bytes_saved"] > 10_000
@@ -0,0 +1,99 @@
+import json
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import pytest
+
+from fetcher.dataclass import HTTPRequest, HTTPResponse
+from fetcher.decoding import BodyDecoder, get_json_decoder
+from fetcher.exceptions import ConfigurationError
+from fetcher.fetch import AsyncHTTPFetcher
+from test_fetch import fake_session_request
+
+
+def make_response(decoder, raw, content_type="application/json"):
+    return HTTPResponse(
+        url="http://a.host/",
+        status_code=200,
+        headers={},
+        body=decoder.lazy(raw, content_type, None),
+        response_time=0.0,
+        attempt=1,
+    )
+
+
+class TestLazyDecoding:
+
+    def test_body_is_parsed_on_first_access_only(self):
+        calls = []
+
+        def loads(raw):
+            calls.append(raw)
+            return json.loads(raw)
+
+        response = make_response(BodyDecoder(loads), b'{"a": 1}')
+        assert calls == []
+        assert response.raw == b'{"a": 1}'
+
+        assert response.body == {"a": 1}
+        assert response.body == {"a": 1}
+        assert len(calls) == 1
+        assert response.raw is None
+
+    def test_text_and_invalid_json(self):
+        decoder = BodyDecoder("json")
+        text = make_response(decoder, "héllo".encode(), "text/plain")
+        broken = make_response(decoder, b"{not json")
+        assert text.body == "héllo"
+        assert broken.body.startswith("Error reading data")
+
+    def test_decoder_selection(self):
+        assert get_json_decoder("json") is json.loads
+        assert callable(get_json_decoder("auto"))
+        with pytest.raises(ConfigurationError):
+            get_json_decoder("yaml")
+
+    def test_pickle_keeps_body_lazy(self):
+        executor = ThreadPoolExecutor(1)
+        response = make_response(BodyDecoder("json", executor=executor), b"[1, 2]")
+        copy = pickle.loads(pickle.dumps(response))
+        assert copy.raw == b"[1, 2]"
+        assert copy.body == [1, 2]
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_large_bodies_are_decoded_in_executor(self):
+        threads = []
+
+        def loads(raw):
+            threads.append(threading.current_thread())
+            return json.loads(raw)
+
+        with ThreadPoolExecutor(1) as executor:
+            decoder = BodyDecoder(loads, offload_threshold=100, executor=executor)
+            small = make_response(decoder, b"[1]")
+            large = make_response(decoder, json.dumps(list(range(100))).encode())
+
+            assert await small.load() == [1]
+            assert await large.load() == list(range(100))
+
+        assert threads[0] is threading.current_thread()
+        assert threads[1] is not threading.current_thread()
+
+    @pytest.mark.asyncio
+    async def test_fetcher_uses_configured_decoder(self):
+        calls = []
+
+        def loads(raw):
+            calls.append(raw)
+            return json.loads(raw)
+
+        request, _ = fake_session_request()
+        async with AsyncHTTPFetcher(json_decoder=loads) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                result = await fetcher.fetch_single(HTTPRequest("http://a.host/x"))
+
+        assert calls == []
+        assert result.body == {"url": "http://a.host/x"}
+        assert len(calls) == 1
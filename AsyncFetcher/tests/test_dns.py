@@ -0,0 +1,125 @@
+import asyncio
+import socket
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher.dataclass import HTTPRequest
+from fetcher.dns import CachingResolver
+from fetcher.fetch import AsyncHTTPFetcher
+from test_retry import FakeClock
+
+
+class FakeResolver:
+    """Answers every name with 127.0.0.1 after ``delay`` seconds."""
+
+    def __init__(self, tracker, delay=0.0, fail=False):
+        self.tracker = tracker
+        self.delay = delay
+        self.fail = fail
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        self.tracker.append(host)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise OSError(f"no such host {host}")
+        return [
+            {
+                "hostname": host,
+                "host": "127.0.0.1",
+                "port": port,
+                "family": socket.AF_INET,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }
+        ]
+
+    async def close(self):
+        pass
+
+
+def _app():
+    async def handler(request):
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    return app
+
+
+class TestCachingResolver:
+
+    @pytest.mark.asyncio
+    async def test_caches_until_ttl_and_shares_lookups(self):
+        lookups = []
+        clock = FakeClock()
+        resolver = CachingResolver(
+            ttl=30, resolver_factory=lambda: FakeResolver(lookups, 0.01), clock=clock
+        )
+
+        results = await asyncio.gather(*(resolver.resolve("a.test", 80) for _ in range(5)))
+        assert all(r[0]["host"] == "127.0.0.1" for r in results)
+        await resolver.resolve("a.test", 80)
+        assert lookups == ["a.test"]
+        assert resolver.stats() == {"entries": 1, "hits": 5, "misses": 1}
+
+        clock.now += 30
+        await resolver.resolve("a.test", 80)
+        assert lookups == ["a.test", "a.test"]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        lookups = []
+        resolver = CachingResolver(resolver_factory=lambda: FakeResolver(lookups, fail=True))
+        for _ in range(2):
+            with pytest.raises(OSError):
+                await resolver.resolve("gone.test")
+        assert len(lookups) == 2 and len(resolver) == 0
+
+    @pytest.mark.asyncio
+    async def test_oldest_entry_is_evicted(self):
+        resolver = CachingResolver(
+            max_entries=2, resolver_factory=lambda: FakeResolver([])
+        )
+        for host in ("a.test", "b.test", "c.test"):
+            await resolver.resolve(host)
+        assert [key[0] for key in resolver._entries] == ["b.test", "c.test"]
+
+
+class TestPrewarm:
+
+    @pytest.mark.asyncio
+    async def test_resolver_is_shared_between_fetchers(self):
+        lookups = []
+        resolver = CachingResolver(resolver_factory=lambda: FakeResolver(lookups))
+        async with TestServer(_app()) as server:
+            url = f"http://shared.test:{server.port}/"
+            for _ in range(2):
+                async with AsyncHTTPFetcher(resolver=resolver) as fetcher:
+                    response = await fetcher.fetch_single(HTTPRequest(url))
+                    assert response.status_code == 200
+
+        assert lookups == ["shared.test"]
+
+    @pytest.mark.asyncio
+    async def test_prewarmed_connections_are_reused(self):
+        async with TestServer(_app()) as server:
+            base = f"http://{server.host}:{server.port}"
+            async with AsyncHTTPFetcher(max_concurrent=2, coalesce=False) as fetcher:
+                opened = await fetcher.prewarm([f"{base}/some/path", base], connections=2)
+                assert opened == {f"{base}/": 2}
+
+                await fetcher.fetch_all([HTTPRequest(f"{base}/{i}") for i in range(2)])
+
+        # Pre-warming is not counted; both requests reused its connections
+        connections = fetcher.get_metrics()["connections"]
+        assert connections == {"created": 0, "reused": 2, "reuse_ratio": 1.0}
+        assert sum(fetcher.get_metrics()["bytes_in"].values()) > 0
+        assert fetcher.get_stats()["request_made"] == 2
+
+    @pytest.mark.asyncio
+    async def test_prewarm_failure_is_skipped(self):
+        resolver = CachingResolver(resolver_factory=lambda: FakeResolver([], fail=True))
+        async with AsyncHTTPFetcher(resolver=resolver) as fetcher:
+            opened = await fetcher.prewarm(["gone.test"], timeout=1)
+        assert opened == {"https://gone.test/": 0}
@@ -9,6 +9,8 @@ pytest -v
 
 """
 
+import asyncio
+import json
 from unittest.mock import AsyncMock, patch
 import pytest
 import pytest_asyncio
@@ -17,6 +19,55 @@ from fetcher.fetch import AsyncHTTPFetcher, simple_coroutine
 from fetcher.dataclass import HTTPRequest, HTTPResponse
 
 
+class FakeRequestContext:
+    """Async context manager standing in for ``session.request(...)``."""
+
+    def __init__(self, tracker, status=200, body=None, delay=0.0, headers=None):
+        self.tracker = tracker
+        self.status = status
+        self.body = body if body is not None else {"ok": True}
+        self.delay = delay
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        self.tracker["in_flight"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["in_flight"])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.tracker["in_flight"] -= 1
+
+        content = AsyncMock()
+        content.status = self.status
+        content.content_type = "application/json"
+        content.json = AsyncMock(return_value=self.body)
+        content.read = AsyncMock(return_value=json.dumps(self.body).encode())
+        content.charset = None
+        content.headers = self.headers
+        return content
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+def fake_session_request(delays=None, statuses=None):
+    """Build a ``session.request`` replacement driven by the request URL."""
+    tracker = {"in_flight": 0, "peak": 0, "calls": []}
+    delays = delays or {}
+    statuses = statuses or {}
+
+    def request(method, url, **kwargs):
+        tracker["calls"].append((method, url, kwargs))
+        return FakeRequestContext(
+            tracker,
+            status=statuses.get(url, 200),
+            body={"url": url},
+            delay=delays.get(url, 0.0),
+        )
+
+    return request, tracker
+
+
 class TestBasicAsyncOperations:
 
     @pytest.mark.asyncio
@@ -39,6 +90,8 @@ class TestAsyncFetcher:
         mock_content.status = 200
         mock_content.content_type = "application/json"
         mock_content.json = AsyncMock(return_value={"ok": True})
+        mock_content.read = AsyncMock(return_value=json.dumps({"ok": True}).encode())
+        mock_content.charset = None
         mock_content.headers = {"Content-Type": "application/json"}
 
         mock_response = AsyncMock()
@@ -62,6 +115,8 @@ class TestAsyncFetcher:
         mock_content.status = 500
         mock_content.content_type = "application/json"
         mock_content.json = AsyncMock(return_value={"error": "server"})
+        mock_content.read = AsyncMock(return_value=json.dumps({"error": "server"}).encode())
+        mock_content.charset = None
         mock_content.headers = {}
 
         mock_response = AsyncMock()
@@ -86,6 +141,8 @@ class TestAsyncFetcher:
         success_content.status = 200
         success_content.content_type = "application/json"
         success_content.json = AsyncMock(return_value={"ok": True})
+        success_content.read = AsyncMock(return_value=json.dumps({"ok": True}).encode())
+        success_content.charset = None
         success_content.headers = {}
         success_response = AsyncMock()
         success_response.__aenter__.return_value = success_content
@@ -96,6 +153,8 @@ class TestAsyncFetcher:
         fail_content.status = 404
         fail_content.content_type = "application/json"
         fail_content.json = AsyncMock(return_value={"error": "not found"})
+        fail_content.read = AsyncMock(return_value=json.dumps({"error": "not found"}).encode())
+        fail_content.charset = None
         fail_content.headers = {}
         fail_response = AsyncMock()
         fail_response.__aenter__.return_value = fail_content
@@ -124,3 +183,153 @@ class TestAsyncFetcher:
         assert stats["request_succeeded"] == 1
         assert stats["request_made"] == 3
         assert stats["total_retries"] == 1
+
+
+class TestFetchIter:
+
+    @pytest_asyncio.fixture
+    async def http_fetcher(self):
+        async with AsyncHTTPFetcher(max_concurrent=10) as fetcher:
+            yield fetcher
+
+    @pytest.mark.asyncio
+    async def test_completion_order(self, http_fetcher):
+        request, _ = fake_session_request(
+            delays={"http://fake.url/slow": 0.05, "http://fake.url/fast": 0.0}
+        )
+        requests = [
+            HTTPRequest("http://fake.url/slow"),
+            HTTPRequest("http://fake.url/fast"),
+        ]
+        with patch.object(http_fetcher.session, "request", side_effect=request):
+            results = [r async for r in http_fetcher.fetch_iter(requests)]
+
+        assert [r.request.url for r in results] == [
+            "http://fake.url/fast",
+            "http://fake.url/slow",
+        ]
+        assert all(r.ok for r in results)
+
+    @pytest.mark.asyncio
+    async def test_input_order_and_failures(self, http_fetcher):
+        request, _ = fake_session_request(
+            delays={"http://fake.url/0": 0.05},
+            statuses={"http://fake.url/1": 404},
+        )
+        requests = [HTTPRequest(f"http://fake.url/{i}", max_retries=0) for i in range(4)]
+        with patch.object(http_fetcher.session, "request", side_effect=request):
+            results = [
+                r async for r in http_fetcher.fetch_iter(requests, ordered=True)
+            ]
+
+        assert [r.index for r in results] == [0, 1, 2, 3]
+        assert results[0].response.body == {"url": "http://fake.url/0"}
+        assert not results[1].ok
+        assert results[1].response is None
+
+    @pytest.mark.asyncio
+    async def test_window_bounds_in_flight(self, http_fetcher):
+        request, tracker = fake_session_request(
+            delays={f"http://fake.url/{i}": 0.01 for i in range(20)}
+        )
+
+        async def source():
+            for i in range(20):
+                yield HTTPRequest(f"http://fake.url/{i}")
+
+        with patch.object(http_fetcher.session, "request", side_effect=request):
+            results = [r async for r in http_fetcher.fetch_iter(source(), window=3)]
+
+        assert len(results) == 20
+        assert tracker["peak"] <= 3
+
+
+    @pytest.mark.asyncio
+    async def test_slow_source_does_not_hold_back_results(self, http_fetcher):
+        request, _ = fake_session_request()
+        more = asyncio.Event()
+
+        async def source():
+            yield HTTPRequest("http://fake.url/first")
+            await more.wait()
+            yield HTTPRequest("http://fake.url/second")
+
+        with patch.object(http_fetcher.session, "request", side_effect=request):
+            results = http_fetcher.fetch_iter(source())
+            first = await asyncio.wait_for(anext(results), timeout=1)
+            more.set()
+            rest = [r async for r in results]
+
+        assert first.request.url == "http://fake.url/first"
+        assert [r.request.url for r in rest] == ["http://fake.url/second"]
+
+class TestSingleFlight:
+
+    @pytest_asyncio.fixture
+    async def http_fetcher(self):
+        async with AsyncHTTPFetcher(max_concurrent=10) as fetcher:
+            yield fetcher
+
+    @pytest.mark.asyncio
+    async def test_duplicates_share_one_call(self, http_fetcher):
+        request, tracker = fake_session_request(delays={"http://fake.url/a": 0.05})
+        requests = [HTTPRequest("http://fake.url/a") for _ in range(5)]
+        requests.append(HTTPRequest("http://fake.url/a", headers={"Accept": "text/html"}))
+
+        with patch.object(http_fetcher.session, "request", side_effect=request):
+            results = await http_fetcher.fetch_all(requests)
+
+        assert len(results) == 6
+        assert all(r.body == {"url": "http://fake.url/a"} for r in results)
+        assert len(tracker["calls"]) == 2
+        assert http_fetcher.get_stats()["request_deduplicated"] == 4
+
+    @pytest.mark.asyncio
+    async def test_callers_get_separate_responses(self, http_fetcher):
+        request, tracker = fake_session_request(delays={"http://fake.url/a": 0.05})
+        requests = [HTTPRequest("http://fake.url/a") for _ in range(2)]
+        requests.append(HTTPRequest("http://fake.url/a", timeout=1.0))
+
+        with patch.object(http_fetcher.session, "request", side_effect=request):
+            first, second, strict = await http_fetcher.fetch_all(requests)
+
+        first.headers["X-Seen"] = "1"
+        first.body["url"] = "changed"
+        assert "X-Seen" not in second.headers
+        assert second.body == {"url": "http://fake.url/a"}
+        # A different timeout is not served by the shared call
+        assert len(tracker["calls"]) == 2
+        assert strict.body == {"url": "http://fake.url/a"}
+
+    @pytest.mark.asyncio
+    async def test_requests_with_body_are_not_coalesced(self, http_fetcher):
+        request, tracker = fake_session_request(delays={"http://fake.url/a": 0.05})
+        requests = [
+            HTTPRequest("http://fake.url/a", method="POST", data={"n": 1})
+            for _ in range(3)
+        ]
+
+        with patch.object(http_fetcher.session, "request", side_effect=request):
+            await http_fetcher.fetch_all(requests)
+
+        assert len(tracker["calls"]) == 3
+        assert http_fetcher.get_stats()["request_deduplicated"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self, http_fetcher):
+        request, tracker = fake_session_request(delays={"http://fake.url/a": 0.05})
+
+        with patch.object(http_fetcher.session, "request", side_effect=request):
+            first = asyncio.create_task(
+                http_fetcher.fetch_single(HTTPRequest("http://fake.url/a"))
+            )
+            second = asyncio.create_task(
+                http_fetcher.fetch_single(HTTPRequest("http://fake.url/a"))
+            )
+            await asyncio.sleep(0.01)
+            first.cancel()
+            result = await second
+
+        assert first.cancelled()
+        assert result.status_code == 200
+        assert len(tracker["calls"]) == 1
@@ -0,0 +1,144 @@
+import os
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher.dataclass import FetchResult, HTTPRequest
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.frontier import BloomFilter, CrawlFrontier, normalize_url
+from test_retry import FakeClock
+
+
+def _done(url):
+    return FetchResult(0, HTTPRequest(url), error=OSError("not fetched"))
+
+
+class TestBloomFilter:
+
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        added = sum(bloom.add(f"http://a.test/{i}") for i in range(10_000))
+        assert added == len(bloom) and added > 9_900  # a few false positives
+        assert all(f"http://a.test/{i}" in bloom for i in range(10_000))
+        assert not bloom.add("http://a.test/0")
+
+        false_positives = sum(f"http://b.test/{i}" in bloom for i in range(10_000))
+        assert false_positives < 300
+        assert bloom.nbytes < 12_000  # ~9.6 bits per item
+
+
+class TestCrawlFrontier:
+
+    def test_normalize_url(self):
+        assert normalize_url("HTTP://A.Test:80") == "http://a.test/"
+        assert normalize_url("https://a.test:8443/x?q=1#top") == (
+            "https://a.test:8443/x?q=1"
+        )
+        assert normalize_url("mailto:someone@a.test") is None
+        assert normalize_url("http://a.test:port/") is None
+
+    def test_deduplicates_and_rotates_hosts_politely(self):
+        clock = FakeClock()
+        frontier = CrawlFrontier(capacity=100, delay=2.0, clock=clock)
+        urls = ["http://a.test/1", "http://a.test/2", "http://b.test/1"]
+        assert frontier.extend(urls + ["http://A.test/1#x"]) == 3
+        assert frontier.duplicates == 1
+
+        assert frontier.pop() == ("http://a.test/1", 0)
+        assert frontier.pop() == ("http://b.test/1", 0)
+        assert frontier.pop() is None
+        assert frontier.wait_time() == 2.0
+
+        clock.now += 2.0
+        assert frontier.pop() == ("http://a.test/2", 0)
+        assert frontier.wait_time() is None and frontier.in_flight == 3
+
+        frontier.complete(_done("http://a.test/1"))
+        assert frontier.in_flight == 2
+        assert frontier.host_throughput()["a.test"]["failed"] == 1
+
+    def test_per_host_state_is_bounded(self):
+        clock = FakeClock()
+        frontier = CrawlFrontier(capacity=10_000, delay=1.0, max_hosts=2, clock=clock)
+        for i in range(3000):
+            frontier.add(f"http://host{i}.test/")
+            url, _ = frontier.pop()
+            frontier.complete(_done(url))
+            clock.now += 0.01
+
+        # Only hosts still within their delay are remembered
+        assert len(frontier._next_ready) < 1024
+        assert set(frontier.hosts) == {"host0.test", "host1.test", "other"}
+        assert frontier.host_throughput()["other"]["failed"] == 2998
+
+    def test_overflow_to_disk(self, tmp_path):
+        path = tmp_path / "frontier.overflow"
+        frontier = CrawlFrontier(capacity=100, max_queued=2, overflow_path=path)
+        urls = [f"http://a.test/{i}" for i in range(7)]
+        frontier.extend(urls, depth=1)
+        assert (frontier.queued, len(frontier)) == (2, 7)
+        assert path.exists()
+
+        popped = []
+        while (entry := frontier.pop()) is not None:
+            popped.append(entry)
+        assert popped == [(url, 1) for url in urls]
+        assert len(frontier) == 0
+
+        frontier.close()
+        assert not os.path.exists(path)
+
+
+def _site():
+    links = {
+        "0": ["/1", "/2", "mailto:x@a.test", "/0"],
+        "1": ["/0", "/3"],
+        "2": ["/3#part", "/4"],
+        "3": ["/5"],
+    }
+
+    async def page(request):
+        page_id = request.match_info["page"]
+        anchors = "".join(
+            f'<a class="x" href="{href}">{href}</a>' for href in links.get(page_id, [])
+        )
+        return web.Response(text=f"<html>{anchors}</html>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/{page}", page)
+    return app
+
+
+class TestCrawl:
+
+    @pytest.mark.asyncio
+    async def test_crawl_follows_links_once(self):
+        async with TestServer(_site()) as server:
+            frontier = CrawlFrontier(capacity=1000)
+            async with AsyncHTTPFetcher() as fetcher:
+                results = [
+                    result
+                    async for result in fetcher.crawl(
+                        [str(server.make_url("/0"))], frontier=frontier, max_depth=2
+                    )
+                ]
+
+        paths = sorted(result.request.url.rsplit("/", 1)[1] for result in results)
+        assert paths == ["0", "1", "2", "3", "4"]  # /5 is at depth 3
+        assert all(result.ok for result in results)
+        assert frontier.stats()["duplicates"] >= 3
+        (host_stats,) = frontier.host_throughput().values()
+        assert host_stats["fetched"] == 5 and host_stats["bytes"] > 0
+
+    @pytest.mark.asyncio
+    async def test_crawl_stops_at_max_pages(self):
+        async with TestServer(_site()) as server:
+            async with AsyncHTTPFetcher() as fetcher:
+                results = [
+                    result
+                    async for result in fetcher.crawl(
+                        [str(server.make_url("/0"))], max_pages=3, window=1
+                    )
+                ]
+
+        assert len(results) == 3
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from unittest.mock import patch
+import pytest
+
+from fetcher.dataclass import BodyMode, HTTPRequest
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.hedging import HedgePolicy, can_hedge
+from fetcher.metrics import LatencyHistogram
+from fetcher.retry import RetryBudget
+from test_fetch import FakeRequestContext
+
+
+def delayed_requests(delays):
+    """``session.request`` replacement whose n-th call sleeps ``delays[n]``."""
+    tracker = {"in_flight": 0, "peak": 0, "calls": 0}
+
+    def request(method, url, **kwargs):
+        delay = delays[min(tracker["calls"], len(delays) - 1)]
+        tracker["calls"] += 1
+        return FakeRequestContext(tracker, body={"call": tracker["calls"]}, delay=delay)
+
+    return request, tracker
+
+
+def warm(fetcher, host="a.host", latency=0.01, samples=20):
+    for _ in range(samples):
+        fetcher.metrics.observe_request(host, 200, latency)
+
+
+class TestHedgePolicy:
+
+    def test_delay_needs_samples(self):
+        policy = HedgePolicy(min_samples=5, max_delay=0.5)
+        histogram = LatencyHistogram()
+        assert policy.delay(histogram) is None
+
+        for ms in range(1, 101):
+            histogram.record(ms / 1000)
+        assert policy.delay(histogram) == pytest.approx(0.095, rel=0.03)
+
+        histogram.record(100.0)
+        assert policy.delay(histogram) <= 0.5
+
+    def test_only_idempotent_requests_are_hedged(self):
+        assert can_hedge(HTTPRequest("http://a.host/"))
+        assert not can_hedge(HTTPRequest("http://a.host/", method="POST"))
+        assert not can_hedge(
+            HTTPRequest("http://a.host/", body_mode=BodyMode.STREAM, sink="/tmp/x")
+        )
+
+
+class TestFetcherHedging:
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged_and_hedge_wins(self):
+        request, tracker = delayed_requests([1.0, 0.0])
+        async with AsyncHTTPFetcher(hedging=HedgePolicy()) as fetcher:
+            warm(fetcher)
+            with patch.object(fetcher.session, "request", side_effect=request):
+                start = time.perf_counter()
+                result = await fetcher.fetch_single(HTTPRequest("http://a.host/x"))
+                elapsed = time.perf_counter() - start
+
+        assert result.body == {"call": 2}
+        assert elapsed < 0.5
+        stats = fetcher.get_stats()
+        assert stats["hedges_sent"] == 1
+        assert stats["hedges_won"] == 1
+        assert stats["request_succeeded"] == 1
+        assert fetcher.scheduler.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        request, tracker = delayed_requests([0.0])
+        async with AsyncHTTPFetcher(hedging=HedgePolicy()) as fetcher:
+            warm(fetcher, latency=0.2)
+            with patch.object(fetcher.session, "request", side_effect=request):
+                await fetcher.fetch_single(HTTPRequest("http://a.host/x"))
+
+        assert tracker["calls"] == 1
+        assert fetcher.get_stats()["hedges_sent"] == 0
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_hedges(self):
+        request, tracker = delayed_requests([0.1])
+        policy = HedgePolicy(budget=RetryBudget(ratio=0.0, min_per_second=0.2))
+        async with AsyncHTTPFetcher(hedging=policy, coalesce=False) as fetcher:
+            warm(fetcher)
+            with patch.object(fetcher.session, "request", side_effect=request):
+                await fetcher.fetch_all(
+                    [HTTPRequest(f"http://a.host/{i}") for i in range(5)]
+                )
+
+        # min_per_second * window = 2 hedges
+        assert fetcher.get_stats()["hedges_sent"] == 2
+        assert tracker["calls"] == 7
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_a_free_slot(self):
+        request, tracker = delayed_requests([0.1])
+        async with AsyncHTTPFetcher(
+            max_concurrent=2, hedging=HedgePolicy(), coalesce=False
+        ) as fetcher:
+            warm(fetcher)
+            with patch.object(fetcher.session, "request", side_effect=request):
+                await asyncio.gather(
+                    fetcher.fetch_single(HTTPRequest("http://a.host/1")),
+                    fetcher.fetch_single(HTTPRequest("http://a.host/2")),
+                )
+
+        assert fetcher.get_stats()["hedges_sent"] == 0
+        assert tracker["peak"] <= 2
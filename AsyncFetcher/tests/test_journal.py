@@ -0,0 +1,143 @@
+import os
+from unittest.mock import patch
+import pytest
+
+from fetcher.dataclass import FetchResult, HTTPRequest, HTTPResponse
+from fetcher.decoding import BodyDecoder
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.journal import RECORD, CrawlJournal, iter_spilled_results
+from test_fetch import fake_session_request
+
+
+def _result(index, ok=True):
+    request = HTTPRequest(f"http://a.host/{index}")
+    if not ok:
+        return FetchResult(index, request, error=RuntimeError("boom"))
+    response = HTTPResponse(request.url, 200, {}, {"i": index}, 0.01, 1)
+    return FetchResult(index, request, response)
+
+
+class TestCrawlJournal:
+
+    @pytest.mark.asyncio
+    async def test_records_survive_reopen(self, tmp_path):
+        path = tmp_path / "crawl.journal"
+        async with CrawlJournal(path) as journal:
+            journal.record(_result(0))
+            journal.record(_result(5, ok=False))
+            journal.record(_result(1000))
+
+        assert os.path.getsize(path) == 3 * RECORD.size
+        journal = CrawlJournal(path).open()
+        assert journal.is_done(0) and journal.is_done(1000)
+        assert not journal.is_done(5)  # failures are retried by default
+        assert not journal.is_done(1)
+        assert (journal.completed, journal.failed) == (2, 1)
+        journal.close()
+
+        journal = CrawlJournal(path, retry_failed=False).open()
+        assert journal.is_done(5)
+        journal.close()
+
+    def test_torn_record_is_truncated(self, tmp_path):
+        path = tmp_path / "crawl.journal"
+        path.write_bytes(RECORD.pack(3, 200, 1) + b"\x01\x02")
+
+        journal = CrawlJournal(path).open()
+        assert journal.is_done(3)
+        assert os.path.getsize(path) == RECORD.size
+        journal.close()
+
+    @pytest.mark.asyncio
+    async def test_spilled_results(self, tmp_path):
+        path = tmp_path / "crawl.journal"
+        async with CrawlJournal(path, spill_results=True) as journal:
+            journal.record(_result(0))
+            journal.record(_result(1, ok=False))
+
+        lines = list(iter_spilled_results(journal.results_path))
+        assert lines[0]["body"] == {"i": 0}
+        assert lines[1]["error"] == "RuntimeError: boom"
+
+    @pytest.mark.asyncio
+    async def test_undecoded_bodies_are_spilled_as_received(self, tmp_path):
+        decoder = BodyDecoder()
+        bodies = [
+            decoder.lazy(b'{"i": 0}', "application/json", None),
+            decoder.lazy(b"\xff\x00", "application/octet-stream", None),
+        ]
+        responses = [
+            HTTPResponse(f"http://a.host/{i}", 200, {}, body, 0.01, 1)
+            for i, body in enumerate(bodies)
+        ]
+        path = tmp_path / "crawl.journal"
+        async with CrawlJournal(path, spill_results=True) as journal:
+            for i, response in enumerate(responses):
+                journal.record(FetchResult(i, HTTPRequest(response.url), response))
+
+        assert all(response.lazy_body is not None for response in responses)
+        lines = list(iter_spilled_results(journal.results_path))
+        assert lines[0]["body_json"] == '{"i": 0}' and "body" not in lines[0]
+        assert lines[1]["body_base64"] == "/wA="
+
+
+class TestFetcherJournal:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("ordered", [False, True])
+    async def test_resume_skips_finished_requests(self, tmp_path, ordered):
+        path = tmp_path / "crawl.journal"
+        urls = [f"http://a.host/{i}" for i in range(20)]
+        requests = [HTTPRequest(url, max_retries=0) for url in urls]
+
+        # First run is interrupted after 8 results
+        request, _ = fake_session_request(statuses={urls[3]: 500})
+        async with CrawlJournal(path) as journal:
+            async with AsyncHTTPFetcher() as fetcher:
+                with patch.object(fetcher.session, "request", side_effect=request):
+                    seen = 0
+                    async for _ in fetcher.fetch_iter(
+                        requests, window=4, ordered=True, journal=journal
+                    ):
+                        seen += 1
+                        if seen == 8:
+                            break
+
+        journal = CrawlJournal(path).open()
+        remaining = [i for i in range(20) if not journal.is_done(i)]
+        journal.close()
+        assert 3 in remaining and len(remaining) < 20
+
+        request, tracker = fake_session_request()
+        async with CrawlJournal(path) as journal:
+            async with AsyncHTTPFetcher() as fetcher:
+                with patch.object(fetcher.session, "request", side_effect=request):
+                    results = [
+                        result
+                        async for result in fetcher.fetch_iter(
+                            requests, window=4, ordered=ordered, journal=journal
+                        )
+                    ]
+
+        fetched = sorted(call[1] for call in tracker["calls"])
+        assert fetched == sorted(urls[i] for i in remaining)
+        indexes = [result.index for result in results]
+        if ordered:
+            assert indexes == remaining
+        assert all(result.request is requests[result.index] for result in results)
+        journal = CrawlJournal(path).open()
+        assert journal.completed == 20
+        journal.close()
+
+    @pytest.mark.asyncio
+    async def test_fetch_all_with_journal(self, tmp_path):
+        requests = [HTTPRequest(f"http://a.host/{i}") for i in range(5)]
+        request, tracker = fake_session_request()
+        for _ in range(2):
+            async with CrawlJournal(tmp_path / "j") as journal:
+                async with AsyncHTTPFetcher() as fetcher:
+                    with patch.object(fetcher.session, "request", side_effect=request):
+                        responses = await fetcher.fetch_all(requests, journal=journal)
+
+        assert responses == []
+        assert len(tracker["calls"]) == 5
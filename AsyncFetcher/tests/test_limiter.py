@@ -0,0 +1,113 @@
+import asyncio
+from unittest.mock import patch
+import pytest
+
+from fetcher.dataclass import HTTPRequest
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.limiter import AdaptiveLimit, AIMDLimit, GradientLimit
+from fetcher.retry import RetryPolicy
+from fetcher.scheduler import HostScheduler
+from test_fetch import fake_session_request
+from test_retry import FakeClock
+
+
+class TestAdaptiveLimit:
+
+    def test_subclass_must_implement_update(self):
+        class NoUpdate(AdaptiveLimit):
+            pass
+
+        with pytest.raises(TypeError):
+            NoUpdate()
+
+
+class TestAIMDLimit:
+
+    def test_grows_only_when_busy(self):
+        limit = AIMDLimit(initial_limit=10)
+        for _ in range(100):
+            limit.on_sample(0.01, in_flight=2)
+        assert limit.limit == 10
+
+        for _ in range(100):
+            limit.on_sample(0.01, in_flight=10)
+        assert limit.limit > 10
+
+    def test_drop_backs_off_once_per_cooldown(self):
+        clock = FakeClock()
+        limit = AIMDLimit(initial_limit=100, backoff_ratio=0.5, clock=clock)
+        for _ in range(10):
+            limit.on_sample(1.0, in_flight=100, dropped=True)
+        assert limit.limit == 50
+
+        clock.now += 1.0
+        limit.on_sample(1.0, in_flight=50, dropped=True)
+        assert limit.limit == 25
+        assert [value for _, value in limit.history] == [100, 50, 25]
+
+    def test_respects_bounds(self):
+        limit = AIMDLimit(initial_limit=2, min_limit=2, max_limit=3, cooldown=0)
+        limit.on_sample(1.0, in_flight=2, dropped=True)
+        assert limit.limit == 2
+        for _ in range(100):
+            limit.on_sample(0.01, in_flight=3)
+        assert limit.limit == 3
+
+
+class TestGradientLimit:
+
+    def test_grows_while_latency_is_flat(self):
+        limit = GradientLimit(initial_limit=10)
+        for _ in range(50):
+            limit.on_sample(0.01, in_flight=limit.limit)
+        assert limit.limit > 10
+
+    def test_shrinks_when_latency_rises(self):
+        limit = GradientLimit(initial_limit=50, long_window=1000)
+        for _ in range(100):
+            limit.on_sample(0.01, in_flight=limit.limit)
+        grown = limit.limit
+
+        for _ in range(50):
+            limit.on_sample(0.1, in_flight=limit.limit)
+        assert limit.limit < grown / 2
+
+
+class TestSchedulerLimit:
+
+    @pytest.mark.asyncio
+    async def test_raising_the_limit_wakes_waiters(self):
+        scheduler = HostScheduler(max_concurrent=1)
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        scheduler.set_limit(2)
+        await asyncio.wait_for(waiter, 1)
+        assert scheduler.in_use == 2
+
+
+class TestFetcherAdaptiveLimit:
+
+    @pytest.mark.asyncio
+    async def test_throttling_lowers_the_limit(self):
+        urls = [f"http://a.host/{i}" for i in range(40)]
+        request, tracker = fake_session_request(
+            delays={url: 0.01 for url in urls}, statuses={urls[5]: 429}
+        )
+        limit = AIMDLimit(initial_limit=8, backoff_ratio=0.5)
+        async with AsyncHTTPFetcher(
+            concurrency_limit=limit,
+            retry_policy=RetryPolicy(base_delay=0.0),
+        ) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                await fetcher.fetch_all([HTTPRequest(url, max_retries=0) for url in urls])
+
+        assert fetcher.scheduler.max_concurrent == limit.limit
+        assert tracker["peak"] <= 8
+        assert 4 in [value for _, value in limit.history]
+
+        snapshot = fetcher.get_metrics()["concurrency_limit"]
+        assert snapshot["current"] == limit.limit
+        assert "fetcher_concurrency_limit " in fetcher.prometheus_metrics()
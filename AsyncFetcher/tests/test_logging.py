@@ -0,0 +1,76 @@
+import logging
+import threading
+
+from fetcher.logging import (
+    RateLimitFilter,
+    SamplingFilter,
+    get_logger,
+    set_log_file,
+    stop_logging,
+)
+from test_retry import FakeClock
+
+
+def _record(msg, *args, level=logging.INFO):
+    return logging.LogRecord("t", level, __file__, 1, msg, args, None)
+
+
+class TestFilters:
+
+    def test_sampling_keeps_every_nth_record_per_template(self):
+        sampler = SamplingFilter({"Success ": 0.25})
+        kept = [sampler.filter(_record("Success %s", i)) for i in range(8)]
+        assert kept == [True, False, False, False] * 2
+        assert all(sampler.filter(_record("Cache hit %s", i)) for i in range(3))
+        assert sampler.filter(_record("Success %s", 0, level=logging.ERROR))
+
+    def test_rate_limit_reports_suppressed_records(self):
+        clock = FakeClock()
+        limiter = RateLimitFilter(per_second=1, burst=2, clock=clock)
+        kept = [limiter.filter(_record("Failed %s", i)) for i in range(5)]
+        assert kept == [True, True, False, False, False]
+        assert limiter.filter(_record("Dropped %s", 1))
+
+        clock.now += 1
+        record = _record("Failed %s", 5)
+        assert limiter.filter(record)
+        assert record.getMessage() == "Failed 5 (3 similar suppressed)"
+
+        errors = [_record("Failed %s", i, level=logging.ERROR) for i in range(10)]
+        assert all(limiter.filter(record) for record in errors)
+
+
+class TestQueueLogging:
+
+    def test_records_are_formatted_on_the_listener_thread(self, tmp_path):
+        path = tmp_path / "test.log"
+        logger = get_logger("fetcher.test_queue", str(path))
+        logger.propagate = False
+        threads = []
+
+        class Arg:
+            def __str__(self):
+                threads.append(threading.current_thread())
+                return "lazy"
+
+        logger.debug("value %s", Arg())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed %d", 3)
+        stop_logging("fetcher.test_queue")
+
+        text = path.read_text()
+        assert "[DEBUG] value lazy" in text
+        assert "[ERROR] failed 3" in text and "ValueError: boom" in text
+        assert threads and threading.main_thread() not in threads
+
+    def test_log_file_can_be_moved(self, tmp_path):
+        logger = get_logger("fetcher.test_move", str(tmp_path / "first.log"))
+        logger.propagate = False
+        set_log_file(str(tmp_path / "second.log"), "fetcher.test_move")
+        logger.info("moved")
+        stop_logging("fetcher.test_move")
+
+        assert not (tmp_path / "first.log").exists()
+        assert "[INFO] moved" in (tmp_path / "second.log").read_text()
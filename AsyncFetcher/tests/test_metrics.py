@@ -0,0 +1,120 @@
+from unittest.mock import patch
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher.dataclass import BodyMode, HTTPRequest
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.metrics import FetcherMetrics, LatencyHistogram, status_class
+from test_fetch import fake_session_request
+
+
+class TestLatencyHistogram:
+
+    def test_percentiles_within_precision(self):
+        histogram = LatencyHistogram(precision=0.01)
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        assert histogram.count == 1000
+        assert histogram.percentile(0.5) == pytest.approx(0.5, rel=0.02)
+        assert histogram.percentile(0.99) == pytest.approx(0.99, rel=0.02)
+        assert histogram.percentile(1.0) == pytest.approx(1.0)
+        assert histogram.summary()["mean"] == pytest.approx(0.5005)
+
+    def test_merge(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.record(0.1)
+        b.record(0.3)
+        a.merge(b)
+        assert a.count == 2
+        assert a.max == 0.3
+
+    def test_status_class(self):
+        assert status_class(204) == "2xx"
+        assert status_class(503) == "5xx"
+        assert status_class(None) == "error"
+
+
+class TestFetcherMetrics:
+
+    def test_prometheus_format(self):
+        metrics = FetcherMetrics()
+        metrics.observe_request("a.host", 200, 0.25)
+        metrics.bytes_in["a.host"] = 10
+        text = metrics.to_prometheus({"request_made": 1})
+
+        assert "# TYPE fetcher_request_duration_seconds summary" in text
+        assert (
+            'fetcher_request_duration_seconds{host="a.host",status_class="2xx",'
+            'quantile="0.5"} 0.25' in text
+        )
+        assert 'fetcher_received_bytes_total{host="a.host"} 10' in text
+        assert "fetcher_request_made_total 1" in text
+
+    @pytest.mark.asyncio
+    async def test_hosts_beyond_the_cap_share_one_label(self):
+        request, _ = fake_session_request()
+        urls = [f"http://host{i}.example/" for i in range(50)]
+        async with AsyncHTTPFetcher(metrics_max_hosts=3) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                await fetcher.fetch_all([HTTPRequest(url) for url in urls])
+
+        snapshot = fetcher.get_metrics()
+        assert len(snapshot["latency"]) == 4 and len(snapshot["ttfb"]) == 4
+        assert snapshot["latency"]["other"]["2xx"]["count"] == 47
+        assert fetcher.metrics.label("host0.example") == "host0.example"
+        assert fetcher.metrics.label("host9.example") == "other"
+
+    @pytest.mark.asyncio
+    async def test_fetcher_records_latency_by_host_and_status(self):
+        request, _ = fake_session_request(statuses={"http://b.host/missing": 404})
+        async with AsyncHTTPFetcher() as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                await fetcher.fetch_all(
+                    [
+                        HTTPRequest("http://a.host/ok"),
+                        HTTPRequest("http://b.host/missing", max_retries=0),
+                    ]
+                )
+
+        snapshot = fetcher.get_metrics()
+        assert snapshot["latency"]["a.host"]["2xx"]["count"] == 1
+        assert snapshot["latency"]["b.host"]["4xx"]["count"] == 1
+        assert snapshot["ttfb"]["a.host"]["count"] == 1
+        assert snapshot["slot_wait"]["count"] == 2
+        assert snapshot["stats"]["request_made"] == 2
+
+    @pytest.mark.asyncio
+    async def test_bytes_and_connection_reuse_from_tracing(self):
+        async def handler(request):
+            return web.json_response({"payload": "x" * 100})
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        async with TestServer(app) as server:
+            url = str(server.make_url("/"))
+            host = f"{server.host}:{server.port}"
+            async with AsyncHTTPFetcher(max_concurrent=1, coalesce=False) as fetcher:
+                await fetcher.fetch_all([HTTPRequest(url) for _ in range(3)])
+
+        snapshot = fetcher.get_metrics()
+        assert snapshot["bytes_in"][host] >= 300
+        assert snapshot["connections"]["created"] == 1
+        assert snapshot["connections"]["reused"] == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", [BodyMode.BYTES, BodyMode.DISCARD])
+    async def test_bytes_in_for_chunked_body_modes(self, mode):
+        async def handler(request):
+            return web.Response(body=b"x" * 200_000)
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        async with TestServer(app) as server:
+            url = str(server.make_url("/"))
+            host = f"{server.host}:{server.port}"
+            async with AsyncHTTPFetcher() as fetcher:
+                await fetcher.fetch_single(HTTPRequest(url, body_mode=mode))
+
+        assert fetcher.get_metrics()["bytes_in"][host] == 200_000
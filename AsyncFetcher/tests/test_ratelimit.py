@@ -0,0 +1,83 @@
+import time
+from email.utils import formatdate
+from unittest.mock import patch
+import pytest
+
+from fetcher.dataclass import HTTPRequest
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.ratelimit import HostRateLimiter, TokenBucket, parse_retry_after
+from fetcher.retry import RetryPolicy
+from test_fetch import FakeRequestContext
+from test_retry import FakeClock
+
+
+class TestTokenBucket:
+
+    def test_burst_then_spaced_reservations(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock)
+        delays = [bucket.reserve() for _ in range(4)]
+        assert delays == pytest.approx([0.0, 0.0, 0.1, 0.2])
+
+        clock.now += 1.0
+        assert bucket.reserve() == 0.0
+
+    def test_throttle_lowers_rate_and_success_recovers(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, clock=clock, increase=10)
+        bucket.on_throttled()
+        bucket.on_throttled()  # within cooldown: no second decrease
+        assert bucket.rate == 5
+
+        for _ in range(20):
+            bucket.on_success()
+        assert bucket.rate == 10
+
+    def test_retry_after_blocks(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=None, clock=clock)
+        assert bucket.reserve() == 0.0
+        bucket.on_throttled(retry_after=3)
+        assert bucket.reserve() == 3
+        clock.now += 3
+        assert bucket.reserve() == 0.0
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after({"Retry-After": "120"}) == 120
+        assert parse_retry_after({"retry-after": "1.5"}) == 1.5
+        assert parse_retry_after({}) is None
+        assert parse_retry_after({"Retry-After": "soon"}) is None
+
+        now = time.time()
+        date = formatdate(now + 60, usegmt=True)
+        assert parse_retry_after({"Retry-After": date}, now=now) == pytest.approx(
+            60, abs=1
+        )
+
+
+class TestFetcherRateLimit:
+
+    @pytest.mark.asyncio
+    async def test_429_honours_retry_after_and_lowers_rate(self):
+        statuses = [429, 200]
+        started = []
+
+        def request(method, url, **kwargs):
+            started.append(time.perf_counter())
+            tracker = {"in_flight": 0, "peak": 0}
+            return FakeRequestContext(
+                tracker,
+                status=statuses[len(started) - 1],
+                headers={"Retry-After": "0.2"},
+            )
+
+        limiter = HostRateLimiter(rate=100)
+        policy = RetryPolicy(base_delay=0.0, jitter=False)
+        async with AsyncHTTPFetcher(rate_limiter=limiter, retry_policy=policy) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                result = await fetcher.fetch_single(HTTPRequest("http://a.host/x"))
+
+        assert result.status_code == 200
+        assert started[1] - started[0] >= 0.2
+        assert limiter.current_rate("a.host") < 100
+        assert fetcher.get_stats()["request_throttled"] == 1
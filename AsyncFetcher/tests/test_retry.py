@@ -0,0 +1,99 @@
+import asyncio
+import random
+from unittest.mock import patch
+import pytest
+
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.dataclass import HTTPRequest
+from fetcher.retry import RetryBudget, RetryPolicy
+from test_fetch import fake_session_request
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicy:
+
+    def test_backoff_is_capped_and_jittered(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        delays = [policy.backoff(10) for _ in range(100)]
+        assert all(0 <= d <= 4.0 for d in delays)
+        assert len(set(delays)) > 1
+
+        assert RetryPolicy(base_delay=0.5, jitter=False).backoff(2) == 2.0
+
+    def test_seeded_rng_makes_jitter_reproducible(self):
+        first = RetryPolicy(rng=random.Random(7))
+        second = RetryPolicy(rng=random.Random(7))
+        assert [first.backoff(n) for n in range(5)] == [
+            second.backoff(n) for n in range(5)
+        ]
+
+    def test_budget_limits_retries_to_ratio_of_traffic(self):
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.1, min_per_second=0, window=10, clock=clock)
+        for _ in range(100):
+            budget.record_request()
+
+        granted = sum(budget.try_spend() for _ in range(50))
+        assert granted == 10
+
+    def test_budget_window_expires(self):
+        clock = FakeClock()
+        budget = RetryBudget(ratio=1.0, min_per_second=0, window=5, clock=clock)
+        budget.record_request()
+        assert budget.try_spend()
+        assert not budget.try_spend()
+
+        clock.now += 6
+        budget.record_request()
+        assert budget.try_spend()
+
+
+class TestFetcherRetries:
+
+    @pytest.mark.asyncio
+    async def test_backoff_releases_slot(self):
+        """A request backing off must not block other requests."""
+        request, _ = fake_session_request(statuses={"http://a.host/fail": 503})
+        policy = RetryPolicy(base_delay=0.3, jitter=False)
+
+        async with AsyncHTTPFetcher(max_concurrent=1, retry_policy=policy) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                failing = asyncio.create_task(
+                    fetcher.fetch_single(HTTPRequest("http://a.host/fail", max_retries=1))
+                )
+                await asyncio.sleep(0.05)
+
+                ok = await asyncio.wait_for(
+                    fetcher.fetch_single(HTTPRequest("http://a.host/ok")), timeout=0.2
+                )
+                assert ok.status_code == 200
+                assert not failing.done()
+
+                with pytest.raises(Exception):
+                    await failing
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_fails_fast(self):
+        request, tracker = fake_session_request(statuses={"http://a.host/fail": 503})
+        policy = RetryPolicy(
+            base_delay=0.01, budget=RetryBudget(ratio=0.0, min_per_second=0)
+        )
+
+        async with AsyncHTTPFetcher(retry_policy=policy) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                with pytest.raises(Exception):
+                    await fetcher.fetch_single(
+                        HTTPRequest("http://a.host/fail", max_retries=5)
+                    )
+
+        stats = fetcher.get_stats()
+        assert len(tracker["calls"]) == 1
+        assert stats["retries_throttled"] == 1
+        assert stats["total_retries"] == 0
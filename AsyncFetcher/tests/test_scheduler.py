@@ -0,0 +1,216 @@
+import asyncio
+import time
+from unittest.mock import patch
+import pytest
+
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.journal import CrawlJournal
+from fetcher.dataclass import HTTPRequest
+from fetcher.exceptions import DeadlineExceededError
+from fetcher.scheduler import HostScheduler, host_key
+from test_fetch import fake_session_request
+
+
+async def _hold(scheduler, host, order, release_event, priority=0, deadline=None):
+    async with scheduler.slot(host, priority, deadline):
+        order.append(host)
+        await release_event.wait()
+
+
+class TestHostScheduler:
+
+    def test_host_key(self):
+        assert host_key("https://Example.com:8443/a?b=1") == "example.com:8443"
+        assert host_key("http://example.com/") == "example.com"
+
+    @pytest.mark.asyncio
+    async def test_round_robin_across_hosts(self):
+        scheduler = HostScheduler(max_concurrent=1)
+        order = []
+        gate = asyncio.Event()
+        gate.set()
+
+        await scheduler.acquire("blocker")
+        tasks = [
+            asyncio.create_task(_hold(scheduler, host, order, gate))
+            for host in ["a", "a", "a", "b", "b", "c"]
+        ]
+        await asyncio.sleep(0)
+        scheduler.release("blocker")
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b", "c", "a", "b", "a"]
+
+    @pytest.mark.asyncio
+    async def test_weights(self):
+        scheduler = HostScheduler(max_concurrent=1, weights={"a": 2})
+        order = []
+        gate = asyncio.Event()
+        gate.set()
+
+        await scheduler.acquire("blocker")
+        tasks = [
+            asyncio.create_task(_hold(scheduler, host, order, gate))
+            for host in ["a", "a", "a", "a", "b", "b"]
+        ]
+        await asyncio.sleep(0)
+        scheduler.release("blocker")
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "a", "b", "a", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_per_host_limit_leaves_room_for_other_hosts(self):
+        scheduler = HostScheduler(max_concurrent=4, max_per_host=2)
+        order = []
+        gate = asyncio.Event()
+
+        slow = [
+            asyncio.create_task(_hold(scheduler, "slow", order, gate))
+            for _ in range(4)
+        ]
+        fast = [
+            asyncio.create_task(_hold(scheduler, "fast", order, gate))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+
+        assert scheduler.active("slow") == 2
+        assert scheduler.active("fast") == 2
+        assert scheduler.waiting == 2
+
+        gate.set()
+        await asyncio.gather(*slow, *fast)
+        assert scheduler.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        scheduler = HostScheduler(max_concurrent=1)
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        scheduler.release("a")
+        assert scheduler.in_use == 0
+        await asyncio.wait_for(scheduler.acquire("c"), timeout=1)
+        assert scheduler.active("c") == 1
+
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_is_served_first(self):
+        scheduler = HostScheduler(max_concurrent=1)
+        order = []
+        gate = asyncio.Event()
+        gate.set()
+
+        await scheduler.acquire("blocker")
+        waiters = [("bulk", 0), ("bulk", 0), ("ui", 5), ("api", 5), ("ui", 5)]
+        tasks = [
+            asyncio.create_task(_hold(scheduler, host, order, gate, priority))
+            for host, priority in waiters
+        ]
+        await asyncio.sleep(0)
+        scheduler.release("blocker")
+        await asyncio.gather(*tasks)
+
+        assert order == ["ui", "api", "ui", "bulk", "bulk"]
+
+    @pytest.mark.asyncio
+    async def test_nearest_deadline_first_within_host(self):
+        scheduler = HostScheduler(max_concurrent=1)
+        order = []
+        gate = asyncio.Event()
+        gate.set()
+        now = time.time()
+
+        await scheduler.acquire("blocker")
+
+        async def hold(name, deadline):
+            async with scheduler.slot("a", deadline=deadline):
+                order.append(name)
+
+        tasks = [
+            asyncio.create_task(hold("none", None)),
+            asyncio.create_task(hold("late", now + 60)),
+            asyncio.create_task(hold("soon", now + 10)),
+        ]
+        await asyncio.sleep(0)
+        scheduler.release("blocker")
+        await asyncio.gather(*tasks)
+
+        assert order == ["soon", "late", "none"]
+
+    @pytest.mark.asyncio
+    async def test_expired_waiter_is_dropped(self):
+        scheduler = HostScheduler(max_concurrent=1)
+        await scheduler.acquire("a")
+
+        with pytest.raises(DeadlineExceededError):
+            await scheduler.acquire("b", deadline=time.time() + 0.05)
+        with pytest.raises(DeadlineExceededError):
+            await scheduler.acquire("b", deadline=time.time() - 1)
+
+        scheduler.release("a")
+        assert scheduler.in_use == 0
+        await asyncio.wait_for(scheduler.acquire("c"), timeout=1)
+
+
+class TestFetcherHostLimits:
+
+    @pytest.mark.asyncio
+    async def test_slow_host_does_not_starve_fast_host(self):
+        slow_urls = [f"http://slow.host/{i}" for i in range(6)]
+        fast_urls = [f"http://fast.host/{i}" for i in range(6)]
+        request, tracker = fake_session_request(
+            delays={url: 0.2 for url in slow_urls}
+        )
+
+        async with AsyncHTTPFetcher(max_concurrent=4, max_per_host=2) as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                requests = [HTTPRequest(url) for url in slow_urls + fast_urls]
+                finished = []
+                async for result in fetcher.fetch_iter(requests, window=12):
+                    finished.append(result.request.url)
+
+        # All fast requests complete before the first slow batch is done
+        assert set(finished[:6]) == set(fast_urls)
+
+    @pytest.mark.asyncio
+    async def test_expired_request_never_reaches_the_network(self):
+        request, tracker = fake_session_request()
+        async with AsyncHTTPFetcher() as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                with pytest.raises(DeadlineExceededError):
+                    await fetcher.fetch_single(
+                        HTTPRequest("http://a.host/", deadline=time.time() - 1)
+                    )
+
+        assert tracker["calls"] == []
+        assert fetcher.get_stats()["request_expired"] == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("journaled", [False, True])
+    async def test_fetch_all_deadline_cancels_stragglers(self, tmp_path, journaled):
+        request, _ = fake_session_request(delays={"http://slow.host/": 5.0})
+        journal = CrawlJournal(tmp_path / "crawl.journal") if journaled else None
+        async with AsyncHTTPFetcher() as fetcher:
+            with patch.object(fetcher.session, "request", side_effect=request):
+                start = time.perf_counter()
+                results = await fetcher.fetch_all(
+                    [HTTPRequest("http://fast.host/"), HTTPRequest("http://slow.host/")],
+                    deadline=time.time() + 0.2,
+                    journal=journal.open() if journal else None,
+                )
+
+        assert time.perf_counter() - start < 1.0
+        assert [r.url for r in results] == ["http://fast.host/"]
+        stats = fetcher.get_stats()
+        assert stats["request_expired"] == 1
+        assert stats["request_failed"] == 1 and stats["request_succeeded"] == 1
+        if journal is not None:
+            journal.close()
+            assert (journal.completed, journal.failed) == (1, 1)
+            assert not journal.is_done(1)
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher.dataclass import HTTPRequest
+from fetcher.exceptions import ConfigurationError, WorkerError
+from fetcher.logging import logger
+from fetcher.sharded import ShardedFetcher, _portable, shard_for
+
+
+class TestSharding:
+
+    def test_shard_for_is_stable_per_host(self):
+        shards = {shard_for(f"http://a.host/{i}", 4) for i in range(20)}
+        assert len(shards) == 1
+        assert shard_for("http://A.host/x", 4) == shard_for("http://a.host/y", 4)
+
+    def test_hosts_spread_over_shards(self):
+        shards = {shard_for(f"http://host{i}.example/", 4) for i in range(100)}
+        assert shards == {0, 1, 2, 3}
+
+    def test_unpicklable_errors_become_worker_errors(self):
+        class Local(Exception):
+            pass
+
+        error = _portable(Local("boom"))
+        assert isinstance(error, WorkerError)
+        assert "Local: boom" in str(error)
+        assert _portable(None) is None
+
+
+class TestShardedFetcher:
+
+    @pytest.mark.asyncio
+    async def test_fetches_across_worker_processes(self):
+        async def handler(request):
+            return web.json_response({"n": int(request.match_info["n"])})
+
+        app = web.Application()
+        app.router.add_get("/{n}", handler)
+        async with TestServer(app) as server:
+            # Two host spellings so that both shards get work
+            hosts = [f"127.0.0.1:{server.port}", f"localhost:{server.port}"]
+            requests = [
+                HTTPRequest(f"http://{hosts[i % 2]}/{i}", max_retries=0)
+                for i in range(40)
+            ]
+            requests.append(HTTPRequest(f"http://{hosts[0]}/nan", max_retries=0))
+
+            async with ShardedFetcher(workers=2, batch_size=8) as fetcher:
+                results = [r async for r in fetcher.fetch_iter(requests, ordered=True)]
+
+        assert [r.index for r in results] == list(range(41))
+        assert [r.response.body["n"] for r in results[:40]] == list(range(40))
+        assert results[0].request is requests[0]
+        assert results[40].error is not None
+
+        stats = fetcher.get_stats()
+        assert stats["request_made"] == 41
+        assert stats["request_succeeded"] == 40
+
+    @pytest.mark.asyncio
+    async def test_worker_records_are_written_by_the_parent(self):
+        class Collect(logging.Handler):
+            def __init__(self):
+                super().__init__()
+                self.records = []
+
+            def emit(self, record):
+                self.records.append(record)
+
+        async def handler(request):
+            return web.Response(status=404)
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        collect = Collect()
+        logger.addHandler(collect)
+        try:
+            async with TestServer(app) as server:
+                request = HTTPRequest(str(server.make_url("/")), max_retries=0)
+                async with ShardedFetcher(workers=1) as fetcher:
+                    [result] = [r async for r in fetcher.fetch_iter([request])]
+        finally:
+            logger.removeHandler(collect)
+
+        assert result.error is not None
+        worker_records = [
+            r for r in collect.records if r.processName == "fetcher-shard-0"
+        ]
+        assert any(request.url in r.getMessage() for r in worker_records)
+
+    @pytest.mark.asyncio
+    async def test_dead_worker_raises_instead_of_hanging(self):
+        requests = [HTTPRequest(f"http://a.host/{i}") for i in range(1000)]
+
+        async def run():
+            async with ShardedFetcher(workers=1, batch_size=8) as fetcher:
+                fetcher._processes[0].kill()
+                fetcher._processes[0].join()
+                async for _ in fetcher.fetch_iter(requests):
+                    pass
+
+        with pytest.raises(WorkerError, match="fetcher-shard-0"):
+            await asyncio.wait_for(run(), timeout=10)
+
+    def test_max_in_flight_below_batch_size_is_rejected(self):
+        with pytest.raises(ConfigurationError):
+            ShardedFetcher(workers=1, max_in_flight=10, batch_size=64)
+
+    @pytest.mark.asyncio
+    async def test_partial_batches_are_sent_when_credits_run_out(self):
+        async def handler(request):
+            return web.json_response({"n": int(request.match_info["n"])})
+
+        app = web.Application()
+        app.router.add_get("/{n}", handler)
+        async with TestServer(app) as server:
+            hosts = [f"127.0.0.1:{server.port}", f"localhost:{server.port}"]
+            requests = [
+                HTTPRequest(f"http://{hosts[i % 2]}/{i}", max_retries=0)
+                for i in range(20)
+            ]
+
+            async def slow_source():
+                for request in requests[:3]:
+                    yield request
+                await asyncio.sleep(0.5)
+                for request in requests[3:]:
+                    yield request
+
+            # Two shards can each hold a partial batch of up to 7 credits
+            async with ShardedFetcher(
+                workers=2, max_in_flight=8, batch_size=8
+            ) as fetcher:
+                results = await asyncio.wait_for(fetcher.fetch_all(requests), 30)
+                started = asyncio.get_running_loop().time()
+                first = []
+                async for result in fetcher.fetch_iter(slow_source()):
+                    first.append(asyncio.get_running_loop().time())
+                    if len(first) == 3:
+                        break
+
+        assert [r.body["n"] for r in results] == list(range(20))
+        # The first results arrive before the source resumes
+        assert first[-1] - started < 0.4
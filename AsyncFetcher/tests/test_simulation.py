@@ -0,0 +1,103 @@
+import asyncio
+import time
+import pytest
+
+from fetcher.ratelimit import HostRateLimiter
+from fetcher.simulation import Simulation, UpstreamModel, VirtualTimeLoop
+
+
+class TestVirtualTimeLoop:
+
+    def test_sleeps_take_no_wall_time(self):
+        loop = VirtualTimeLoop()
+        order = []
+
+        async def sleeper(delay):
+            await asyncio.sleep(delay)
+            order.append((delay, loop.time()))
+
+        async def main():
+            await asyncio.gather(sleeper(3600), sleeper(60))
+            async with asyncio.timeout(10):
+                await asyncio.sleep(5)
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(10):
+                    await asyncio.sleep(3600)
+
+        started = time.perf_counter()
+        try:
+            loop.run_until_complete(main())
+        finally:
+            loop.close()
+
+        assert order == [(60, 60.0), (3600, 3600.0)]
+        assert loop.time() == 3615.0
+        assert time.perf_counter() - started < 1.0
+
+
+class TestSimulation:
+
+    def test_healthy_upstream(self):
+        upstream = UpstreamModel(latency=0.1, latency_sigma=0.0)
+        with Simulation(upstream, rate=20, duration=600, hosts=2) as simulation:
+            report = simulation.run(max_concurrent=10)
+
+        assert report.requests > 10_000 and report.failed == 0
+        assert report.retry_amplification == 1.0
+        assert report.throughput == pytest.approx(20, rel=0.05)
+        assert report.latency.percentile(0.99) == pytest.approx(0.1, rel=0.05)
+        assert report.speedup > 50
+
+    def test_errors_and_timeouts_are_retried(self):
+        upstream = UpstreamModel(latency=0.05, error_rate=0.2, timeout_rate=0.05)
+        with Simulation(
+            upstream,
+            rate=10,
+            duration=600,
+            request_options={"timeout": 2.0, "max_retries": 3},
+        ) as simulation:
+            report = simulation.run()
+
+        assert report.retry_amplification > 1.2
+        assert report.upstream_statuses[503] > 0 and report.upstream_timeouts > 0
+        assert report.succeeded / report.requests > 0.99
+        # Timed out attempts wait out the timeout and a backoff
+        assert report.latency.percentile(0.99) > 2.0
+
+    def test_too_little_concurrency_shows_as_queueing(self):
+        upstream = UpstreamModel(latency=0.2, latency_sigma=0.0)
+        with Simulation(upstream, rate=50, duration=60) as simulation:
+            starved = simulation.run(max_concurrent=5)
+            enough = simulation.run(max_concurrent=20)
+
+        assert starved.latency.percentile(0.5) > 10
+        assert enough.latency.percentile(0.99) < 0.3
+
+    def test_rate_limited_upstream(self):
+        upstream = UpstreamModel(latency=0.05, rate_limit=5, burst=5)
+        with Simulation(
+            upstream, rate=10, duration=120, request_options={"max_retries": 5}
+        ) as simulation:
+            limiter = HostRateLimiter(rate=4, burst=4, clock=simulation.clock)
+            report = simulation.run(rate_limiter=limiter)
+
+        assert report.upstream_statuses.get(429, 0) < report.requests * 0.05
+        assert report.throughput == pytest.approx(4, rel=0.1)
+
+    def test_same_seed_gives_same_report(self):
+        upstream = UpstreamModel(latency=0.05, error_rate=0.2, timeout_rate=0.05)
+        reports = []
+        for _ in range(2):
+            with Simulation(
+                upstream,
+                rate=10,
+                duration=300,
+                seed=3,
+                request_options={"timeout": 2.0, "max_retries": 3},
+            ) as simulation:
+                report = simulation.run().to_dict()
+            del report["wall_seconds"], report["speedup"]
+            reports.append(report)
+
+        assert reports[0]["retry_amplification"] > 1.0
+        assert reports[0] == reports[1]
@@ -0,0 +1,94 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from unittest.mock import patch
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher.dataclass import HTTPRequest
+from fetcher.sync import SyncHTTPFetcher
+from test_fetch import fake_session_request
+
+
+@pytest.fixture
+def server_url():
+    """A local server running on its own loop thread."""
+
+    async def handler(request):
+        return web.json_response({"path": request.path})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = TestServer(app)
+    asyncio.run_coroutine_threadsafe(server.start_server(), loop).result()
+    yield str(server.make_url(""))
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+class TestSyncHTTPFetcher:
+
+    def test_calls_from_many_threads_share_one_pool(self, server_url):
+        with SyncHTTPFetcher(max_concurrent=4, coalesce=False) as fetcher:
+
+            def work(worker):
+                response = fetcher.fetch(HTTPRequest(f"{server_url}/{worker}/a"))
+                futures = fetcher.fetch_many(
+                    HTTPRequest(f"{server_url}/{worker}/{i}") for i in range(3)
+                )
+                return [response] + [future.result() for future in futures]
+
+            with concurrent.futures.ThreadPoolExecutor(8) as pool:
+                batches = list(pool.map(work, range(8)))
+
+            paths = [response.body["path"] for response in batches[2]]
+            assert paths == ["/2/a", "/2/0", "/2/1", "/2/2"]
+            assert fetcher.get_stats()["request_succeeded"] == 32
+            connections = fetcher.get_metrics()["connections"]
+            assert connections["created"] <= 4
+            assert connections["created"] + connections["reused"] == 32
+
+    def test_errors_and_cancellation_reach_the_future(self):
+        request, tracker = fake_session_request(
+            delays={"http://a.host/slow": 5.0},
+            statuses={"http://a.host/missing": 404},
+        )
+        with SyncHTTPFetcher() as fetcher:
+            with patch.object(fetcher.fetcher.session, "request", side_effect=request):
+                with pytest.raises(aiohttp.ClientResponseError):
+                    fetcher.fetch(HTTPRequest("http://a.host/missing", max_retries=0))
+
+                future = fetcher.submit(HTTPRequest("http://a.host/slow"))
+                while tracker["in_flight"] == 0:
+                    time.sleep(0.01)
+                assert future.cancel()
+                while tracker["in_flight"]:
+                    time.sleep(0.01)
+
+                with pytest.raises(concurrent.futures.TimeoutError):
+                    fetcher.fetch(HTTPRequest("http://a.host/slow"), timeout=0.05)
+
+        assert future.cancelled()
+
+    def test_closed_fetcher_refuses_work(self):
+        fetcher = SyncHTTPFetcher()
+        fetcher.close()
+        with pytest.raises(RuntimeError):
+            fetcher.submit(HTTPRequest("http://a.host/"))
+
+        request, _ = fake_session_request(delays={"http://a.host/slow": 5.0})
+        fetcher = SyncHTTPFetcher().start()
+        with patch.object(fetcher.fetcher.session, "request", side_effect=request):
+            pending = fetcher.submit(HTTPRequest("http://a.host/slow"))
+            fetcher.close()
+        assert pending.cancelled()
+        with pytest.raises(RuntimeError):
+            fetcher.fetch(HTTPRequest("http://a.host/"))
@@ -0,0 +1,90 @@
+import json
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher.dataclass import BodyMode, HTTPRequest
+from fetcher.fetch import AsyncHTTPFetcher
+from fetcher.transport import RecordedResponse, RecordingTransport, ReplayTransport
+
+
+class TestReplayTransport:
+
+    @pytest.mark.asyncio
+    async def test_replays_recorded_responses(self):
+        transport = ReplayTransport(
+            [
+                RecordedResponse(
+                    "http://a.test/item",
+                    headers={"Content-Type": "application/json"},
+                    body=b'{"id": 1}',
+                ),
+                RecordedResponse(
+                    "http://a.test/text",
+                    headers={"Content-Type": "text/plain; charset=latin-1"},
+                    body="café".encode("latin-1"),
+                ),
+                RecordedResponse("http://a.test/gone", status=404),
+            ]
+        )
+
+        async with AsyncHTTPFetcher(transport=transport) as fetcher:
+            item = await fetcher.fetch_single(HTTPRequest("http://a.test/item"))
+            text = await fetcher.fetch_single(HTTPRequest("http://a.test/text"))
+            raw = await fetcher.fetch_single(
+                HTTPRequest("http://a.test/item", body_mode=BodyMode.BYTES)
+            )
+            with pytest.raises(aiohttp.ClientResponseError) as info:
+                await fetcher.fetch_single(
+                    HTTPRequest("http://a.test/gone", max_retries=0)
+                )
+            with pytest.raises(aiohttp.ClientConnectionError):
+                await fetcher.fetch_single(
+                    HTTPRequest("http://a.test/missing", max_retries=0)
+                )
+
+        assert item.status_code == 200 and item.body == {"id": 1}
+        assert text.body == "café"
+        assert raw.body == b'{"id": 1}'
+        assert info.value.status == 404
+        assert transport.requests == 5
+
+    @pytest.mark.asyncio
+    async def test_default_response_serves_any_url(self):
+        transport = ReplayTransport(default=RecordedResponse("", body=b"ok"))
+        urls = [f"http://a.test/{i}" for i in range(20)]
+
+        async with AsyncHTTPFetcher(transport=transport) as fetcher:
+            responses = await fetcher.fetch_all([HTTPRequest(url) for url in urls])
+
+        assert [response.url for response in responses] == urls
+        assert all(response.body == "ok" for response in responses)
+
+
+class TestRecordingTransport:
+
+    @pytest.mark.asyncio
+    async def test_recordings_replay_without_the_server(self, tmp_path):
+        async def handler(request):
+            return web.json_response({"n": int(request.match_info["n"])})
+
+        app = web.Application()
+        app.router.add_get("/{n}", handler)
+        path = tmp_path / "recorded.ndjson"
+
+        async with TestServer(app) as server:
+            urls = [str(server.make_url(f"/{n}")) for n in range(3)]
+            recorder = RecordingTransport(path)
+            async with AsyncHTTPFetcher(transport=recorder) as fetcher:
+                live = await fetcher.fetch_all([HTTPRequest(url) for url in urls])
+
+        assert len(path.read_text().splitlines()) == 3
+        assert json.loads(path.read_text().splitlines()[0])["status"] == 200
+
+        transport = ReplayTransport.load(path)
+        async with AsyncHTTPFetcher(transport=transport) as fetcher:
+            replayed = await fetcher.fetch_all([HTTPRequest(url) for url in urls])
+
+        assert [r.body for r in replayed] == [r.body for r in live]
+        assert replayed[2].body == {"n": 2}
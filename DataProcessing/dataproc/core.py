@@ -20,7 +20,7 @@ class DataProcessor(ABC, metaclass=ProcessorMeta):
     def __init__(self, config: ProcessorConfig):
         self.config = config
         self.logger = logger
-        self.logger.info(f"Initialized {self.__class__.__name__} processor")
+        self.logger.info("Initialized %s processor", self.__class__.__name__)
 
     @abstractmethod
     def process(self, data: list[Any]) -> ProcessingResult:
@@ -61,14 +61,16 @@ class DataProcessor(ABC, metaclass=ProcessorMeta):
                 f"Input size {len(data)} exceeds maximum {self.config.max_input_size}"
             )
 
-        self.logger.debug(f"Input validation passed for {len(data)} items")
+        self.logger.debug("Input validation passed for %d items", len(data))
 
     def log_result(self, result: ProcessingResult) -> None:
         """Log processing result if configured to do so."""
         if self.config.log_results:
             self.logger.info(
-                f"Processed {len(result.input_data)} items in "
-                f"{result.processing_time:.3f}s using {result.processor_name}"
+                "Processed %d items in %.3fs using %s",
+                len(result.input_data),
+                result.processing_time,
+                result.processor_name,
             )
 
 
@@ -124,5 +126,5 @@ class NumericProcessor(DataProcessor):
 
         except Exception as e:
             processing_time = time.time() - start_time
-            self.logger.error(f"Processing failed after {processing_time:.3f}s: {e}")
+            self.logger.error("Processing failed after %.3fs: %s", processing_time, e)
             raise ProcessingError(f"Numeric processing failed: {e}")
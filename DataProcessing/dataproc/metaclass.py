@@ -15,12 +15,12 @@ class ProcessorMeta(ABCMeta):
     """
 
     def __new__(mcs, name, bases, attrs):
-        logger.debug(f"Creating class {name} with metaclass ProcessorMeta")
+        logger.debug("Creating class %s with metaclass ProcessorMeta", name)
         cls = super().__new__(mcs, name, bases, attrs)
 
         # skip validation for abstract base classes
         if any(base is ABC for base in bases):
-            logger.debug(f"Skipping Validation for abstract class {name}")
+            logger.debug("Skipping Validation for abstract class %s", name)
             return cls
 
         # Rule 1
@@ -37,5 +37,5 @@ class ProcessorMeta(ABCMeta):
         if not name.endswith("Processor"):
             raise ValidationError(f"Class {name} must end with 'Processor'")
 
-        logger.debug(f"Validated processor class {name}")
+        logger.debug("Validated processor class %s", name)
         return cls